@@ -0,0 +1,439 @@
+"""
+命令行入口
+在无显示环境（定时任务、CI）中生成和识别二维码/条形码，只导入 app.core 及其编码依赖，不导入 PySide6。
+每条结果以一行 JSON 输出到标准输出，出错时退出码为 1。
+
+用法：
+    python cli.py generate "https://example.com" -o code.png
+    python cli.py barcode 6901234567892 -o bar.svg --symbology ean13
+    python cli.py batch --input data.csv --output-dir out --sink zip --workers 4
+    python cli.py scan code.png bar.png
+    python cli.py serve --port 8080 --workers 4
+    python cli.py daemon --workers 4 &
+    python cli.py client qrcode "https://example.com" -o code.png
+
+设置环境变量 QRGEN_METRICS=<路径> 时，退出前写出各阶段耗时统计（.json 为 JSON，否则为 Prometheus 文本）
+"""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+import time
+
+from .core import import_profile, metrics
+
+
+# 批量生成时两次进度输出的最小间隔（秒）
+PROGRESS_INTERVAL = 0.5
+
+
+def emit(record):
+    """输出一行 JSON 并立即刷新，便于调用方逐行读取"""
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+
+def parse_version(value):
+    """版本参数：'auto' 或 0-40 的整数"""
+    if value == 'auto':
+        return value
+    version = int(value)
+    if not 0 <= version <= 40:
+        raise argparse.ArgumentTypeError("版本必须为 auto 或 0-40 的整数")
+    return version
+
+
+def _png_options(args):
+    return {'compress_level': args.compress_level, 'strategy': args.png_strategy}
+
+
+def _write_image(img, output, png_options):
+    """编码并写出图片，返回 (字节数, 编码耗时毫秒)"""
+    from .core.vector_output import encode_image
+
+    start = time.perf_counter()
+    data = encode_image(img, output, png_options)
+    elapsed = (time.perf_counter() - start) * 1000
+    with open(output, 'wb') as f:
+        f.write(data)
+    return len(data), elapsed
+
+
+def cmd_generate(args):
+    """生成单个普通或个性化二维码"""
+    from .core.qr_generator_engine import QRCodeGenerator
+
+    generator = QRCodeGenerator(renderer=args.renderer)
+    start = time.perf_counter()
+    if args.picture or args.personal:
+        # MyQR 会向标准输出打印编码信息，改到标准错误，避免混入 JSON 结果
+        with contextlib.redirect_stdout(sys.stderr):
+            img = generator.generate_personal_qrcode(args.content, {
+                'picture_path': args.picture,
+                'colorized': args.colorized,
+                'backend': args.backend,
+            })
+    else:
+        img = generator.generate_simple_qrcode(args.content, {
+            'version': args.version,
+            'size': args.size,
+            'margin': args.margin,
+            'kanji': args.kanji,
+        })
+    generate_ms = (time.perf_counter() - start) * 1000
+    size, encode_ms = _write_image(img, args.output, _png_options(args))
+    emit({
+        'command': 'generate', 'content': args.content, 'output': args.output,
+        'version': img.info.get('qr_version'), 'segments': img.info.get('qr_segments'),
+        'width': img.size[0], 'height': img.size[1], 'bytes': size,
+        'generate_ms': round(generate_ms, 3), 'encode_ms': round(encode_ms, 3),
+    })
+    return 0
+
+
+def cmd_barcode(args):
+    """生成单个条形码"""
+    from .core.qr_generator_engine import QRCodeGenerator
+
+    generator = QRCodeGenerator()
+    start = time.perf_counter()
+    img = generator.generate_barcode(args.content, {
+        'symbology': args.symbology,
+        'text': not args.no_text,
+        'backend': args.backend,
+    })
+    generate_ms = (time.perf_counter() - start) * 1000
+    size, encode_ms = _write_image(img, args.output, _png_options(args))
+    emit({
+        'command': 'barcode', 'content': args.content, 'symbology': args.symbology, 'output': args.output,
+        'width': img.size[0], 'height': img.size[1], 'bytes': size,
+        'generate_ms': round(generate_ms, 3), 'encode_ms': round(encode_ms, 3),
+    })
+    return 0
+
+
+def cmd_batch(args):
+    """批量生成，进度和最终统计逐行输出"""
+    from .core.qr_generator_engine import QRCodeGenerator
+
+    batch_data = {
+        'output_dir': args.output_dir,
+        'prefix': args.prefix,
+        'format': args.format,
+        'sink': args.sink,
+        'workers': args.workers,
+        'resume': not args.no_resume,
+        'dedup': not args.no_dedup,
+        'compress_level': args.compress_level,
+        'png_strategy': args.png_strategy,
+        'mode': args.mode,
+        'version': args.version,
+        'size': args.size,
+        'margin': args.margin,
+        'picture_path': args.picture,
+        'colorized': args.colorized,
+        'symbology': args.symbology,
+        'text': not args.no_text,
+    }
+    if args.input:
+        batch_data['source'] = {
+            'path': args.input,
+            'column': args.column,
+            'has_header': args.header,
+            'encoding': args.encoding,
+        }
+    else:
+        batch_data['lines'] = [line.strip() for line in sys.stdin if line.strip()]
+
+    # Ctrl+C / SIGTERM 时在当前条目完成后停止，已完成的部分记录在清单中，重新执行即可续传
+    interrupted = []
+
+    def request_stop(signum, frame):
+        interrupted.append(signum)
+
+    # 上次输出进度的时间和条数
+    last_emit = [0.0, None]
+
+    def progress_callback(current, total, message):
+        now = time.monotonic()
+        if current != last_emit[1] and (now - last_emit[0] >= PROGRESS_INTERVAL or current >= total):
+            last_emit[:] = [now, current]
+            emit({'event': 'progress', 'current': current, 'total': total})
+        return bool(interrupted)
+
+    previous_handlers = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    generator = QRCodeGenerator(renderer=args.renderer)
+    try:
+        start = time.perf_counter()
+        if args.mode == 'barcode':
+            success, error = generator.batch_generate_barcodes(batch_data, progress_callback)
+        else:
+            success, error = generator.batch_generate_qrcodes(batch_data, progress_callback)
+        elapsed = time.perf_counter() - start
+    finally:
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+
+    stats = dict(generator.last_batch_stats, success=success, error=error)
+    stats['versions'] = {str(version): count for version, count in stats['versions'].items()}
+    emit({'event': 'result', **stats, 'interrupted': bool(interrupted), 'seconds': round(elapsed, 3)})
+    return 1 if error or interrupted else 0
+
+
+def cmd_scan(args):
+    """识别图片中的二维码/条形码，每个文件输出一行"""
+    from .core.qr_scanner_engine import QRCodeScanner
+
+    scanner = QRCodeScanner()
+    status = 0
+    for path in args.images:
+        try:
+            results = scanner.recognize_code(path)
+        except Exception as e:
+            emit({'command': 'scan', 'file': path, 'error': str(e)})
+            status = 1
+            continue
+        emit({
+            'command': 'scan', 'file': path,
+            'results': [
+                {
+                    'type': result.type,
+                    'data': result.data.decode('utf-8', errors='replace'),
+                    'rect': {'left': result.rect.left, 'top': result.rect.top,
+                             'width': result.rect.width, 'height': result.rect.height},
+                }
+                for result in results
+            ],
+        })
+        if not results:
+            status = 1
+    return status
+
+
+def cmd_serve(args):
+    """启动 HTTP 渲染服务，直到收到 Ctrl+C / SIGTERM"""
+    import threading
+
+    from .core.http_service import RenderHTTPServer, RenderService
+
+    service = RenderService(
+        workers=args.workers,
+        cache_bytes=args.cache_mb * 1024 * 1024,
+        max_pending=args.max_pending,
+        timeout=args.timeout,
+        renderer=args.renderer,
+    )
+    # 在启动请求线程之前创建工作进程
+    service.warm_up()
+    server = RenderHTTPServer((args.host, args.port), service, max_age=args.max_age, verbose=args.verbose)
+
+    def request_stop(signum, frame):
+        # serve_forever 所在线程不能直接调用 shutdown，否则会互相等待
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    previous_handlers = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    host, port = server.server_address[:2]
+    emit({'event': 'listening', 'host': host, 'port': port, 'workers': service.workers})
+    try:
+        server.serve_forever()
+    finally:
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+        server.server_close()
+        service.close()
+    emit({'event': 'stopped', **service.stats()})
+    return 0
+
+
+def cmd_daemon(args):
+    """启动预派生的 Unix 套接字守护进程，直到收到 Ctrl+C / SIGTERM"""
+    from .core.socket_client import default_socket_path
+    from .core.socket_daemon import RenderDaemon
+
+    path = args.socket or default_socket_path()
+    daemon = RenderDaemon(path, workers=args.workers, renderer=args.renderer, idle_timeout=args.idle_timeout)
+    daemon.start()
+
+    def request_stop(signum, frame):
+        daemon.stop()
+
+    previous_handlers = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    emit({'event': 'listening', 'socket': path, 'workers': daemon.workers, 'pid': os.getpid()})
+    try:
+        daemon.serve_forever()
+    finally:
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+    emit({'event': 'stopped', 'socket': path})
+    return 0
+
+
+def _client_params(values):
+    """--param 名称=值 列表转换为参数字典"""
+    params = {}
+    for value in values:
+        name, sep, param = value.partition('=')
+        if not sep:
+            raise ValueError(f"参数格式应为 名称=值: {value}")
+        params[name] = param
+    return params
+
+
+def cmd_client(args):
+    """
+    通过守护进程渲染：单个任务写出 -o 指定的文件；
+    --stdin 时从标准输入逐行读取 JSON 任务 {"kind", "content", "output", 其他参数}，复用同一个连接
+    """
+    from .core.socket_client import DaemonClient, DaemonError
+
+    status = 0
+    with DaemonClient(args.socket, timeout=args.timeout) as client:
+        if not args.stdin:
+            if not args.content or not args.output:
+                raise ValueError("需要给出内容和 -o 输出文件，或使用 --stdin")
+            params = _client_params(args.param)
+            params.setdefault('format', os.path.splitext(args.output)[1].lstrip('.').lower() or 'png')
+            start = time.perf_counter()
+            data = client.render(args.kind, args.content, **params)
+            with open(args.output, 'wb') as f:
+                f.write(data)
+            emit({'command': 'client', 'output': args.output, 'bytes': len(data),
+                  'ms': round((time.perf_counter() - start) * 1000, 3)})
+            return 0
+
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            kind = job.pop('kind', args.kind)
+            output = job.pop('output')
+            job.setdefault('format', os.path.splitext(output)[1].lstrip('.').lower() or 'png')
+            try:
+                data = client.request(kind, job)
+            except DaemonError as e:
+                emit({'command': 'client', 'output': output, 'error': str(e)})
+                status = 1
+                continue
+            with open(output, 'wb') as f:
+                f.write(data)
+            emit({'command': 'client', 'output': output, 'bytes': len(data)})
+    return status
+
+
+def _add_png_arguments(parser):
+    parser.add_argument("--compress-level", type=int, default=6, choices=range(10), metavar="0-9",
+                        help="PNG 压缩等级")
+    parser.add_argument("--png-strategy", default="default",
+                        choices=("default", "filtered", "huffman", "rle", "fixed"), help="PNG 压缩策略")
+
+
+def _add_qr_arguments(parser):
+    parser.add_argument("--version", type=parse_version, default="auto", help="版本：auto 或最小版本号")
+    parser.add_argument("--size", type=int, default=232, help="普通二维码像素尺寸")
+    parser.add_argument("--margin", type=int, default=4, help="边距（模块数）")
+    parser.add_argument("--renderer", default="numpy", choices=("numpy", "pil"), help="普通二维码渲染后端")
+    parser.add_argument("--picture", default="", help="个性化二维码背景图片")
+    parser.add_argument("--colorized", action="store_true", help="个性化二维码保留背景颜色")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="二维码/条形码命令行工具，结果以 JSON 行输出")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="生成二维码")
+    generate.add_argument("content", help="二维码内容")
+    generate.add_argument("-o", "--output", required=True, help="输出文件（.png/.jpg/.bmp/.svg/.pdf）")
+    _add_qr_arguments(generate)
+    generate.add_argument("--kanji", action="store_true", help="允许汉字模式分段")
+    generate.add_argument("--personal", action="store_true", help="生成个性化二维码（可不带背景图片）")
+    generate.add_argument("--backend", default="native", choices=("native", "myqr"), help="个性化二维码后端")
+    _add_png_arguments(generate)
+    generate.set_defaults(func=cmd_generate)
+
+    barcode = commands.add_parser("barcode", help="生成条形码")
+    barcode.add_argument("content", help="条形码内容")
+    barcode.add_argument("-o", "--output", required=True, help="输出文件（.png/.jpg/.bmp/.svg/.pdf）")
+    barcode.add_argument("--symbology", default="code128", choices=("code128", "ean13", "code39", "itf"),
+                         help="码制")
+    barcode.add_argument("--no-text", action="store_true", help="不显示文字")
+    barcode.add_argument("--backend", default="native", choices=("native", "python-barcode"), help="生成后端")
+    _add_png_arguments(barcode)
+    barcode.set_defaults(func=cmd_barcode)
+
+    batch = commands.add_parser("batch", help="批量生成，未给出 --input 时从标准输入逐行读取内容")
+    batch.add_argument("--input", help="TXT/CSV 数据文件")
+    batch.add_argument("--column", type=int, help="CSV 列序号（从 0 开始）")
+    batch.add_argument("--header", action="store_true", help="数据文件第一行为表头")
+    batch.add_argument("--encoding", default="utf-8-sig", help="数据文件编码")
+    batch.add_argument("--output-dir", required=True, help="输出目录")
+    batch.add_argument("--prefix", default="", help="文件名前缀")
+    batch.add_argument("--format", default="png", choices=("png", "jpeg", "bmp", "svg", "pdf"), help="图片格式")
+    batch.add_argument("--sink", default="dir", choices=("dir", "zip", "tar"), help="输出方式")
+    batch.add_argument("--workers", type=int, default=1, help="并行进程数")
+    batch.add_argument("--no-resume", action="store_true", help="忽略清单，全部重新生成")
+    batch.add_argument("--no-dedup", action="store_true", help="不对重复内容去重")
+    batch.add_argument("--mode", default="simple", choices=("simple", "personal", "barcode"), help="生成类型")
+    _add_qr_arguments(batch)
+    batch.add_argument("--symbology", default="code128", choices=("code128", "ean13", "code39", "itf"),
+                       help="条形码码制")
+    batch.add_argument("--no-text", action="store_true", help="条形码不显示文字")
+    _add_png_arguments(batch)
+    batch.set_defaults(func=cmd_batch)
+
+    scan = commands.add_parser("scan", help="识别图片中的二维码/条形码")
+    scan.add_argument("images", nargs="+", help="图片文件")
+    scan.set_defaults(func=cmd_scan)
+
+    serve = commands.add_parser("serve", help="启动 HTTP 渲染服务（/qrcode、/barcode、/health）")
+    serve.add_argument("--host", default="127.0.0.1", help="监听地址")
+    serve.add_argument("--port", type=int, default=8080, help="监听端口，为 0 时由系统分配")
+    serve.add_argument("--workers", type=int, help="渲染进程数，默认为 CPU 核数，为 0 时在请求线程中渲染")
+    serve.add_argument("--cache-mb", type=int, default=64, help="响应缓存大小（MB），为 0 时关闭")
+    serve.add_argument("--max-pending", type=int, help="同时在途的渲染任务上限，超出时返回 503")
+    serve.add_argument("--timeout", type=float, default=30, help="单个渲染任务的超时秒数")
+    serve.add_argument("--max-age", type=int, default=3600, help="Cache-Control 的 max-age 秒数")
+    serve.add_argument("--renderer", default="numpy", choices=("numpy", "pil"), help="普通二维码渲染后端")
+    serve.add_argument("--verbose", action="store_true", help="输出访问日志")
+    serve.set_defaults(func=cmd_serve)
+
+    daemon = commands.add_parser("daemon", help="启动预派生的 Unix 套接字守护进程（常驻内存，引擎保持预热）")
+    daemon.add_argument("--socket", help="套接字路径，默认为 $QRGEN_SOCKET 或运行时目录下的 qrgen-<uid>.sock")
+    daemon.add_argument("--workers", type=int, help="子进程数，默认为 CPU 核数")
+    daemon.add_argument("--renderer", default="numpy", choices=("numpy", "pil"), help="普通二维码渲染后端")
+    daemon.add_argument("--idle-timeout", type=float, default=30, help="连接空闲超过该秒数时关闭")
+    daemon.set_defaults(func=cmd_daemon)
+
+    client = commands.add_parser("client", help="通过守护进程渲染（只导入标准库，启动快）")
+    client.add_argument("kind", nargs="?", default="qrcode", choices=("qrcode", "barcode"), help="类型")
+    client.add_argument("content", nargs="?", help="内容")
+    client.add_argument("-o", "--output", help="输出文件，扩展名决定格式")
+    client.add_argument("--param", action="append", default=[], metavar="名称=值",
+                        help="渲染参数（与 HTTP 服务的查询参数相同），可重复")
+    client.add_argument("--stdin", action="store_true", help="从标准输入逐行读取 JSON 任务")
+    client.add_argument("--socket", help="套接字路径")
+    client.add_argument("--timeout", type=float, default=30, help="单个请求的超时秒数")
+    client.set_defaults(func=cmd_client)
+
+    return parser
+
+
+def main(argv=None):
+    """命令行主入口，返回退出码"""
+    # 打包后的程序在批量生成时会启动子进程，需要先处理子进程入口；
+    # 只在子进程中导入 multiprocessing，普通调用（如守护进程客户端）不必付出导入开销
+    if len(sys.argv) >= 2 and sys.argv[1] == '--multiprocessing-fork':
+        import multiprocessing
+        multiprocessing.freeze_support()
+    import_profile.install_from_env()
+    metrics.install_from_env()
+
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except Exception as e:
+        emit({'command': args.command, 'error': str(e)})
+        return 1
+    finally:
+        import_profile.mark('command_done')
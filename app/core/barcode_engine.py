@@ -0,0 +1,438 @@
+"""
+条形码引擎
+直接计算条形码的模块序列（True 表示条，False 表示空），再把整行模块一次性栅格化到图片缓冲区，
+不经过 python-barcode 的逐矩形绘制、PNG 编码与再解码
+"""
+import functools
+import importlib.util
+import os
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from . import metrics
+
+
+# Code128 符号 0-106 的条空宽度（条、空交替，以条开始）
+_CODE128_WIDTHS = (
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312', '132212', '221213',
+    '221312', '231212', '112232', '122132', '122231', '113222', '123122', '123221', '223211', '221132',
+    '221231', '213212', '223112', '312131', '311222', '321122', '321221', '312212', '322112', '322211',
+    '212123', '212321', '232121', '111323', '131123', '131321', '112313', '132113', '132311', '211313',
+    '231113', '231311', '112133', '112331', '132131', '113123', '113321', '133121', '313121', '211331',
+    '231131', '213113', '213311', '213131', '311123', '311321', '331121', '312113', '312311', '332111',
+    '314111', '221411', '431111', '111224', '111422', '121124', '121421', '141122', '141221', '112214',
+    '112412', '122114', '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111',
+    '111242', '121142', '121241', '114212', '124112', '124211', '411212', '421112', '421211', '212141',
+    '214121', '412121', '111143', '111341', '131141', '114113', '114311', '411113', '411311', '113141',
+    '114131', '311141', '411131', '211412', '211214', '211232', '2331112',
+)
+
+CODE128_START = {'A': 103, 'B': 104, 'C': 105}
+CODE128_STOP = 106
+# 在其他字符集中切换到 A、B、C 的符号值
+_CODE128_SWITCH = {'A': 101, 'B': 100, 'C': 99}
+# A、B 之间只对下一个字符生效的临时切换
+_CODE128_SHIFT = 98
+
+_CODE_SETS = ('A', 'B', 'C')
+
+# 栅格化默认参数（像素），300 dpi 下与 python-barcode 的默认尺寸相近
+DEFAULT_OPTIONS = {
+    'module_width': 2,
+    'bar_height': 150,
+    'quiet_zone': 10,
+    'margin': 10,
+    'text': True,
+    'font_size': 28,
+    'text_distance': 8,
+}
+
+
+def _widths_to_modules(widths):
+    """把条空宽度字符串展开为模块布尔数组"""
+    counts = [int(w) for w in widths]
+    colors = np.arange(len(counts)) % 2 == 0
+    return np.repeat(colors, counts)
+
+
+_CODE128_MODULES = tuple(_widths_to_modules(widths) for widths in _CODE128_WIDTHS)
+
+
+def _code128_value(char, code_set):
+    """字符在 A 或 B 字符集中的符号值，不可编码时返回None"""
+    code = ord(char)
+    if code_set == 'A':
+        if code < 32:
+            return code + 64
+        if code < 96:
+            return code - 32
+    elif 32 <= code < 128:
+        return code - 32
+    return None
+
+
+def code128_symbols(content):
+    """
+    计算 Code128 符号序列（含起始符、校验符和终止符）
+
+    按位置做动态规划，在 A、B、C 三个字符集之间选择符号数最少的切换方案：
+    A、B 中每个字符一个符号，C 中每两位数字一个符号，切换字符集或临时切换（SHIFT）各多一个符号。
+
+    Args:
+        content (str): 条形码内容，只支持 ASCII 字符
+
+    Returns:
+        list: 符号值列表
+    """
+    if not content:
+        raise ValueError("请输入内容")
+    for char in content:
+        if ord(char) >= 128:
+            raise ValueError(f"Code128 不支持字符: {char}")
+
+    n = len(content)
+    infinity = float('inf')
+    # cost[i][s]：编码前 i 个字符并处于字符集 s 时的最少符号数；back 记录回溯信息
+    cost = [[infinity] * 3 for _ in range(n + 1)]
+    back = [[None] * 3 for _ in range(n + 1)]
+    for s in range(3):
+        cost[0][s] = 1
+        back[0][s] = ('start', None)
+
+    for i in range(n + 1):
+        # 在当前位置切换字符集
+        best = min(range(3), key=lambda s: cost[i][s])
+        for s in range(3):
+            if cost[i][best] + 1 < cost[i][s]:
+                cost[i][s] = cost[i][best] + 1
+                back[i][s] = ('switch', best)
+        if i == n:
+            break
+
+        char = content[i]
+        for s, code_set in enumerate(_CODE_SETS):
+            current = cost[i][s]
+            if current == infinity:
+                continue
+            if code_set == 'C':
+                if i + 1 < n and content[i:i + 2].isdigit():
+                    if current + 1 < cost[i + 2][s]:
+                        cost[i + 2][s] = current + 1
+                        back[i + 2][s] = ('pair', s)
+                continue
+            if _code128_value(char, code_set) is not None:
+                if current + 1 < cost[i + 1][s]:
+                    cost[i + 1][s] = current + 1
+                    back[i + 1][s] = ('char', s)
+            elif _code128_value(char, 'B' if code_set == 'A' else 'A') is not None:
+                if current + 2 < cost[i + 1][s]:
+                    cost[i + 1][s] = current + 2
+                    back[i + 1][s] = ('shift', s)
+
+    # 回溯出每一步的动作
+    state = min(range(3), key=lambda s: cost[n][s])
+    position = n
+    steps = []
+    while True:
+        action, previous = back[position][state]
+        if action == 'start':
+            break
+        steps.append((action, position, state))
+        if action == 'pair':
+            position -= 2
+        elif action in ('char', 'shift'):
+            position -= 1
+        state = previous
+    steps.reverse()
+
+    symbols = [CODE128_START[_CODE_SETS[state]]]
+    for action, position, state in steps:
+        code_set = _CODE_SETS[state]
+        if action == 'switch':
+            symbols.append(_CODE128_SWITCH[code_set])
+        elif action == 'pair':
+            symbols.append(int(content[position - 2:position]))
+        elif action == 'char':
+            symbols.append(_code128_value(content[position - 1], code_set))
+        else:
+            other = 'B' if code_set == 'A' else 'A'
+            symbols.extend((_CODE128_SHIFT, _code128_value(content[position - 1], other)))
+
+    checksum = (symbols[0] + sum(i * value for i, value in enumerate(symbols[1:], 1))) % 103
+    symbols.extend((checksum, CODE128_STOP))
+    return symbols
+
+
+def code128_modules(content):
+    """
+    计算 Code128 的模块序列
+
+    Returns:
+        numpy.ndarray: 一维布尔数组，True 表示条
+    """
+    return np.concatenate([_CODE128_MODULES[value] for value in code128_symbols(content)])
+
+
+# EAN-13 左侧 L 码（G 码为 R 码的逆序，R 码为 L 码取反）
+_EAN_L = ('0001101', '0011001', '0010011', '0111101', '0100011',
+          '0110001', '0101111', '0111011', '0110111', '0001011')
+# 首位数字决定左侧 6 位使用 L 码还是 G 码
+_EAN_PARITY = ('LLLLLL', 'LLGLGG', 'LLGGLG', 'LLGGGL', 'LGLLGG',
+               'LGGLLG', 'LGGGLL', 'LGLGLG', 'LGLGGL', 'LGGLGL')
+
+
+def _bits(pattern):
+    """'0101' 形式的字符串转换为布尔数组"""
+    return np.frombuffer(pattern.encode('ascii'), dtype=np.uint8) == ord('1')
+
+
+_EAN_CODES = {
+    'L': tuple(_bits(code) for code in _EAN_L),
+    'G': tuple(~_bits(code)[::-1] for code in _EAN_L),
+    'R': tuple(~_bits(code) for code in _EAN_L),
+}
+_EAN_GUARD = _bits('101')
+_EAN_CENTER = _bits('01010')
+
+
+def ean13_check_digit(digits):
+    """计算 12 位数字的 EAN-13 校验位"""
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return str((10 - total % 10) % 10)
+
+
+def ean13_modules(content):
+    """
+    计算 EAN-13 的模块序列
+
+    Args:
+        content (str): 12 位数字（自动补校验位）或 13 位数字（检查校验位）
+
+    Returns:
+        tuple: (模块序列, 含校验位的 13 位数字)
+    """
+    if not content.isdigit() or not content.isascii() or len(content) not in (12, 13):
+        raise ValueError("EAN-13 内容必须为 12 或 13 位数字")
+    check = ean13_check_digit(content[:12])
+    if len(content) == 13 and content[12] != check:
+        raise ValueError(f"EAN-13 校验位错误，应为 {check}")
+    code = content[:12] + check
+
+    parity = _EAN_PARITY[int(code[0])]
+    parts = [_EAN_GUARD]
+    parts.extend(_EAN_CODES[kind][int(d)] for kind, d in zip(parity, code[1:7]))
+    parts.append(_EAN_CENTER)
+    parts.extend(_EAN_CODES['R'][int(d)] for d in code[7:])
+    parts.append(_EAN_GUARD)
+    return np.concatenate(parts), code
+
+
+# Code39 字符及其 9 个条空元素的宽窄（1 表示宽），序号即校验值
+_CODE39_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ-. $/+%'
+_CODE39_WIDE = (
+    '000110100', '100100001', '001100001', '101100000', '000110001', '100110000', '001110000',
+    '000100101', '100100100', '001100100', '100001001', '001001001', '101001000', '000011001',
+    '100011000', '001011000', '000001101', '100001100', '001001100', '000011100', '100000011',
+    '001000011', '101000010', '000010011', '100010010', '001010010', '000000111', '100000110',
+    '001000110', '000010110', '110000001', '011000001', '111000000', '010010001', '110010000',
+    '011010000', '010000101', '110000100', '011000100', '010101000', '010100010', '010001010',
+    '000101010',
+)
+_CODE39_START_STOP = '010010100'
+# Code39 与 ITF 的宽窄比
+_CODE39_NARROW, _CODE39_WIDTH = 1, 3
+_ITF_NARROW, _ITF_WIDTH = 2, 5
+
+
+def _wide_narrow_modules(elements, narrow, wide):
+    """
+    把条空交替的宽窄序列展开为模块序列
+
+    Args:
+        elements (str): 每个元素的宽窄（'1' 宽，'0' 窄），以条开始交替
+    """
+    counts = np.where(_bits(elements), wide, narrow)
+    colors = np.arange(len(counts)) % 2 == 0
+    return np.repeat(colors, counts)
+
+
+def code39_modules(content):
+    """
+    计算 Code39 的模块序列（附加模 43 校验字符，字符之间以一个窄空分隔）
+
+    Args:
+        content (str): 条形码内容，小写字母自动转换为大写
+
+    Returns:
+        tuple: (模块序列, 可读文字)
+    """
+    content = content.upper()
+    values = []
+    for char in content:
+        value = _CODE39_CHARS.find(char)
+        if value < 0:
+            raise ValueError(f"Code39 不支持字符: {char}")
+        values.append(value)
+    values.append(sum(values) % 43)
+
+    patterns = [_CODE39_START_STOP] + [_CODE39_WIDE[value] for value in values] + [_CODE39_START_STOP]
+    # 字符间隔为窄空，在每个字符的 9 个元素后补一个窄空元素
+    elements = '0'.join(patterns)
+    return _wide_narrow_modules(elements, _CODE39_NARROW, _CODE39_WIDTH), content
+
+
+# ITF 数字的 5 个元素宽窄
+_ITF_WIDE = ('00110', '10001', '01001', '11000', '00101', '10100', '01100', '00011', '10010', '01010')
+
+
+def itf_modules(content):
+    """
+    计算 ITF（交叉二五码）的模块序列，奇数位时在前面补 0
+
+    每对数字中，第一位编码在条上、第二位编码在空上，交替排列。
+
+    Returns:
+        tuple: (模块序列, 补齐后的数字)
+    """
+    if not content.isdigit() or not content.isascii():
+        raise ValueError("ITF 内容只能为数字")
+    if len(content) % 2:
+        content = '0' + content
+
+    elements = ['0000']
+    for i in range(0, len(content), 2):
+        bars = _ITF_WIDE[int(content[i])]
+        spaces = _ITF_WIDE[int(content[i + 1])]
+        elements.append(''.join(b + sp for b, sp in zip(bars, spaces)))
+    elements.append('100')
+    return _wide_narrow_modules(''.join(elements), _ITF_NARROW, _ITF_WIDTH), content
+
+
+def _code128(content):
+    return code128_modules(content), content
+
+
+# 支持的码制：名称 -> 返回 (模块序列, 可读文字) 的函数
+SYMBOLOGIES = {
+    'code128': _code128,
+    'ean13': ean13_modules,
+    'code39': code39_modules,
+    'itf': itf_modules,
+}
+
+
+def _font_candidates():
+    """依次尝试的字体：python-barcode 自带的等宽字体，其次是系统字体"""
+    spec = importlib.util.find_spec('barcode')
+    if spec is not None and spec.origin:
+        yield os.path.join(os.path.dirname(spec.origin), 'fonts', 'DejaVuSansMono.ttf')
+    yield 'DejaVuSansMono.ttf'
+    yield 'arial.ttf'
+
+
+@functools.lru_cache(maxsize=8)
+def load_font(size):
+    """
+    加载文字字体，同一字号只加载一次
+
+    Args:
+        size (int): 字号（像素）
+
+    Returns:
+        PIL.ImageFont: 字体对象
+    """
+    for path in _font_candidates():
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def render_bars(modules, text=None, options=None):
+    """
+    把模块序列栅格化为灰度图片
+
+    先生成一行像素，再整块复制到条高范围内；可选在条下方居中绘制文字。
+
+    Args:
+        modules (numpy.ndarray): 一维布尔模块序列
+        text (str): 条下方的可读文字，为 None 或 options['text'] 为 False 时不绘制
+        options (dict): 栅格化参数，见 DEFAULT_OPTIONS
+
+    Returns:
+        PIL.Image: 模式为 'L' 的条形码图片
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    module_width = options['module_width']
+    bar_height = options['bar_height']
+    quiet_zone = options['quiet_zone']
+    margin = options['margin']
+
+    row = np.repeat(np.where(modules, 0, 255).astype(np.uint8), module_width)
+    row = np.pad(row, quiet_zone * module_width, constant_values=255)
+    left_pad = 0
+
+    show_text = bool(text) and options['text']
+    font = load_font(options['font_size']) if show_text else None
+    text_height = 0
+    if show_text:
+        left, top, right, bottom = font.getbbox(text)
+        text_height = options['text_distance'] + bottom
+        # 文字比条宽时两侧补白，保证文字完整显示
+        extra = right - left - row.size
+        if extra > 0:
+            left_pad = extra // 2 + 1
+            row = np.pad(row, (left_pad, extra - extra // 2 + 1), constant_values=255)
+    width = row.size
+
+    height = margin * 2 + bar_height + text_height
+    canvas = np.full((height, width), 255, dtype=np.uint8)
+    canvas[margin:margin + bar_height] = row
+    img = Image.fromarray(canvas, 'L')
+
+    if show_text:
+        draw = ImageDraw.Draw(img)
+        draw.text((width // 2, margin + bar_height + options['text_distance']), text,
+                  font=font, fill=0, anchor='ma')
+
+    # 供矢量输出使用的几何信息（像素单位）
+    img.info['vector'] = {
+        'kind': 'bars',
+        'modules': np.asarray(modules, dtype=bool),
+        'x': left_pad + quiet_zone * module_width,
+        'module_width': module_width,
+        'bar_y': margin,
+        'bar_height': bar_height,
+        'width': width,
+        'height': height,
+        'text': text if show_text else None,
+        'text_x': width // 2,
+        'text_top': margin + bar_height + options['text_distance'],
+        'font_size': options['font_size'],
+    }
+    return img
+
+
+def generate(symbology, content, options=None):
+    """
+    生成条形码图片
+
+    Args:
+        symbology (str): 码制名称，见 SYMBOLOGIES
+        content (str): 条形码内容
+        options (dict): 栅格化参数，见 DEFAULT_OPTIONS
+
+    Returns:
+        PIL.Image: 条形码图片，info['barcode_modules'] 为模块数
+    """
+    encoder = SYMBOLOGIES.get(symbology)
+    if encoder is None:
+        raise ValueError(f"不支持的条形码类型: {symbology}")
+    with metrics.stage('barcode.encode'):
+        modules, text = encoder(content)
+    with metrics.stage('barcode.render'):
+        img = render_bars(modules, text, options)
+    img.info['barcode_modules'] = int(modules.size)
+    return img
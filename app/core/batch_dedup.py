@@ -0,0 +1,81 @@
+"""
+批量内容去重
+同一批量任务的参数相同，内容摘要相同即输出相同：每个唯一内容只生成一次，
+重复条目交给写入线程建立链接（目录为硬链接，TAR 为链接条目，ZIP 只在清单中记录引用）。
+单次遍历输入，只保存每个唯一内容的摘要，不需要把整个列表读入内存
+"""
+
+
+class BatchDeduplicator:
+    """
+    按内容摘要去重
+
+    原件仍在生成时出现的重复条目先挂起，原件交给写入线程后再提交链接，
+    保证链接总是排在原件之后写出；原件生成失败时挂起的重复条目一并计为失败。
+    """
+
+    def __init__(self, writer, stats, enabled=True):
+        """
+        Args:
+            writer (SinkWriter): 写入线程
+            stats (dict): 批量统计，累加 success、error、deduplicated、dedup_saved_bytes
+            enabled (bool): 是否去重
+        """
+        self.writer = writer
+        self.stats = stats
+        self.enabled = enabled
+        # 摘要 -> [原件文件名, 字节数]，字节数为 None 表示仍在生成，-1 表示生成失败
+        self._originals = {}
+        # 摘要 -> 等待原件的 [(序号, 文件名)]
+        self._waiting = {}
+
+    def add_existing(self, digest, name, size):
+        """登记续传时跳过的已有文件，后续重复条目直接链接到它"""
+        if self.enabled:
+            self._originals.setdefault(digest, [name, size])
+
+    def check(self, index, name, digest):
+        """
+        检查条目是否重复
+
+        Returns:
+            bool: 重复时返回 True，条目已由去重处理，不需要再生成
+        """
+        if not self.enabled:
+            return False
+
+        original = self._originals.get(digest)
+        if original is None:
+            self._originals[digest] = [name, None]
+            return False
+
+        target, size = original
+        if size is None:
+            self._waiting.setdefault(digest, []).append((index, name))
+        elif size < 0:
+            self.stats['error'] += 1
+        else:
+            self._link(index, name, digest, target, size)
+        return True
+
+    def resolve(self, digest, size):
+        """
+        原件已交给写入线程（size 为字节数）或生成失败（size 为None）后处理挂起的重复条目
+        """
+        if not self.enabled:
+            return
+        original = self._originals.get(digest)
+        if original is None:
+            return
+        original[1] = -1 if size is None else size
+        for index, name in self._waiting.pop(digest, ()):
+            if size is None:
+                self.stats['error'] += 1
+            else:
+                self._link(index, name, digest, original[0], size)
+
+    def _link(self, index, name, digest, target, size):
+        self.writer.put_link(name, target, size, (index, digest))
+        self.stats['success'] += 1
+        self.stats['deduplicated'] += 1
+        self.stats['dedup_saved_bytes'] += size
@@ -0,0 +1,125 @@
+"""
+批量生成清单
+每写出一个文件就向 JSONL 清单追加一行（序号、内容摘要、参数摘要、文件名、字节数、输出文件摘要），
+重新执行同一批量任务时据此跳过已经完成、参数一致且输出文件摘要相符的条目，中断或取消后可以接着生成。
+去重后的重复条目记录 ref 字段，指向内容相同的文件
+"""
+import hashlib
+import json
+import os
+
+
+def content_digest(content):
+    """内容摘要"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def params_digest(params):
+    """生成参数摘要，参数相同的两次批量任务摘要一致"""
+    text = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class BatchManifest:
+    """
+    JSONL 格式的批量清单
+
+    每行一个 JSON 对象：index, name, content, params, size；新生成的条目另有 output（输出文件的 SHA-256）
+    和 encode_ms（编码耗时，毫秒），重复条目另有 ref（引用的文件名）和 linked（是否写出了链接）。
+    没有 output 的旧记录不能确认输出完整，续传时重新生成。
+    同一序号出现多次时以最后一行为准；进程崩溃时最后一行可能不完整，读取时忽略。
+    """
+
+    def __init__(self, path, params):
+        """
+        Args:
+            path (str): 清单文件路径
+            params (str): 本次批量任务的参数摘要，见 params_digest
+        """
+        self.path = path
+        self.params = params
+        self.entries = {}
+        # 本次执行中确认保留的原件：文件名 -> (内容摘要, 输出文件摘要)，引用条目只能指向其中内容相同的文件
+        self._kept = {}
+        self._file = None
+
+    def load(self):
+        """读取已有清单中参数与本次一致的条目，返回条目数"""
+        self.entries = {}
+        self._kept = {}
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record['params'] != self.params:
+                    continue
+                # 只保留比对所需的字段，条目很多时也不占用过多内存
+                self.entries[record['index']] = (
+                    record['name'], record['content'], record['size'], record.get('ref'),
+                    record.get('output'), record.get('linked')
+                )
+        return len(self.entries)
+
+    def done_output(self, index, name, digest, existing_size, existing_digest):
+        """
+        查找已经完成的条目
+
+        Args:
+            index (int): 序号
+            name (str): 输出文件名
+            digest (str): 内容摘要
+            existing_size (callable): 按文件名返回输出目标中已有文件的字节数，不存在时返回None
+            existing_digest (callable): 按文件名返回输出目标中已有文件内容的摘要，不存在时返回None
+
+        Returns:
+            tuple: 清单记录与本次任务一致（文件名、内容、参数）且输出文件的大小和摘要都相符时返回
+                (实际保存内容的文件名, 字节数)，否则返回None。
+                引用条目只在被引用的文件本次已按相同内容保留时才算完成（条目按序号顺序检查，
+                被引用的文件序号总是更小）；被引用的文件本次重新生成时引用失效，条目需要重新输出
+        """
+        entry = self.entries.get(index)
+        if entry is None:
+            return None
+        entry_name, entry_digest, size, ref, output, linked = entry
+        if entry_name != name or entry_digest != digest:
+            return None
+        if ref is not None:
+            kept = self._kept.get(ref)
+            if kept is None or kept[0] != digest:
+                return None
+            # 目录和 TAR 中的重复条目是指向原件的链接，链接本身也必须还在
+            if linked and existing_digest(name) != kept[1]:
+                return None
+            return ref, size
+        # 先比较字节数，相符时再计算摘要，被截断的文件不必读取
+        if output is None or existing_size(name) != size or existing_digest(name) != output:
+            return None
+        self._kept[name] = (digest, output)
+        return name, size
+
+    def open(self, resume):
+        """打开清单准备写入，resume 为 False 时清空原有记录"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def record(self, index, name, digest, size, ref=None, encode_ms=None, output=None, linked=None):
+        """追加一条完成记录并立即刷新，进程崩溃时已写入的记录不会丢失"""
+        record = {'index': index, 'name': name, 'content': digest, 'params': self.params, 'size': size}
+        if output is not None:
+            record['output'] = output
+        if ref is not None:
+            record['ref'] = ref
+            record['linked'] = bool(linked)
+        if encode_ms is not None:
+            record['encode_ms'] = round(encode_ms, 3)
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
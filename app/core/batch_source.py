@@ -0,0 +1,71 @@
+"""
+批量数据源
+从 TXT/CSV 文件中按需逐行读取批量生成的内容，内存占用与文件行数无关
+"""
+import csv
+from itertools import islice
+
+
+class BatchFileSource:
+    """可重复迭代的文件数据源，每次迭代都从头流式读取文件"""
+
+    def __init__(self, path, column=None, has_header=False, encoding='utf-8-sig'):
+        """
+        Args:
+            path (str): 数据文件路径
+            column (int): CSV 列序号（从 0 开始），为 None 时 .csv 文件取第一列，其他文件按整行读取
+            has_header (bool): 第一行是否为表头
+            encoding (str): 文件编码
+        """
+        if not path:
+            raise ValueError("请选择数据文件")
+
+        self.path = path
+        self.encoding = encoding
+        self.has_header = has_header
+        if column is None and path.lower().endswith('.csv'):
+            column = 0
+        self.column = column
+
+    @classmethod
+    def from_dict(cls, source):
+        """根据批量数据中的 source 字典创建数据源"""
+        return cls(
+            source.get('path', ''),
+            column=source.get('column'),
+            has_header=source.get('has_header', False),
+            encoding=source.get('encoding', 'utf-8-sig')
+        )
+
+    def __iter__(self):
+        """逐条产出去除首尾空白后的非空内容"""
+        with open(self.path, 'r', encoding=self.encoding, errors='replace', newline='') as f:
+            if self.column is None:
+                rows = (line for line in f)
+            else:
+                column = self.column
+                rows = (row[column] if len(row) > column else '' for row in csv.reader(f))
+
+            if self.has_header:
+                next(rows, None)
+
+            for value in rows:
+                value = value.strip()
+                if value:
+                    yield value
+
+    def count(self):
+        """流式统计有效内容条数，不在内存中保留数据"""
+        return sum(1 for _ in self)
+
+    def preview(self, limit=20):
+        """
+        读取前若干条内容作为预览
+
+        Args:
+            limit (int): 最多读取的条数
+
+        Returns:
+            list: 预览内容列表
+        """
+        return list(islice(self, limit))
@@ -0,0 +1,429 @@
+"""
+HTTP 渲染服务
+用标准库 ThreadingHTTPServer 提供二维码、条形码图片，参数放在查询字符串中：
+    GET /qrcode?content=https://example.com&size=232&margin=4&version=auto&format=png
+    GET /barcode?content=6901234567892&symbology=ean13&text=0&format=svg
+    GET /health
+请求线程只负责解析参数和收发数据，渲染与编码交给进程池；响应按内容摘要生成 ETag，
+If-None-Match 匹配时返回 304；热点响应缓存在内存 LRU 中，同一参数的并发请求只渲染一次
+"""
+import hashlib
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .barcode_engine import DEFAULT_OPTIONS as BARCODE_OPTIONS
+from .barcode_engine import SYMBOLOGIES
+from .image_cache import LRUCache
+from .png_encoder import DEFAULT_COMPRESS_LEVEL, DEFAULT_STRATEGY, PNG_STRATEGIES
+from .qr_generator_engine import QRCodeGenerator
+from .vector_output import encode_image
+
+
+# 输出格式 -> Content-Type
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'pdf': 'application/pdf',
+    'jpeg': 'image/jpeg',
+    'bmp': 'image/bmp',
+}
+
+# 参数上限，防止单个请求占用过多内存和 CPU
+MAX_CONTENT_LENGTH = 4096
+MAX_IMAGE_SIZE = 4096
+MAX_MARGIN = 64
+
+# 条形码可通过查询字符串调整的整数参数及其上限
+_BARCODE_INT_LIMITS = {
+    'module_width': 16,
+    'bar_height': 2000,
+    'quiet_zone': 200,
+    'margin': 200,
+    'font_size': 200,
+    'text_distance': 200,
+}
+
+
+class ServiceBusy(Exception):
+    """在途渲染数已达上限"""
+
+
+def _parse_int(query, name, default, low, high):
+    value = query.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"参数 {name} 必须为整数")
+    if not low <= value <= high:
+        raise ValueError(f"参数 {name} 必须在 {low}-{high} 之间")
+    return value
+
+
+def _parse_bool(query, name, default):
+    value = query.get(name)
+    if value is None:
+        return default
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"参数 {name} 必须为布尔值")
+
+
+def parse_job(kind, query):
+    """
+    把查询参数转换为渲染任务
+
+    Args:
+        kind (str): 'qrcode' 或 'barcode'
+        query (dict): 查询参数，每个参数取第一个值
+
+    Returns:
+        tuple: (kind, content, params, fmt, png_options)，可以直接作为缓存键（参数按名称排序）
+
+    Raises:
+        ValueError: 参数缺失或不合法
+    """
+    content = query.get('content', '')
+    if not content:
+        raise ValueError("缺少参数 content")
+    if len(content) > MAX_CONTENT_LENGTH:
+        raise ValueError(f"content 长度不能超过 {MAX_CONTENT_LENGTH}")
+
+    fmt = query.get('format', 'png').lower()
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"不支持的图片格式: {fmt}")
+    strategy = query.get('png_strategy', DEFAULT_STRATEGY)
+    if strategy not in PNG_STRATEGIES:
+        raise ValueError(f"不支持的压缩策略: {strategy}")
+    png_options = (('compress_level', _parse_int(query, 'compress_level', DEFAULT_COMPRESS_LEVEL, 0, 9)),
+                   ('strategy', strategy))
+
+    if kind == 'qrcode':
+        version = query.get('version', 'auto')
+        params = {
+            'version': 0 if version == 'auto' else _parse_int(query, 'version', 0, 0, 40),
+            'size': _parse_int(query, 'size', 232, 21, MAX_IMAGE_SIZE),
+            'margin': _parse_int(query, 'margin', 4, 0, MAX_MARGIN),
+            'kanji': _parse_bool(query, 'kanji', False),
+        }
+    else:
+        symbology = query.get('symbology', 'code128')
+        if symbology not in SYMBOLOGIES:
+            raise ValueError(f"不支持的码制: {symbology}")
+        params = {'symbology': symbology, 'text': _parse_bool(query, 'text', BARCODE_OPTIONS['text'])}
+        for name, high in _BARCODE_INT_LIMITS.items():
+            if name in query:
+                low = 1 if name == 'module_width' else 0
+                params[name] = _parse_int(query, name, BARCODE_OPTIONS[name], low, high)
+
+    return kind, content, tuple(sorted(params.items())), fmt, png_options
+
+
+def render_job(generator, job):
+    """生成并编码一个渲染任务，返回文件内容"""
+    kind, content, params, fmt, png_options = job
+    if kind == 'qrcode':
+        img = generator.generate_simple_qrcode(content, dict(params))
+    else:
+        img = generator.generate_barcode(content, dict(params))
+    return encode_image(img, f"image.{fmt}", dict(png_options))
+
+
+def make_etag(body):
+    """按响应内容生成强 ETag"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(header, etag):
+    """If-None-Match 是否与 ETag 匹配（支持多个值、弱校验前缀和 *）"""
+    if not header:
+        return False
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == '*' or candidate == etag:
+            return True
+    return False
+
+
+_worker_generator = None
+
+
+def _init_worker(renderer, cache_bytes):
+    """进程池工作进程初始化：每个进程只创建一次生成器，中断信号只由主进程处理"""
+    global _worker_generator
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_generator = QRCodeGenerator(renderer, cache_bytes, 0)
+
+
+def _render_in_worker(job):
+    return render_job(_worker_generator, job)
+
+
+class RenderService:
+    """
+    渲染调度：响应缓存、并发请求合并、进程池渲染和过载保护
+
+    与 HTTP 无关，便于在其他服务中复用。
+    """
+
+    def __init__(self, workers=None, cache_bytes=64 * 1024 * 1024, max_pending=None,
+                 timeout=30, renderer='numpy'):
+        """
+        Args:
+            workers (int): 渲染进程数，为 0 时在请求线程中直接渲染，为None时使用 CPU 核数
+            cache_bytes (int): 响应缓存的字节预算，为 0 时关闭缓存
+            max_pending (int): 同时在途的渲染任务上限，超出时拒绝请求，为None时为进程数的 8 倍
+            timeout (float): 单个渲染任务的超时秒数
+            renderer (str): 普通二维码渲染后端
+        """
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.timeout = timeout
+        self.cache = LRUCache(cache_bytes, sizeof=lambda entry: len(entry[0]), enabled=cache_bytes > 0)
+        self.max_pending = max_pending or max(self.workers, 1) * 8
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        # 缓存键 -> 正在渲染的 Future，相同参数的并发请求等待同一个结果
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.counters = {'rendered': 0, 'coalesced': 0, 'rejected': 0, 'failed': 0, 'pool_restarts': 0}
+        self.render_seconds = 0.0
+        self.renderer = renderer
+        # 保护进程池的替换，工作进程异常退出后由第一个发现的线程重建
+        self._pool_lock = threading.Lock()
+
+        if self.workers > 0:
+            self._generator = None
+            self._executor = self._create_executor()
+        else:
+            self._generator = QRCodeGenerator(renderer, 8 * 1024 * 1024, 0)
+            self._executor = None
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            # 响应已在主进程缓存，工作进程只保留少量图片缓存
+            initargs=(self.renderer, 8 * 1024 * 1024)
+        )
+
+    def _restart_pool(self, broken):
+        """
+        重建已损坏的进程池（如工作进程被 OOM 终止），多个线程同时发现时只重建一次
+
+        Returns:
+            ProcessPoolExecutor: 当前可用的进程池
+        """
+        with self._pool_lock:
+            if self._executor is broken:
+                self._executor = self._create_executor()
+                broken.shutdown(wait=False, cancel_futures=True)
+                with self._lock:
+                    self.counters['pool_restarts'] += 1
+            return self._executor
+
+    def _submit(self, job):
+        """
+        把渲染任务提交到进程池，进程池已损坏时重建后再提交一次
+
+        Returns:
+            tuple: (提交到的进程池, 任务的 Future)
+        """
+        with self._pool_lock:
+            executor = self._executor
+        try:
+            return executor, executor.submit(_render_in_worker, job)
+        except BrokenProcessPool:
+            executor = self._restart_pool(executor)
+            return executor, executor.submit(_render_in_worker, job)
+
+    def warm_up(self):
+        """预先启动全部工作进程并完成导入，避免第一批请求等待进程启动"""
+        if self._executor is None:
+            return
+        job = parse_job('qrcode', {'content': 'warm-up'})
+        futures = [self._executor.submit(_render_in_worker, job) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def render(self, job):
+        """
+        获取渲染结果
+
+        Returns:
+            tuple: (文件内容, ETag)
+
+        Raises:
+            ServiceBusy: 在途任务已达上限
+            Exception: 生成失败
+        """
+        entry = self.cache.get(job)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            future = self._inflight.get(job)
+            owner = future is None
+            if owner:
+                if not self._slots.acquire(blocking=False):
+                    self.counters['rejected'] += 1
+                    raise ServiceBusy("服务繁忙，请稍后重试")
+                future = self._inflight[job] = Future()
+            else:
+                self.counters['coalesced'] += 1
+        if not owner:
+            return future.result(self.timeout)
+
+        # 槽位交给工作进程的任务后，在任务真正结束时释放：等待超时后任务仍在运行，仍然占用槽位，
+        # 反复超时也不会让积压的任务超过 max_pending
+        holds_slot = True
+        try:
+            start = time.perf_counter()
+            if self._executor is None:
+                body = render_job(self._generator, job)
+            else:
+                executor, task = self._submit(job)
+                task.add_done_callback(lambda _: self._slots.release())
+                holds_slot = False
+                try:
+                    body = task.result(self.timeout)
+                except BrokenProcessPool:
+                    # 本次请求失败，后续请求使用重建的进程池
+                    self._restart_pool(executor)
+                    raise
+            entry = (body, make_etag(body))
+            with self._lock:
+                self.counters['rendered'] += 1
+                self.render_seconds += time.perf_counter() - start
+            self.cache.put(job, entry)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            with self._lock:
+                self.counters['failed'] += 1
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[job]
+            if holds_slot:
+                self._slots.release()
+
+    def stats(self):
+        """服务统计：进程数、渲染计数、平均渲染耗时和缓存命中情况"""
+        with self._lock:
+            stats = dict(self.counters, workers=self.workers, max_pending=self.max_pending,
+                         inflight=len(self._inflight))
+            rendered = self.counters['rendered']
+            stats['render_ms_avg'] = round(self.render_seconds * 1000 / rendered, 3) if rendered else 0.0
+        stats['cache'] = self.cache.stats()
+        return stats
+
+    def close(self):
+        with self._pool_lock:
+            executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """请求处理：/qrcode、/barcode 返回图片，/health 返回服务统计"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'QRcodeGenerate'
+    # 响应头和内容分两次写出，长连接下 Nagle 算法与延迟确认叠加会使每个请求多等约 40 ms
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body):
+        url = urlsplit(self.path)
+        kind = url.path.strip('/')
+        if kind == 'health':
+            self._send_json(HTTPStatus.OK, dict(self.server.service.stats(), status='ok'), send_body)
+            return
+        if kind not in ('qrcode', 'barcode'):
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f"未知路径: {url.path}"}, send_body)
+            return
+
+        query = {name: values[0] for name, values in parse_qs(url.query, keep_blank_values=True).items()}
+        try:
+            job = parse_job(kind, query)
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)}, send_body)
+            return
+
+        try:
+            body, etag = self.server.service.render(job)
+        except ServiceBusy as e:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {'error': str(e)}, send_body, {'Retry-After': '1'})
+            return
+        except FutureTimeoutError:
+            self._send_json(HTTPStatus.GATEWAY_TIMEOUT, {'error': "渲染超时"}, send_body)
+            return
+        except BrokenProcessPool as e:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"渲染进程异常退出: {e}"}, send_body)
+            return
+        except Exception as e:
+            # 生成失败多为内容不符合码制要求（如 EAN-13 含字母）
+            self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {'error': str(e)}, send_body)
+            return
+
+        headers = {'ETag': etag, 'Cache-Control': f"public, max-age={self.server.max_age}"}
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self._send(HTTPStatus.NOT_MODIFIED, None, b'', False, headers)
+            return
+        self._send(HTTPStatus.OK, CONTENT_TYPES[job[3]], body, send_body, headers)
+
+    def _send_json(self, status, data, send_body, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self._send(status, 'application/json; charset=utf-8', body, send_body, headers)
+
+    def _send(self, status, content_type, body, send_body, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class RenderHTTPServer(ThreadingHTTPServer):
+    """每个连接一个线程的 HTTP 服务，渲染由 RenderService 调度"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, service, max_age=3600, verbose=False):
+        """
+        Args:
+            address (tuple): (主机, 端口)，端口为 0 时由系统分配
+            service (RenderService): 渲染调度
+            max_age (int): Cache-Control 的 max-age 秒数
+            verbose (bool): 是否输出每个请求的访问日志
+        """
+        self.service = service
+        self.max_age = max_age
+        self.verbose = verbose
+        super().__init__(address, _RequestHandler)
@@ -0,0 +1,105 @@
+"""
+图片缓存
+按字节预算限制内存占用的 LRU 缓存，用于复用已生成的二维码图片
+"""
+import threading
+from collections import OrderedDict
+
+
+def image_nbytes(img):
+    """估算 PIL 图片占用的字节数"""
+    width, height = img.size
+    if img.mode == '1':
+        return (width + 7) // 8 * height
+    return width * height * len(img.getbands())
+
+
+class LRUCache:
+    """按字节预算淘汰最久未使用条目的线程安全缓存"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, sizeof=len, enabled=True):
+        """
+        Args:
+            max_bytes (int): 缓存的字节预算，为 0 时不缓存任何条目
+            sizeof (callable): 计算单个缓存值字节数的函数
+            enabled (bool): 是否启用缓存
+        """
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.enabled = enabled
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        读取缓存
+
+        Returns:
+            缓存的值，未命中或缓存关闭时返回None
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """写入缓存，超出字节预算时淘汰最久未使用的条目"""
+        if not self.enabled:
+            return
+
+        nbytes = self.sizeof(value)
+        if nbytes > self.max_bytes:
+            # 单个条目超过预算时直接放弃缓存
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存条目（保留命中统计）"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 命中、未命中、淘汰次数以及当前条目数和字节数
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def __len__(self):
+        return len(self._entries)
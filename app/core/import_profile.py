@@ -0,0 +1,176 @@
+"""
+导入耗时统计
+设置环境变量 QRGEN_IMPORT_PROFILE=1 后，install_from_env() 之后导入的每个模块都会记录耗时
+（自身耗时与包含子模块的累计耗时），程序退出时按累计耗时输出到标准错误。
+启动过程中的关键节点（如首个窗口显示）可以用 mark() 记录，随报告一起输出；
+延迟到第一次使用时才导入的后端也会出现在报告中，便于确认它们没有在启动时被加载。
+设置 QRGEN_STARTUP_REPORT=<路径> 时退出前把同样的数据写为 JSON，供 scripts/bench_startup.py 汇总
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+
+ENV_VAR = 'QRGEN_IMPORT_PROFILE'
+REPORT_ENV_VAR = 'QRGEN_STARTUP_REPORT'
+
+# 报告默认列出的模块数
+DEFAULT_LIMIT = 30
+
+_profiler = None
+
+
+class _TimingLoader:
+    """包装原加载器，记录模块执行耗时，其余属性全部转发给原加载器"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.enter()
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.leave(module.__name__, start, time.perf_counter())
+
+
+class ImportProfiler:
+    """
+    位于 sys.meta_path 首位的查找器：本身不查找模块，只把其他查找器返回的加载器包装为计时加载器
+
+    每个线程各自维护导入栈，模块的自身耗时为累计耗时减去其间导入子模块的耗时。
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        # 安装时的系统时间，外部计时工具据此换算进程启动到安装之间的耗时
+        self.origin_wall = time.time()
+        # (模块名, 开始时刻毫秒, 累计毫秒, 自身毫秒)，按导入完成的顺序排列
+        self.records = []
+        # (名称, 时刻毫秒)
+        self.marks = []
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimingLoader(spec.loader, self)
+                return spec
+        return None
+
+    def enter(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        # 每层记录其间子模块的累计耗时
+        stack.append(0.0)
+
+    def leave(self, name, start, end):
+        stack = self._local.stack
+        children = stack.pop()
+        cumulative = (end - start) * 1000
+        if stack:
+            stack[-1] += cumulative
+        self.records.append((name, (start - self.origin) * 1000, cumulative, cumulative - children))
+
+    def mark(self, name):
+        self.marks.append((name, (time.perf_counter() - self.origin) * 1000))
+
+    def summary(self):
+        """
+        Returns:
+            dict: modules 为各模块耗时（毫秒）列表，marks 为关键节点时刻（毫秒）
+        """
+        return {
+            'origin_wall': self.origin_wall,
+            'modules': [
+                {'module': name, 'start_ms': start, 'cumulative_ms': cumulative, 'self_ms': own}
+                for name, start, cumulative, own in self.records
+            ],
+            'marks': [{'name': name, 'ms': at} for name, at in self.marks],
+        }
+
+    def report(self, limit=DEFAULT_LIMIT, file=None):
+        """按累计耗时输出前 limit 个模块和全部关键节点，limit 为None时输出全部"""
+        file = file or sys.stderr
+        records = sorted(self.records, key=lambda record: record[2], reverse=True)
+        if limit is not None:
+            records = records[:limit]
+        total = sum(record[3] for record in self.records)
+        print(f"导入耗时：共 {len(self.records)} 个模块，合计 {total:.1f} ms", file=file)
+        print(f"{'开始':>9} {'累计':>9} {'自身':>9}  模块", file=file)
+        for name, start, cumulative, own in records:
+            print(f"{start:9.1f} {cumulative:9.1f} {own:9.1f}  {name}", file=file)
+        for name, at in self.marks:
+            print(f"{name}: {at:.1f} ms", file=file)
+
+    def write_json(self, path):
+        """把 summary() 写为 JSON 文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False)
+
+
+def install(print_report=True, report_path=None):
+    """
+    安装导入计时，重复调用返回同一个实例
+
+    Args:
+        print_report (bool): 退出时是否向标准错误输出报告
+        report_path (str): 退出时写出 JSON 报告的路径，为None时不写
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+        atexit.register(_finish, _profiler, print_report, report_path)
+    return _profiler
+
+
+def _finish(profiler, print_report, report_path):
+    if print_report:
+        profiler.report()
+    if report_path:
+        profiler.write_json(report_path)
+
+
+def install_from_env():
+    """
+    按环境变量安装导入计时：QRGEN_IMPORT_PROFILE 非空且不为 0 时退出时输出报告，
+    QRGEN_STARTUP_REPORT 给出路径时退出时写出 JSON；两者都未设置时返回None
+    """
+    print_report = os.environ.get(ENV_VAR, '') not in ('', '0')
+    report_path = os.environ.get(REPORT_ENV_VAR) or None
+    if not print_report and not report_path:
+        return None
+    return install(print_report, report_path)
+
+
+def report_requested():
+    """是否为启动基准测试运行：程序就绪后应立即退出，以便写出报告"""
+    return bool(os.environ.get(REPORT_ENV_VAR))
+
+
+def mark(name):
+    """记录启动关键节点，未开启导入计时时不做任何事"""
+    if _profiler is not None:
+        _profiler.mark(name)
+
+
+def profiler():
+    """当前的导入计时实例，未开启时返回None"""
+    return _profiler
@@ -0,0 +1,299 @@
+"""
+分阶段耗时与计数统计
+生成器和识别器在各阶段（分段、编码、掩码选择、渲染、图片编码、写入磁盘、识别等）调用 stage()/count() 记录数据，
+每个阶段的耗时累计为直方图，事件累计为计数器，可导出为 Prometheus 文本格式或 JSON。
+
+默认关闭：关闭时 stage() 返回共享的空上下文管理器，count() 只做一次判断，几乎没有开销。
+调用 enable() 开启；设置环境变量 QRGEN_METRICS=<路径> 后由 install_from_env() 开启，
+程序退出时写出统计（扩展名为 .json 时写 JSON，否则为 Prometheus 文本，路径为 - 时输出到标准错误）。
+多进程批量生成时工作进程的统计随任务结果带回主进程合并。
+
+用法：
+    with metrics.stage('qrcode.render'):
+        img = render_matrix(...)
+    metrics.count('qrcode.cache_hit')
+"""
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+
+
+ENV_VAR = 'QRGEN_METRICS'
+
+# 直方图的桶上限（秒），覆盖 0.1 毫秒到 10 秒
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prometheus 指标名前缀
+PROMETHEUS_PREFIX = 'qrgen'
+
+_registry = None
+
+
+class Histogram:
+    """固定桶的耗时直方图，counts 的最后一项为超出最大桶上限的次数"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, fraction):
+        """由桶估计分位数（秒），返回所在桶的上限，落在最后一个桶时返回最大桶上限"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """各阶段直方图与计数器的集合，多个线程可同时记录"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.histograms = {}
+        self.counters = {}
+        self.created = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self, reset=False):
+        """
+        导出可序列化的原始数据，供合并或写出
+
+        Args:
+            reset (bool): 导出后清空，用于工作进程把增量交给主进程
+        """
+        with self._lock:
+            data = {
+                'buckets': list(self.buckets),
+                'histograms': {
+                    name: {'counts': list(h.counts), 'sum': h.sum, 'count': h.count}
+                    for name, h in self.histograms.items()
+                },
+                'counters': dict(self.counters),
+            }
+            if reset:
+                self.histograms.clear()
+                self.counters.clear()
+        return data
+
+    def merge(self, data):
+        """合并 snapshot() 的结果，桶必须一致"""
+        if list(data['buckets']) != list(self.buckets):
+            raise ValueError("直方图的桶不一致，无法合并")
+        with self._lock:
+            for name, item in data['histograms'].items():
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram(self.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, item['counts'])]
+                histogram.sum += item['sum']
+                histogram.count += item['count']
+            for name, value in data['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self):
+        """便于阅读的 JSON 数据：各阶段的次数、总耗时、平均值和由桶估计的分位数（毫秒）"""
+        with self._lock:
+            stages = {}
+            for name, h in sorted(self.histograms.items()):
+                stages[name] = {
+                    'count': h.count,
+                    'total_ms': round(h.sum * 1000, 3),
+                    'mean_ms': round(h.sum * 1000 / h.count, 4) if h.count else 0.0,
+                    'p50_ms': round(h.quantile(0.50) * 1000, 4),
+                    'p90_ms': round(h.quantile(0.90) * 1000, 4),
+                    'p99_ms': round(h.quantile(0.99) * 1000, 4),
+                    'buckets': {_format_bound(bound): count for bound, count in zip(h.buckets, h.counts)},
+                    'overflow': h.counts[-1],
+                }
+            return {
+                'created': self.created,
+                'uptime_seconds': round(time.time() - self.created, 3),
+                'stages': stages,
+                'counters': dict(sorted(self.counters.items())),
+            }
+
+    def prometheus_text(self, prefix=PROMETHEUS_PREFIX):
+        """Prometheus 文本格式：各阶段耗时为带 stage 标签的直方图，计数器带 event 标签"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each generation or scanning stage.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                label = _escape_label(name)
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="{_format_bound(bound)}"}} '
+                                 f'{cumulative}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {h.count}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {h.sum!r}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{label}"}} {h.count}')
+            lines.append(f"# HELP {prefix}_events_total Number of events such as cache hits, errors and bytes written.")
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{_escape_label(name)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """写出统计：扩展名为 .json 时写 JSON，否则为 Prometheus 文本；路径为 - 时输出到标准错误"""
+        is_json = path.lower().endswith('.json')
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + '\n' if is_json else self.prometheus_text()
+        if path == '-':
+            sys.stderr.write(text)
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Stage:
+    """计时上下文管理器，退出时把耗时记入对应阶段的直方图（出错时也记录）"""
+
+    __slots__ = ('_registry', '_name', '_start')
+
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._registry.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _NullStage:
+    """关闭统计时使用的空上下文管理器"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def enable(buckets=DEFAULT_BUCKETS):
+    """开启统计，重复调用返回同一个实例"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry(buckets)
+    return _registry
+
+
+def disable():
+    """关闭统计并丢弃已有数据"""
+    global _registry
+    _registry = None
+
+
+def enabled():
+    return _registry is not None
+
+
+def registry():
+    """当前的统计实例，未开启时返回None"""
+    return _registry
+
+
+def stage(name):
+    """
+    阶段计时，用作上下文管理器
+
+    Args:
+        name (str): 阶段名称，形如 模块.阶段（如 qrcode.encode）
+    """
+    if _registry is None:
+        return _NULL_STAGE
+    return _Stage(_registry, name)
+
+
+def observe(name, seconds):
+    """直接记录一次已经测得的阶段耗时"""
+    if _registry is not None:
+        _registry.observe(name, seconds)
+
+
+def count(name, value=1):
+    """累加计数器"""
+    if _registry is not None:
+        _registry.count(name, value)
+
+
+def drain():
+    """取出并清空当前统计，未开启时返回None（工作进程用于把增量交给主进程）"""
+    if _registry is None:
+        return None
+    return _registry.snapshot(reset=True)
+
+
+def merge(data):
+    """合并其他进程的统计，未开启或 data 为 None 时不做任何事"""
+    if _registry is not None and data is not None:
+        _registry.merge(data)
+
+
+def install_from_env():
+    """
+    按环境变量开启统计：QRGEN_METRICS 给出路径时开启，并在退出时写出；未设置时返回None
+    """
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    if _registry is None:
+        atexit.register(_finish, path)
+    return enable()
+
+
+def _finish(path):
+    if _registry is not None:
+        _registry.write(path)
@@ -0,0 +1,333 @@
+"""
+批量输出
+批量生成的文件由独立的写入线程写入目录、ZIP 或 TAR，生成端只负责产出文件内容，
+两者之间用有界队列衔接，内存占用与批量规模无关。
+续传时目录直接保留已有文件，ZIP/TAR 以追加方式打开；归档因进程崩溃而损坏时重新创建。
+各输出目标提供已有文件的字节数和 SHA-256 摘要，续传时与清单比对，确认已有文件完整
+"""
+import hashlib
+import io
+import os
+import queue
+import shutil
+import tarfile
+import threading
+import time
+import warnings
+import zipfile
+
+from . import metrics
+
+
+# 支持的输出方式
+SINK_TYPES = ('dir', 'zip', 'tar')
+
+
+def output_digest(data):
+    """输出文件内容的 SHA-256 摘要，记入清单供续传时校验"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class DirectorySink:
+    """每个文件单独写入输出目录"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = output_dir
+
+    def open(self, resume=False):
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def existing_size(self, name):
+        """已有同名文件的字节数，不存在时返回None"""
+        try:
+            return os.stat(os.path.join(self.output_dir, name)).st_size
+        except OSError:
+            return None
+
+    def existing_digest(self, name):
+        """已有同名文件内容的摘要，不存在时返回None"""
+        try:
+            with open(os.path.join(self.output_dir, name), 'rb') as f:
+                return output_digest(f.read())
+        except OSError:
+            return None
+
+    def write(self, name, data):
+        """
+        先写入同目录的临时文件再替换目标，目标是去重建立的硬链接时只断开链接，
+        不会改写与之共享数据的其他文件
+        """
+        path = os.path.join(self.output_dir, name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def link(self, name, target):
+        """重复内容建立硬链接，文件系统不支持时复制文件"""
+        path = os.path.join(self.output_dir, name)
+        target_path = os.path.join(self.output_dir, target)
+        if os.path.lexists(path):
+            os.remove(path)
+        try:
+            os.link(target_path, path)
+        except OSError:
+            shutil.copyfile(target_path, path)
+        return True
+
+    def close(self):
+        pass
+
+
+class ZipSink:
+    """
+    流式写入 ZIP 文件
+
+    图片本身已经压缩，默认按 ZIP_STORED 存储；每个条目写完即落盘，
+    内存中只保留中央目录的少量元数据。中央目录在关闭时写入，
+    正常结束或取消的归档可以追加续传，崩溃后残缺的归档只能重新生成；
+    续传时需要替换的条目以同名条目追加。
+    """
+
+    def __init__(self, path, compression=zipfile.ZIP_STORED):
+        self.path = path
+        self.compression = compression
+        self._zip = None
+        self._existing = {}
+
+    def open(self, resume=False):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._existing = {}
+        if resume and os.path.exists(self.path):
+            try:
+                self._zip = zipfile.ZipFile(self.path, 'a', compression=self.compression, allowZip64=True)
+                self._existing = {info.filename: info.file_size for info in self._zip.infolist()}
+                return
+            except zipfile.BadZipFile:
+                pass
+        self._zip = zipfile.ZipFile(self.path, 'w', compression=self.compression, allowZip64=True)
+
+    def existing_size(self, name):
+        """归档中已有同名条目的字节数，不存在时返回None"""
+        return self._existing.get(name)
+
+    def existing_digest(self, name):
+        """归档中已有同名条目（同名时为最后一个）内容的摘要，不存在或无法读取时返回None"""
+        if name not in self._existing:
+            return None
+        try:
+            return output_digest(self._zip.read(name))
+        except (zipfile.BadZipFile, OSError):
+            return None
+
+    def write(self, name, data):
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = self.compression
+        with warnings.catch_warnings():
+            # 续传时内容有变化的条目会以同名条目追加到归档末尾，解压时以最后一个为准
+            warnings.filterwarnings('ignore', message='Duplicate name', category=UserWarning)
+            self._zip.writestr(info, data)
+
+    def link(self, name, target):
+        """ZIP 没有链接条目，重复内容只在清单中记录引用"""
+        return False
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+class TarSink:
+    """
+    流式写入 TAR 文件（不压缩）
+
+    续传时以追加方式打开，需要替换的条目以同名条目追加，解包时以最后一个为准；
+    崩溃后残缺的归档无法追加，重新生成。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._tar = None
+        self._existing = {}
+
+    def open(self, resume=False):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._existing = {}
+        if resume and os.path.exists(self.path):
+            try:
+                # 追加模式不能读取条目内容，先以只读方式读出已有条目的摘要
+                self._existing = self._read_existing()
+                self._tar = tarfile.open(self.path, 'a')
+                return
+            except (tarfile.TarError, OSError):
+                self._existing = {}
+        self._tar = tarfile.open(self.path, 'w')
+
+    def _read_existing(self):
+        """已有条目：名称 -> (字节数, 摘要)，链接条目取链接目标的内容，同名条目以最后一个为准"""
+        existing = {}
+        with tarfile.open(self.path, 'r') as tar:
+            for member in tar:
+                if member.islnk():
+                    target = existing.get(member.linkname)
+                    existing[member.name] = (member.size, target[1] if target else None)
+                elif member.isfile():
+                    existing[member.name] = (member.size, output_digest(tar.extractfile(member).read()))
+        return existing
+
+    def existing_size(self, name):
+        """归档中已有同名条目的字节数，不存在时返回None"""
+        entry = self._existing.get(name)
+        return entry[0] if entry else None
+
+    def existing_digest(self, name):
+        """归档中已有同名条目内容的摘要，链接条目为链接目标的摘要，不存在时返回None"""
+        entry = self._existing.get(name)
+        return entry[1] if entry else None
+
+    def write(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def link(self, name, target):
+        """重复内容写为硬链接条目，解包时还原为链接到 target 的文件"""
+        info = tarfile.TarInfo(name)
+        info.type = tarfile.LNKTYPE
+        info.linkname = target
+        info.mtime = int(time.time())
+        self._tar.addfile(info)
+        return True
+
+    def close(self):
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+
+def create_sink(sink_type, output_dir, archive_name):
+    """
+    创建输出目标
+
+    Args:
+        sink_type (str): 'dir'、'zip' 或 'tar'
+        output_dir (str): 输出目录
+        archive_name (str): 归档文件名（不含扩展名），仅 zip/tar 使用
+
+    Returns:
+        输出目标对象，提供 open/existing_size/existing_digest/write/link/close 方法和 path 属性
+    """
+    if sink_type == 'dir':
+        return DirectorySink(output_dir)
+    if sink_type == 'zip':
+        return ZipSink(os.path.join(output_dir, f"{archive_name}.zip"))
+    if sink_type == 'tar':
+        return TarSink(os.path.join(output_dir, f"{archive_name}.tar"))
+    raise ValueError(f"不支持的输出方式: {sink_type}")
+
+
+class SinkWriter:
+    """
+    写入线程
+
+    生成端通过 put 提交 (文件名, 内容)，队列满时阻塞等待，从而限制在途数据量；
+    写入出错后后续的 put 和 close 会抛出该错误。
+    给出清单时，每个文件写入成功后再追加清单记录，清单中的条目一定已经写出。
+    重复内容通过 put_link 提交，按队列顺序处理，引用的文件总是先于链接写出。
+    """
+
+    def __init__(self, sink, max_pending=64, manifest=None):
+        """
+        Args:
+            sink: 输出目标
+            max_pending (int): 队列中最多等待写入的文件数
+            manifest (BatchManifest): 批量清单，需已打开
+        """
+        self.sink = sink
+        self.manifest = manifest
+        self.bytes_written = 0
+        self.files_written = 0
+        self.links_written = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='batch-sink-writer', daemon=True)
+
+    def start(self, resume=False):
+        self.sink.open(resume)
+        self._thread.start()
+        return self
+
+    def put(self, name, data, entry=None):
+        """
+        提交一个待写入的文件
+
+        Args:
+            name (str): 文件名
+            data (bytes): 文件内容
+            entry (tuple): 清单记录 (序号, 内容摘要) 或 (序号, 内容摘要, 编码耗时毫秒)，没有清单时忽略
+        """
+        if self._error is not None:
+            raise self._error
+        # 队列满时在这里等待，耗时明显说明写入跟不上生成
+        with metrics.stage('batch.queue_wait'):
+            self._queue.put((name, data, len(data), entry, None))
+
+    def put_link(self, name, target, size, entry=None):
+        """
+        提交一个与已提交文件内容相同的重复条目
+
+        Args:
+            name (str): 文件名
+            target (str): 内容相同的文件名
+            size (int): 文件字节数，记入清单
+            entry (tuple): 清单记录 (序号, 内容摘要)，没有清单时忽略
+        """
+        if self._error is not None:
+            raise self._error
+        self._queue.put((name, None, size, entry, target))
+
+    def close(self):
+        """等待队列写完并关闭输出目标"""
+        if self._thread.ident is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self.sink.close()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self._error is not None:
+                # 出错后只消费队列，避免生成端阻塞
+                continue
+            name, data, size, entry, target = item
+            try:
+                output = linked = None
+                if target is None:
+                    with metrics.stage('batch.write'):
+                        self.sink.write(name, data)
+                    output = output_digest(data)
+                    self.bytes_written += size
+                    self.files_written += 1
+                    metrics.count('batch.bytes_written', size)
+                else:
+                    with metrics.stage('batch.link'):
+                        linked = self.sink.link(name, target)
+                    self.links_written += 1
+                if self.manifest is not None and entry is not None:
+                    index, digest = entry[:2]
+                    encode_ms = entry[2] if len(entry) > 2 else None
+                    self.manifest.record(index, name, digest, size, target, encode_ms, output, linked)
+            except Exception as e:
+                self._error = e
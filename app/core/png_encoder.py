@@ -0,0 +1,113 @@
+"""
+PNG 编码
+二维码和条形码只有黑白两色，直接按 1 位灰度 PNG 写出：每行用 numpy 打包为字节后整体交给 zlib，
+压缩等级与策略可调，以便在文件大小与编码耗时之间取舍
+"""
+import io
+import struct
+import zlib
+
+import numpy as np
+
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# zlib 压缩策略
+PNG_STRATEGIES = {
+    'default': zlib.Z_DEFAULT_STRATEGY,
+    'filtered': zlib.Z_FILTERED,
+    'huffman': zlib.Z_HUFFMAN_ONLY,
+    'rle': zlib.Z_RLE,
+    'fixed': zlib.Z_FIXED,
+}
+
+DEFAULT_COMPRESS_LEVEL = 6
+DEFAULT_STRATEGY = 'default'
+
+# 不做长距离匹配的策略：与上一行相同的行改用 Up 过滤（全零），否则重复行无法被压缩
+_UP_FILTER_STRATEGIES = ('huffman', 'rle')
+
+# 灰度图转黑白的阈值（条形码文字的抗锯齿边缘按此取舍）
+_BILEVEL_THRESHOLD = 128
+
+
+def bilevel_pixels(img):
+    """
+    取出黑白图片的像素
+
+    Args:
+        img (PIL.Image): 图片
+
+    Returns:
+        numpy.ndarray: 布尔数组，True 表示白色；彩色图片返回None
+    """
+    if img.mode == '1':
+        return np.asarray(img)
+    if img.mode == 'L':
+        return np.asarray(img) >= _BILEVEL_THRESHOLD
+    return None
+
+
+def _chunk(chunk_type, data):
+    """PNG 数据块：长度 + 类型 + 数据 + CRC"""
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def encode_bilevel(pixels, compress_level=DEFAULT_COMPRESS_LEVEL, strategy=DEFAULT_STRATEGY):
+    """
+    把布尔像素数组编码为 1 位灰度 PNG
+
+    每行前加过滤类型 0（不过滤），黑白图片重复行多，直接交给 zlib 即可压得很小；
+    huffman、rle 策略下与上一行相同的行改用 Up 过滤。
+
+    Args:
+        pixels (numpy.ndarray): 布尔数组，True 表示白色
+        compress_level (int): zlib 压缩等级 0-9
+        strategy (str): 压缩策略，见 PNG_STRATEGIES
+
+    Returns:
+        bytes: PNG 文件内容
+    """
+    if strategy not in PNG_STRATEGIES:
+        raise ValueError(f"不支持的压缩策略: {strategy}")
+    if not 0 <= compress_level <= 9:
+        raise ValueError(f"压缩等级必须在 0-9 之间: {compress_level}")
+
+    height, width = pixels.shape
+    rows = np.packbits(pixels, axis=1)
+    filters = np.zeros((height, 1), dtype=np.uint8)
+    if strategy in _UP_FILTER_STRATEGIES:
+        repeated = np.zeros(height, dtype=bool)
+        repeated[1:] = (rows[1:] == rows[:-1]).all(axis=1)
+        rows[repeated] = 0
+        filters[repeated] = 2
+    raw = np.hstack([filters, rows]).tobytes()
+
+    compressor = zlib.compressobj(compress_level, zlib.DEFLATED, 15, 9, PNG_STRATEGIES[strategy])
+    data = compressor.compress(raw) + compressor.flush()
+
+    header = struct.pack('>IIBBBBB', width, height, 1, 0, 0, 0, 0)
+    return _PNG_SIGNATURE + _chunk(b'IHDR', header) + _chunk(b'IDAT', data) + _chunk(b'IEND', b'')
+
+
+def encode_png(img, compress_level=DEFAULT_COMPRESS_LEVEL, strategy=DEFAULT_STRATEGY):
+    """
+    把图片编码为 PNG：黑白图片输出 1 位灰度，彩色图片（如彩色个性化二维码）交给 PIL 按相同参数压缩
+
+    Args:
+        img (PIL.Image): 图片
+        compress_level (int): zlib 压缩等级 0-9
+        strategy (str): 压缩策略，见 PNG_STRATEGIES
+
+    Returns:
+        bytes: PNG 文件内容
+    """
+    pixels = bilevel_pixels(img)
+    if pixels is not None:
+        return encode_bilevel(pixels, compress_level, strategy)
+
+    if strategy not in PNG_STRATEGIES:
+        raise ValueError(f"不支持的压缩策略: {strategy}")
+    fp = io.BytesIO()
+    img.save(fp, 'PNG', compress_level=compress_level, compress_type=PNG_STRATEGIES[strategy])
+    return fp.getvalue()
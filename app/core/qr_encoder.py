@@ -0,0 +1,625 @@
+"""
+二维码编码器
+导入时即准备好伽罗瓦域对数/反对数表和各纠错码字数对应的 Reed-Solomon 生成多项式乘法表，
+分块、纠错码计算、交织与模块布置都以数组运算完成，
+输出的模块矩阵与 qrcode 库（相同分段、相同纠错等级时）逐位一致，修改后需通过 scripts/check_encoder.py
+"""
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from . import metrics
+from .qr_mask import best_mask
+
+# 编码模式，取值即模式指示符
+MODE_NUMBER = 1
+MODE_ALPHA_NUM = 2
+MODE_BYTE = 4
+MODE_KANJI = 8
+
+# 纠错等级在格式信息中的取值
+ERROR_CORRECT = {'L': 1, 'M': 0, 'Q': 3, 'H': 2}
+# 纠错等级在分块表中的列序号
+_ECC_INDEX = {'L': 0, 'M': 1, 'Q': 2, 'H': 3}
+
+ALPHA_NUM = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+
+# 字符计数指示符位数：版本 1-9、10-26、27-40 三档
+_COUNT_BITS = {
+    MODE_NUMBER: (10, 12, 14),
+    MODE_ALPHA_NUM: (9, 11, 13),
+    MODE_BYTE: (8, 16, 16),
+    MODE_KANJI: (8, 10, 12),
+}
+
+# 纠错分块表：每个版本依次为 L、M、Q、H，
+# 每项为 (每块纠错码字数, 第一组块数, 第一组每块数据码字数[, 第二组块数, 第二组每块数据码字数])
+_EC_BLOCKS = (
+    None,
+    ((7, 1, 19), (10, 1, 16), (13, 1, 13), (17, 1, 9)),  # 1
+    ((10, 1, 34), (16, 1, 28), (22, 1, 22), (28, 1, 16)),  # 2
+    ((15, 1, 55), (26, 1, 44), (18, 2, 17), (22, 2, 13)),  # 3
+    ((20, 1, 80), (18, 2, 32), (26, 2, 24), (16, 4, 9)),  # 4
+    ((26, 1, 108), (24, 2, 43), (18, 2, 15, 2, 16), (22, 2, 11, 2, 12)),  # 5
+    ((18, 2, 68), (16, 4, 27), (24, 4, 19), (28, 4, 15)),  # 6
+    ((20, 2, 78), (18, 4, 31), (18, 2, 14, 4, 15), (26, 4, 13, 1, 14)),  # 7
+    ((24, 2, 97), (22, 2, 38, 2, 39), (22, 4, 18, 2, 19), (26, 4, 14, 2, 15)),  # 8
+    ((30, 2, 116), (22, 3, 36, 2, 37), (20, 4, 16, 4, 17), (24, 4, 12, 4, 13)),  # 9
+    ((18, 2, 68, 2, 69), (26, 4, 43, 1, 44), (24, 6, 19, 2, 20), (28, 6, 15, 2, 16)),  # 10
+    ((20, 4, 81), (30, 1, 50, 4, 51), (28, 4, 22, 4, 23), (24, 3, 12, 8, 13)),  # 11
+    ((24, 2, 92, 2, 93), (22, 6, 36, 2, 37), (26, 4, 20, 6, 21), (28, 7, 14, 4, 15)),  # 12
+    ((26, 4, 107), (22, 8, 37, 1, 38), (24, 8, 20, 4, 21), (22, 12, 11, 4, 12)),  # 13
+    ((30, 3, 115, 1, 116), (24, 4, 40, 5, 41), (20, 11, 16, 5, 17), (24, 11, 12, 5, 13)),  # 14
+    ((22, 5, 87, 1, 88), (24, 5, 41, 5, 42), (30, 5, 24, 7, 25), (24, 11, 12, 7, 13)),  # 15
+    ((24, 5, 98, 1, 99), (28, 7, 45, 3, 46), (24, 15, 19, 2, 20), (30, 3, 15, 13, 16)),  # 16
+    ((28, 1, 107, 5, 108), (28, 10, 46, 1, 47), (28, 1, 22, 15, 23), (28, 2, 14, 17, 15)),  # 17
+    ((30, 5, 120, 1, 121), (26, 9, 43, 4, 44), (28, 17, 22, 1, 23), (28, 2, 14, 19, 15)),  # 18
+    ((28, 3, 113, 4, 114), (26, 3, 44, 11, 45), (26, 17, 21, 4, 22), (26, 9, 13, 16, 14)),  # 19
+    ((28, 3, 107, 5, 108), (26, 3, 41, 13, 42), (30, 15, 24, 5, 25), (28, 15, 15, 10, 16)),  # 20
+    ((28, 4, 116, 4, 117), (26, 17, 42), (28, 17, 22, 6, 23), (30, 19, 16, 6, 17)),  # 21
+    ((28, 2, 111, 7, 112), (28, 17, 46), (30, 7, 24, 16, 25), (24, 34, 13)),  # 22
+    ((30, 4, 121, 5, 122), (28, 4, 47, 14, 48), (30, 11, 24, 14, 25), (30, 16, 15, 14, 16)),  # 23
+    ((30, 6, 117, 4, 118), (28, 6, 45, 14, 46), (30, 11, 24, 16, 25), (30, 30, 16, 2, 17)),  # 24
+    ((26, 8, 106, 4, 107), (28, 8, 47, 13, 48), (30, 7, 24, 22, 25), (30, 22, 15, 13, 16)),  # 25
+    ((28, 10, 114, 2, 115), (28, 19, 46, 4, 47), (28, 28, 22, 6, 23), (30, 33, 16, 4, 17)),  # 26
+    ((30, 8, 122, 4, 123), (28, 22, 45, 3, 46), (30, 8, 23, 26, 24), (30, 12, 15, 28, 16)),  # 27
+    ((30, 3, 117, 10, 118), (28, 3, 45, 23, 46), (30, 4, 24, 31, 25), (30, 11, 15, 31, 16)),  # 28
+    ((30, 7, 116, 7, 117), (28, 21, 45, 7, 46), (30, 1, 23, 37, 24), (30, 19, 15, 26, 16)),  # 29
+    ((30, 5, 115, 10, 116), (28, 19, 47, 10, 48), (30, 15, 24, 25, 25), (30, 23, 15, 25, 16)),  # 30
+    ((30, 13, 115, 3, 116), (28, 2, 46, 29, 47), (30, 42, 24, 1, 25), (30, 23, 15, 28, 16)),  # 31
+    ((30, 17, 115), (28, 10, 46, 23, 47), (30, 10, 24, 35, 25), (30, 19, 15, 35, 16)),  # 32
+    ((30, 17, 115, 1, 116), (28, 14, 46, 21, 47), (30, 29, 24, 19, 25), (30, 11, 15, 46, 16)),  # 33
+    ((30, 13, 115, 6, 116), (28, 14, 46, 23, 47), (30, 44, 24, 7, 25), (30, 59, 16, 1, 17)),  # 34
+    ((30, 12, 121, 7, 122), (28, 12, 47, 26, 48), (30, 39, 24, 14, 25), (30, 22, 15, 41, 16)),  # 35
+    ((30, 6, 121, 14, 122), (28, 6, 47, 34, 48), (30, 46, 24, 10, 25), (30, 2, 15, 64, 16)),  # 36
+    ((30, 17, 122, 4, 123), (28, 29, 46, 14, 47), (30, 49, 24, 10, 25), (30, 24, 15, 46, 16)),  # 37
+    ((30, 4, 122, 18, 123), (28, 13, 46, 32, 47), (30, 48, 24, 14, 25), (30, 42, 15, 32, 16)),  # 38
+    ((30, 20, 117, 4, 118), (28, 40, 47, 7, 48), (30, 43, 24, 22, 25), (30, 10, 15, 67, 16)),  # 39
+    ((30, 19, 118, 6, 119), (28, 18, 47, 31, 48), (30, 34, 24, 34, 25), (30, 20, 15, 61, 16)),  # 40
+)
+
+_PAD_BYTES = (0xEC, 0x11)
+
+EncodedQR = namedtuple('EncodedQR', ['modules', 'version', 'ecc', 'mask'])
+
+
+# ==================== 导入时预计算的表 ====================
+
+def _build_gf_tables():
+    """构建 GF(256)（本原多项式 0x11D）的反对数表和对数表"""
+    exp = np.zeros(512, dtype=np.int32)
+    log = np.zeros(256, dtype=np.int32)
+    value = 1
+    for i in range(255):
+        exp[i] = value
+        log[value] = i
+        value <<= 1
+        if value & 0x100:
+            value ^= 0x11D
+    # 反对数表延长一倍，两个对数相加后无需取模
+    exp[255:510] = exp[:255]
+    return exp, log
+
+
+GF_EXP, GF_LOG = _build_gf_tables()
+
+
+def _gf_multiply_table():
+    """256×256 的伽罗瓦域乘法表"""
+    log = GF_LOG[1:]
+    table = np.zeros((256, 256), dtype=np.uint8)
+    table[1:, 1:] = GF_EXP[log[:, None] + log[None, :]]
+    return table
+
+
+_GF_MUL = _gf_multiply_table()
+
+
+def _generator_polynomial(degree):
+    """计算 (x - α^0)(x - α^1)...(x - α^(degree-1))，系数从高次到低次"""
+    poly = np.array([1], dtype=np.uint8)
+    for i in range(degree):
+        shifted = np.append(poly, 0)
+        shifted[1:] ^= _GF_MUL[poly, GF_EXP[i]]
+        poly = shifted
+    return poly
+
+
+def _build_rs_tables():
+    """
+    为分块表中出现的每种纠错码字数准备乘法查找表
+
+    表的第 f 行为生成多项式（去掉首项）乘以 f 的结果，
+    多项式除法的每一步只需一次查表和一次异或。
+    """
+    degrees = sorted({entry[0] for row in _EC_BLOCKS[1:] for entry in row})
+    tables = {}
+    for degree in degrees:
+        generator = _generator_polynomial(degree)[1:]
+        tables[degree] = _GF_MUL[:, generator]
+    return tables
+
+
+RS_GENERATOR_TABLES = _build_rs_tables()
+
+
+def _build_block_layouts():
+    """展开分块表为 [(每块数据码字数, 每块纠错码字数), ...]"""
+    layouts = {}
+    for version in range(1, 41):
+        for ecc, index in _ECC_INDEX.items():
+            entry = _EC_BLOCKS[version][index]
+            ec_count = entry[0]
+            blocks = []
+            for j in range(1, len(entry), 2):
+                blocks += [entry[j + 1]] * entry[j]
+            layouts[version, ecc] = (blocks, ec_count)
+    return layouts
+
+
+_BLOCK_LAYOUTS = _build_block_layouts()
+
+# 每个版本、纠错等级可用的数据位数
+DATA_BITS = {key: 8 * sum(blocks) for key, (blocks, _) in _BLOCK_LAYOUTS.items()}
+
+
+def _bch_remainder(data, generator, degree):
+    """计算 BCH 码的校验位"""
+    value = data << degree
+    top = generator.bit_length() - 1
+    for shift in range(value.bit_length() - 1 - top, -1, -1):
+        if value & (1 << (shift + top)):
+            value ^= generator << shift
+    return value
+
+
+# 格式信息：下标为 (纠错等级取值 << 3) | 掩码
+FORMAT_BITS = tuple(((data << 10) | _bch_remainder(data, 0x537, 10)) ^ 0x5412 for data in range(32))
+# 版本信息：版本 7 起才有
+VERSION_BITS = tuple((v << 12) | _bch_remainder(v, 0x1F25, 12) if v >= 7 else 0 for v in range(41))
+
+# 字母数字模式的字符取值表
+_ALPHA_NUM_VALUES = np.full(256, -1, dtype=np.int64)
+_ALPHA_NUM_VALUES[np.frombuffer(ALPHA_NUM, dtype=np.uint8)] = np.arange(len(ALPHA_NUM))
+
+
+# ==================== 数据编码 ====================
+
+def count_bits(mode, version):
+    """字符计数指示符的位数"""
+    return _COUNT_BITS[mode][0 if version < 10 else 1 if version < 27 else 2]
+
+
+def segment_length(mode, data):
+    """分段的字符数"""
+    return len(data) // 2 if mode == MODE_KANJI else len(data)
+
+
+def segment_data_bits(mode, length):
+    """分段数据部分（不含模式和计数指示符）的位数"""
+    if mode == MODE_NUMBER:
+        return 10 * (length // 3) + (0, 4, 7)[length % 3]
+    if mode == MODE_ALPHA_NUM:
+        return 11 * (length // 2) + 6 * (length % 2)
+    if mode == MODE_KANJI:
+        return 13 * length
+    return 8 * length
+
+
+def segments_bits(segments, version):
+    """分段在指定版本下的总位数"""
+    return sum(
+        4 + count_bits(mode, version) + segment_data_bits(mode, segment_length(mode, data))
+        for mode, data in segments
+    )
+
+
+def _segment_fields(mode, data):
+    """把分段数据转换为 (取值数组, 位数数组)"""
+    raw = np.frombuffer(data, dtype=np.uint8).astype(np.int64)
+
+    if mode == MODE_NUMBER:
+        digits = raw - 48
+        full = len(digits) // 3 * 3
+        values = digits[:full].reshape(-1, 3) @ np.array([100, 10, 1])
+        lengths = np.full(len(values), 10)
+        rest = len(digits) - full
+        if rest:
+            tail = digits[full:]
+            values = np.append(values, int(tail @ np.array([10, 1][-rest:])))
+            lengths = np.append(lengths, (0, 4, 7)[rest])
+        return values, lengths
+
+    if mode == MODE_ALPHA_NUM:
+        chars = _ALPHA_NUM_VALUES[raw]
+        full = len(chars) // 2 * 2
+        values = chars[:full].reshape(-1, 2) @ np.array([45, 1])
+        lengths = np.full(len(values), 11)
+        if len(chars) > full:
+            values = np.append(values, chars[-1])
+            lengths = np.append(lengths, 6)
+        return values, lengths
+
+    if mode == MODE_KANJI:
+        codes = raw[0::2] << 8 | raw[1::2]
+        codes = codes - np.where(codes >= 0xE040, 0xC140, 0x8140)
+        values = (codes >> 8) * 0xC0 + (codes & 0xFF)
+        return values, np.full(len(values), 13)
+
+    return raw, np.full(len(raw), 8)
+
+
+def _fields_to_bits(values, lengths):
+    """把若干 (取值, 位数) 字段按高位在前展开为位数组"""
+    values = np.asarray(values, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    owner = np.repeat(np.arange(len(values)), lengths)
+    ends = np.cumsum(lengths)
+    shifts = ends[owner] - 1 - np.arange(int(ends[-1]) if len(ends) else 0)
+    return ((values[owner] >> shifts) & 1).astype(np.uint8)
+
+
+def _encode_bits(segments, version):
+    """把分段编码为位数组"""
+    values = []
+    lengths = []
+    for mode, data in segments:
+        values.append([mode, segment_length(mode, data)])
+        lengths.append([4, count_bits(mode, version)])
+        seg_values, seg_lengths = _segment_fields(mode, data)
+        values.append(seg_values)
+        lengths.append(seg_lengths)
+    if not values:
+        return np.zeros(0, dtype=np.uint8)
+    return _fields_to_bits(np.concatenate(values), np.concatenate(lengths))
+
+
+def _data_codewords(segments, version, ecc):
+    """生成填充后的数据码字"""
+    bits = _encode_bits(segments, version)
+    bit_limit = DATA_BITS[version, ecc]
+    if len(bits) > bit_limit:
+        raise ValueError(f"内容过长：需要 {len(bits)} 位，版本 {version} 最多 {bit_limit} 位")
+
+    # 终止符（最多 4 个 0）后补齐到整字节
+    terminated = len(bits) + min(bit_limit - len(bits), 4)
+    padded_length = (terminated + 7) // 8 * 8
+    bits = np.concatenate((bits, np.zeros(padded_length - len(bits), dtype=np.uint8)))
+    codewords = np.packbits(bits)
+
+    # 交替填充 0xEC、0x11 直到数据码字用完
+    pad_count = bit_limit // 8 - len(codewords)
+    pad = np.resize(np.array(_PAD_BYTES, dtype=np.uint8), pad_count)
+    return np.concatenate((codewords, pad))
+
+
+def _rs_remainders(blocks, ec_count):
+    """
+    对所有数据块同时做多项式除法，得到各块纠错码字
+
+    Args:
+        blocks (numpy.ndarray): 形状为 (块数, 最大数据码字数) 的数据块，短块在前面补 0
+        ec_count (int): 每块纠错码字数
+
+    Returns:
+        numpy.ndarray: 形状为 (块数, ec_count) 的纠错码字
+    """
+    table = RS_GENERATOR_TABLES[ec_count]
+    data_count = blocks.shape[1]
+    work = np.zeros((blocks.shape[0], data_count + ec_count), dtype=np.uint8)
+    work[:, :data_count] = blocks
+    for i in range(data_count):
+        work[:, i + 1:i + 1 + ec_count] ^= table[work[:, i]]
+    return work[:, data_count:]
+
+
+def _interleave(codewords, version, ecc):
+    """分块、计算纠错码并交织，返回最终码字序列"""
+    block_sizes, ec_count = _BLOCK_LAYOUTS[version, ecc]
+    sizes = np.array(block_sizes)
+    max_size = int(sizes.max())
+
+    # 数据块按行存放，短块右侧留空（valid 标记有效位置）
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    columns = np.arange(max_size)
+    valid = columns[None, :] < sizes[:, None]
+    index = np.where(valid, offsets[:, None] + columns[None, :], 0)
+    data_blocks = np.where(valid, codewords[index], 0).astype(np.uint8)
+
+    # 多项式除法时短块在左侧补 0，前导 0 不影响余数
+    aligned = np.zeros_like(data_blocks)
+    for row, size in enumerate(block_sizes):
+        aligned[row, max_size - size:] = data_blocks[row, :size]
+    ec_blocks = _rs_remainders(aligned, ec_count)
+
+    # 按列读取实现交织，跳过短块的空位
+    interleaved_data = data_blocks.T[valid.T]
+    interleaved_ec = ec_blocks.T.ravel()
+    return np.concatenate((interleaved_data, interleaved_ec))
+
+
+# ==================== 模块布局 ====================
+
+class _VersionLayout:
+    """某个版本的固定图形、数据模块位置和掩码取值，首次使用时计算后缓存"""
+
+    def __init__(self, version):
+        self.version = version
+        n = self.size = version * 4 + 17
+
+        # -1 表示尚未占用
+        grid = np.full((n, n), -1, dtype=np.int8)
+
+        # 定位图形及分隔符
+        for row, col in ((0, 0), (n - 7, 0), (0, n - 7)):
+            for r in range(-1, 8):
+                if not 0 <= row + r < n:
+                    continue
+                for c in range(-1, 8):
+                    if not 0 <= col + c < n:
+                        continue
+                    dark = (0 <= r <= 6 and c in (0, 6)) or (0 <= c <= 6 and r in (0, 6)) \
+                        or (2 <= r <= 4 and 2 <= c <= 4)
+                    grid[row + r, col + c] = dark
+
+        # 校正图形
+        positions = _alignment_positions(version)
+        for row in positions:
+            for col in positions:
+                if grid[row, col] != -1:
+                    continue
+                for r in range(-2, 3):
+                    for c in range(-2, 3):
+                        grid[row + r, col + c] = r in (-2, 2) or c in (-2, 2) or (r == 0 and c == 0)
+
+        # 定时图形
+        for i in range(8, n - 8):
+            if grid[i, 6] == -1:
+                grid[i, 6] = i % 2 == 0
+            if grid[6, i] == -1:
+                grid[6, i] = i % 2 == 0
+
+        # 格式信息位置：第 i 位在两处各放一份
+        self.format_vertical = (
+            np.array([i if i < 6 else i + 1 if i < 8 else n - 15 + i for i in range(15)]),
+            np.full(15, 8)
+        )
+        self.format_horizontal = (
+            np.full(15, 8),
+            np.array([n - i - 1 if i < 8 else 15 - i if i < 9 else 14 - i for i in range(15)])
+        )
+        self.dark_module = (n - 8, 8)
+
+        # 版本信息位置
+        if version >= 7:
+            bits = np.arange(18)
+            self.version_cells = (
+                (bits // 3, bits % 3 + n - 11),
+                (bits % 3 + n - 11, bits // 3)
+            )
+        else:
+            self.version_cells = ()
+
+        # 保留区域不参与数据布置，测试掩码时保持浅色
+        reserved = grid.copy()
+        for cells in (self.format_vertical, self.format_horizontal) + self.version_cells:
+            reserved[cells] = 0
+        reserved[self.dark_module] = 0
+        self.base = reserved == 1
+        # 所有非数据模块：定位、校正、定时图形以及格式和版本信息
+        self.function_patterns = reserved != -1
+
+        # 之字形数据布置顺序
+        free = reserved == -1
+        rows = []
+        cols = []
+        upward = True
+        for right in range(n - 1, 0, -2):
+            # 跳过垂直定时图形所在的第 6 列
+            col = right - 1 if right <= 6 else right
+            row_order = range(n - 1, -1, -1) if upward else range(n)
+            for row in row_order:
+                for c in (col, col - 1):
+                    if free[row, c]:
+                        rows.append(row)
+                        cols.append(c)
+            upward = not upward
+        self.data_rows = np.array(rows)
+        self.data_cols = np.array(cols)
+
+        # 8 种掩码在各数据模块上的取值
+        i = self.data_rows
+        j = self.data_cols
+        self.mask_bits = np.stack([
+            (i + j) % 2 == 0,
+            i % 2 == 0,
+            j % 3 == 0,
+            (i + j) % 3 == 0,
+            (i // 2 + j // 3) % 2 == 0,
+            (i * j) % 2 + (i * j) % 3 == 0,
+            ((i * j) % 2 + (i * j) % 3) % 2 == 0,
+            ((i * j) % 3 + (i + j) % 2) % 2 == 0,
+        ])
+
+
+_LAYOUTS = {}
+
+
+def _layout(version):
+    """获取版本布局（带缓存）"""
+    layout = _LAYOUTS.get(version)
+    if layout is None:
+        layout = _LAYOUTS[version] = _VersionLayout(version)
+    return layout
+
+
+def function_pattern_mask(version):
+    """
+    获取版本的功能图形区域
+
+    Returns:
+        numpy.ndarray: n×n 布尔数组，True 表示该模块不承载数据（只读，请勿修改）
+    """
+    return _layout(version).function_patterns
+
+
+def _alignment_positions(version):
+    """校正图形中心坐标"""
+    if version == 1:
+        return []
+    count = version // 7 + 2
+    size = version * 4 + 17
+    step = 26 if version == 32 else (version * 4 + count * 2 + 1) // (count * 2 - 2) * 2
+    return [6] + [size - 7 - i * step for i in range(count - 1)][::-1]
+
+
+def _place(layout, data_bits, mask):
+    """把数据位与掩码布置到固定图形上（保留区域保持浅色）"""
+    modules = layout.base.copy()
+    modules[layout.data_rows, layout.data_cols] = data_bits ^ layout.mask_bits[mask]
+    return modules
+
+
+def _place_all(layout, data_bits):
+    """一次生成 8 个掩码候选，返回形状为 (8, n, n) 的数组"""
+    stack = np.repeat(layout.base[None], 8, axis=0)
+    stack[:, layout.data_rows, layout.data_cols] = data_bits[None] ^ layout.mask_bits
+    return stack
+
+
+def _apply_format(layout, modules, ecc, mask):
+    """写入格式信息、版本信息和暗模块"""
+    format_bits = FORMAT_BITS[(ERROR_CORRECT[ecc] << 3) | mask]
+    values = (format_bits >> np.arange(15)) & 1 == 1
+    modules[layout.format_vertical] = values
+    modules[layout.format_horizontal] = values
+    modules[layout.dark_module] = True
+
+    if layout.version_cells:
+        version_values = (VERSION_BITS[layout.version] >> np.arange(18)) & 1 == 1
+        for cells in layout.version_cells:
+            modules[cells] = version_values
+    return modules
+
+
+# ==================== 对外接口 ====================
+
+def _to_bytes(data):
+    if isinstance(data, bytes):
+        return data
+    return str(data).encode('utf-8')
+
+
+def _split_by_pattern(data, pattern):
+    """按正则拆分，产出 (是否匹配, 片段)"""
+    while data:
+        match = pattern.search(data)
+        if not match:
+            break
+        start, end = match.start(), match.end()
+        if start:
+            yield False, data[:start]
+        yield True, data[start:end]
+        data = data[end:]
+    if data:
+        yield False, data
+
+
+def compat_segments(content, minimum=20):
+    """
+    按 qrcode 库 add_data 的默认规则分段：
+    长度至少为 minimum 的数字串、字母数字串单独成段，其余为字节模式
+
+    Returns:
+        list: [(模式, 字节数据), ...]
+    """
+    data = _to_bytes(content)
+    num_pattern = rb"\d"
+    alpha_pattern = b"[" + re.escape(ALPHA_NUM) + b"]"
+    if len(data) <= minimum:
+        num_pattern = re.compile(b"^" + num_pattern + b"+$")
+        alpha_pattern = re.compile(b"^" + alpha_pattern + b"+$")
+    else:
+        repeat = b"{" + str(minimum).encode('ascii') + b",}"
+        num_pattern = re.compile(num_pattern + repeat)
+        alpha_pattern = re.compile(alpha_pattern + repeat)
+
+    segments = []
+    for is_num, chunk in _split_by_pattern(data, num_pattern):
+        if is_num:
+            segments.append((MODE_NUMBER, chunk))
+            continue
+        for is_alpha, sub_chunk in _split_by_pattern(chunk, alpha_pattern):
+            segments.append((MODE_ALPHA_NUM if is_alpha else MODE_BYTE, sub_chunk))
+    return segments
+
+
+def best_version(segments, ecc='L', start=1):
+    """
+    选择能容纳分段的最小版本（不小于 start）
+
+    Returns:
+        int: 版本号
+    """
+    for version in range(start, 41):
+        if segments_bits(segments, version) <= DATA_BITS[version, ecc]:
+            return version
+    raise ValueError("内容过长，超出二维码最大容量")
+
+
+def _prepare(content, version, ecc, segments):
+    """选择版本并生成布置前的数据位，返回 (版本, 布局, 数据位)"""
+    if ecc not in ERROR_CORRECT:
+        raise ValueError(f"不支持的纠错等级: {ecc}")
+    if segments is None:
+        segments = compat_segments(content)
+
+    version = best_version(segments, ecc, version or 1)
+    layout = _layout(version)
+
+    codewords = _interleave(_data_codewords(segments, version, ecc), version, ecc)
+    # 剩余位为 0
+    data_bits = np.zeros(len(layout.data_rows), dtype=bool)
+    data_bits[:len(codewords) * 8] = np.unpackbits(codewords)
+    return version, layout, data_bits
+
+
+def mask_candidates(content, version=None, ecc='L', segments=None):
+    """
+    生成 8 个掩码候选矩阵（格式信息区域为浅色），供掩码评分使用
+
+    Returns:
+        numpy.ndarray: 形状为 (8, n, n) 的布尔数组
+    """
+    _, layout, data_bits = _prepare(content, version, ecc, segments)
+    return _place_all(layout, data_bits)
+
+
+def encode(content, version=None, ecc='L', mask=None, segments=None):
+    """
+    编码二维码模块矩阵
+
+    Args:
+        content (str|bytes): 二维码内容，给出 segments 时忽略
+        version (int): 最小版本，内容放不下时自动增大；为 None 时从版本 1 开始
+        ecc (str): 纠错等级 'L'、'M'、'Q' 或 'H'
+        mask (int): 指定掩码 0-7，为 None 时按罚分自动选择
+        segments (list): 预先分好的 [(模式, 字节数据), ...]，默认按 qrcode 库规则分段
+
+    Returns:
+        EncodedQR: (modules 布尔矩阵（不含边距）, version, ecc, mask)
+    """
+    with metrics.stage('qrcode.encode'):
+        version, layout, data_bits = _prepare(content, version, ecc, segments)
+
+    with metrics.stage('qrcode.mask'):
+        if mask is None:
+            candidates = _place_all(layout, data_bits)
+            mask = best_mask(candidates)
+            modules = candidates[mask].copy()
+        else:
+            modules = _place(layout, data_bits, mask)
+
+        modules = _apply_format(layout, modules, ecc, mask)
+    return EncodedQR(modules, version, ecc, mask)
@@ -1,28 +1,77 @@
 """
 二维码生成器引擎
 负责所有二维码和条形码的生成功能
+qrcode、python-barcode、MyQR 只在选用对应后端时才导入，多进程批量生成的进程池也在第一次使用时才导入，
+默认的内置编码器不需要它们，启动时不为此付出导入开销。
+分段、编码、掩码选择、渲染、图片编码和写入等阶段的耗时记录在 metrics 中（默认关闭）
 """
 import io
-import qrcode
-import barcode
-from barcode.writer import ImageWriter
+import os
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
 from PIL import Image
-from MyQR import myqr
+from . import barcode_engine, metrics
+from .batch_dedup import BatchDeduplicator
+from .batch_manifest import BatchManifest, content_digest, params_digest
+from .batch_source import BatchFileSource
+from .image_cache import LRUCache, image_nbytes
+from .qr_encoder import encode
+from .qr_personal import BORDER as PERSONAL_BORDER
+from .qr_personal import MODULE_PIXELS, compose_personal, personal_matrix, prepare_background
+from .qr_segments import describe_segments, fit_segments
+from .qr_renderer import RENDERERS, module_scale, pad_to_size, render_matrix
+from .output_sink import SinkWriter, create_sink
+from .png_encoder import DEFAULT_COMPRESS_LEVEL, DEFAULT_STRATEGY
+from .vector_output import encode_image, matrix_spec
+
+# 批量统计中保留的失败条目数量上限，其余只计数
+MAX_BATCH_ERRORS = 100
 
 
 class QRCodeGenerator:
     """二维码生成器核心业务逻辑类"""
 
-    def __init__(self):
-        pass
+    def __init__(self, renderer='numpy', cache_bytes=64 * 1024 * 1024,
+                 background_cache_bytes=32 * 1024 * 1024):
+        """
+        Args:
+            renderer (str): 默认渲染后端，可选 'numpy'（向量化）或 'pil'（qrcode 库自带）
+            cache_bytes (int): 图片缓存的字节预算，为 0 时关闭缓存
+            background_cache_bytes (int): 个性化背景预处理缓存的字节预算，为 0 时关闭缓存
+        """
+        if renderer not in RENDERERS:
+            raise ValueError(f"不支持的渲染后端: {renderer}")
+        self.renderer = renderer
+        self.cache = LRUCache(cache_bytes, sizeof=image_nbytes, enabled=cache_bytes > 0)
+        self.background_cache = LRUCache(
+            background_cache_bytes, sizeof=_arrays_nbytes, enabled=background_cache_bytes > 0
+        )
+        # 最近一次批量生成的统计（成功、失败数量和各版本的数量）
+        self.last_batch_stats = None
+
+    def cache_stats(self):
+        """获取图片缓存的命中统计"""
+        return self.cache.stats()
+
+    def background_cache_stats(self):
+        """获取个性化背景缓存的命中统计"""
+        return self.background_cache.stats()
 
     def generate_simple_qrcode(self, content, params=None):
         """
         生成普通二维码
 
+        内容会先做最优分段，再按容量表查出能容纳它的最小版本：version 为 0 或 'auto' 时自动选择，
+        否则作为最小版本。无论实际版本多大，输出图片的边长都等于 size，每个模块占相同的整数像素，
+        余下的像素作为白边；每个模块不足 qr_renderer.MIN_MODULE_PIXELS 像素时生成失败。
+        实际使用的版本和分段记录在图片的 info['qr_version']、info['qr_segments'] 中。
+
         Args:
             content (str): 二维码内容
-            params (dict): 参数字典，包含version, size, margin
+            params (dict): 参数字典，包含version, size, margin，可选renderer、kanji（允许汉字模式）
 
         Returns:
             PIL.Image: 生成的二维码图片
@@ -37,27 +86,71 @@ class QRCodeGenerator:
             margin = params.get('margin', 4)
             size = params.get('size', 232)
             version = params.get('version', 1)
+            if version == 'auto':
+                version = 0
+            renderer = params.get('renderer', self.renderer)
+            kanji = params.get('kanji', False)
+
+            # 相同内容和参数的图片直接从缓存复制，缓存中的对象不直接交给调用方
+            cache_key = ('simple', content, version, size, margin, renderer, kanji)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                metrics.count('qrcode.cache_hit')
+                return cached.copy()
+            metrics.count('qrcode.cache_miss')
+
+            if renderer == 'pil':
+                import qrcode
+                from qrcode.util import QRData
+
+                # qrcode 库不支持汉字模式的分段写入，这里只使用数字、字母数字和字节分段
+                with metrics.stage('qrcode.segments'):
+                    segments, fitted_version = fit_segments(content, 'L', version)
+                # 按实际版本的模块数计算整数模块像素，再居中补白到 size，边长不随版本变化
+                total = 4 * fitted_version + 17 + 2 * margin
+                qr = qrcode.QRCode(
+                    version=fitted_version,
+                    error_correction=qrcode.ERROR_CORRECT_L,
+                    box_size=module_scale(total, size),
+                    border=margin
+                )
+                for mode, data in segments:
+                    qr.add_data(QRData(data, mode=mode, check_data=False))
+                # qrcode 库的编码、掩码选择和绘制在 make_image 中一起完成，无法分开计时
+                with metrics.stage('qrcode.render_pil'):
+                    qr_img = pad_to_size(qr.make_image().get_image(), size)
+                qr_img.info['qr_version'] = qr.version
+                qr_img.info['qr_segments'] = describe_segments(segments)
+                qr_img.info['vector'] = matrix_spec(qr.modules, margin, qr_img.size[0])
+            elif renderer == 'numpy':
+                # 最优分段决定最小版本，内置编码器计算模块矩阵，渲染交给向量化渲染器
+                with metrics.stage('qrcode.segments'):
+                    segments, fitted_version = fit_segments(content, 'L', version, kanji)
+                encoded = encode(content, version=fitted_version, ecc='L', segments=segments)
+                with metrics.stage('qrcode.render'):
+                    qr_img = render_matrix(encoded.modules, size=size, border=margin)
+                qr_img.info['qr_version'] = encoded.version
+                qr_img.info['qr_segments'] = describe_segments(segments)
+                qr_img.info['vector'] = matrix_spec(encoded.modules, margin, size)
+            else:
+                raise ValueError(f"不支持的渲染后端: {renderer}")
 
-            qr = qrcode.QRCode(
-                version=version,
-                error_correction=qrcode.ERROR_CORRECT_L,
-                box_size=size // 29,
-                border=margin
-            )
-            qr.add_data(content)
-            qr_img = qr.make_image()
-            return qr_img
+            self.cache.put(cache_key, qr_img)
+            return qr_img.copy()
 
         except Exception as e:
+            metrics.count('qrcode.error')
             raise Exception(f"普通二维码生成失败: {e}")
 
     def generate_personal_qrcode(self, content, params=None):
         """
         生成个性化二维码
 
+        默认使用内置编码器在内存中合成，backend 为 'myqr' 时改用 MyQR 库生成。
+
         Args:
             content (str): 二维码内容
-            params (dict): 参数字典，包含picture_path, colorized
+            params (dict): 参数字典，包含picture_path, colorized，可选backend
 
         Returns:
             PIL.Image: 生成的二维码图片
@@ -69,17 +162,72 @@ class QRCodeGenerator:
             params = {'picture_path': '', 'colorized': True}
 
         try:
-            import tempfile
-            import os
-
-            # 创建临时文件保存个性化二维码
-            temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-            temp_path = temp_file.name
-            temp_file.close()
-
             picture_path = params.get('picture_path', '')
             colorized = params.get('colorized', True)
+            backend = params.get('backend', 'native')
+
+            if backend == 'myqr':
+                return self._generate_personal_myqr(content, picture_path, colorized)
+            if backend != 'native':
+                raise ValueError(f"不支持的个性化后端: {backend}")
+
+            with metrics.stage('personal.encode'):
+                encoded = personal_matrix(content)
+            background = None
+            if picture_path:
+                with metrics.stage('personal.background'):
+                    background = self._load_background(picture_path, encoded.modules.shape[0] * MODULE_PIXELS)
+
+            with metrics.stage('personal.compose'):
+                qr_img = compose_personal(encoded, background, colorized)
+            qr_img.info['qr_version'] = encoded.version
+            if background is None:
+                # 无背景时就是普通的黑白二维码，可以输出矢量文件
+                qr_img.info['vector'] = matrix_spec(encoded.modules, PERSONAL_BORDER, qr_img.size[0])
+            return qr_img
+
+        except Exception as e:
+            metrics.count('personal.error')
+            raise Exception(f"个性化二维码生成失败: {e}")
+
+    def _load_background(self, picture_path, area):
+        """
+        读取并预处理背景图片
+
+        以 (路径, 修改时间, 文件大小, 目标边长) 为键缓存预处理后的数组，
+        同一张图片在多个二维码（包括批量生成）之间只需解码和缩放一次。
+        文件被修改后修改时间变化，旧条目不再命中并随 LRU 淘汰。
 
+        Returns:
+            tuple: prepare_background 的返回值（只读数组）
+        """
+        stat = os.stat(picture_path)
+        key = (os.path.abspath(picture_path), stat.st_mtime_ns, stat.st_size, area)
+        background = self.background_cache.get(key)
+        if background is not None:
+            metrics.count('personal.background_cache_hit')
+        else:
+            metrics.count('personal.background_cache_miss')
+            with Image.open(picture_path) as picture:
+                background = prepare_background(picture, area)
+            # 缓存中的数组在多次合成之间共享，禁止写入
+            for array in background:
+                array.flags.writeable = False
+            self.background_cache.put(key, background)
+        return background
+
+    def _generate_personal_myqr(self, content, picture_path, colorized):
+        """通过 MyQR 生成个性化二维码，临时文件在任何情况下都会被删除"""
+        import tempfile
+        import os
+        from MyQR import myqr
+
+        # 创建临时文件保存个性化二维码
+        temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
+        temp_path = temp_file.name
+        temp_file.close()
+
+        try:
             if picture_path:
                 # 有背景图片的个性化二维码
                 myqr.run(
@@ -92,23 +240,26 @@ class QRCodeGenerator:
                 # 无背景图片的普通个性化二维码
                 myqr.run(words=content, save_name=temp_path)
 
-            # 加载生成的二维码
-            qr_img = Image.open(temp_path)
-
+            # 加载生成的二维码，读入内存后再删除文件
+            with Image.open(temp_path) as img:
+                img.load()
+                return img.copy()
+        finally:
             # 清理临时文件
-            os.unlink(temp_path)
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
 
-            return qr_img
-
-        except Exception as e:
-            raise Exception(f"个性化二维码生成失败: {e}")
-
-    def generate_barcode(self, content):
+    def generate_barcode(self, content, params=None):
         """
         生成条形码
 
+        默认由内置条形码引擎计算模块序列并直接栅格化，
+        backend 为 'python-barcode' 时改用 python-barcode 库生成。
+
         Args:
             content (str): 条形码内容
+            params (dict): 参数字典，可选symbology（code128、ean13、code39、itf，默认code128）、
+                text（是否显示文字）、backend以及栅格化参数 module_width, bar_height, quiet_zone, margin, font_size
 
         Returns:
             PIL.Image: 生成的条形码图片
@@ -116,37 +267,134 @@ class QRCodeGenerator:
         if not content:
             raise ValueError("请输入内容")
 
+        params = params or {}
+        symbology = params.get('symbology', 'code128')
         try:
-            code128 = barcode.get('code128', content, writer=ImageWriter())
-            fp = io.BytesIO()
-            code128.write(fp)
-            fp.seek(0)
-            img = Image.open(fp)
-            return img
+            if params.get('backend', 'native') == 'python-barcode':
+                import barcode
+                from barcode.writer import ImageWriter
+
+                with metrics.stage('barcode.python_barcode'):
+                    code = barcode.get(symbology, content, writer=ImageWriter())
+                    fp = io.BytesIO()
+                    code.write(fp, {'write_text': params.get('text', True)})
+                    fp.seek(0)
+                    img = Image.open(fp)
+                return img
+
+            options = {key: value for key, value in params.items() if key in barcode_engine.DEFAULT_OPTIONS}
+            return barcode_engine.generate(symbology, content, options)
 
         except Exception as e:
+            metrics.count('barcode.error')
             raise Exception(f"条形码生成失败: {e}")
 
     def batch_generate_qrcodes(self, batch_data, progress_callback=None):
         """
         批量生成二维码
 
+        数据来源为 lines（列表或任意可迭代对象，非列表时可通过 total 给出条数），
+        或 source 字典（path, column, has_header, encoding）指定的 TXT/CSV 文件，
+        文件数据源按需流式读取，内存占用与数据条数无关。
+        sink 指定输出方式：'dir'（默认，逐个文件写入 output_dir）、'zip' 或 'tar'（在 output_dir 中流式写入一个归档），
+        文件由独立的写入线程写出，并在 output_dir 中记录 JSONL 清单；
+        resume 为 True（默认）时跳过清单中内容、参数一致且输出文件完整的条目，中断或取消后重新执行即可续传；
+        dedup 为 True（默认）时内容重复的条目只生成一次，其余以硬链接（目录、TAR）或清单引用（ZIP）输出。
+        mode 为 'personal' 时按 picture_path、colorized 生成个性化二维码，背景图片只加载一次；
+        普通二维码的 version 默认为 'auto'，每条内容按容量表单独选择最小版本，图片边长统一为 size。
+
+        Args:
+            batch_data (dict): 批量生成数据，workers 大于 1 时使用进程池并行生成
+            progress_callback (callable): 进度回调函数，接收(current, total, message)，返回True表示取消
+
+        Returns:
+            tuple: (成功数量, 失败数量)，详细统计见 last_batch_stats
+        """
+        version = batch_data.get('version', 'auto')
+        size = batch_data.get('size', 200)
+        margin = batch_data.get('margin', 4)
+        mode = batch_data.get('mode', 'simple')
+        if mode == 'personal':
+            qr_params = {
+                'mode': mode,
+                'picture_path': batch_data.get('picture_path', ''),
+                'colorized': batch_data.get('colorized', True)
+            }
+        elif mode == 'simple':
+            qr_params = {
+                'mode': mode,
+                'version': version,
+                'size': size,
+                'margin': margin,
+                'renderer': batch_data.get('renderer', self.renderer),
+                'kanji': batch_data.get('kanji', False)
+            }
+        else:
+            raise ValueError(f"不支持的批量生成类型: {mode}")
+
+        return self._run_batch(batch_data, qr_params, 'qrcode', '二维码', progress_callback)
+
+    def batch_generate_barcodes(self, batch_data, progress_callback=None):
+        """
+        批量生成条形码
+
+        数据来源、输出设置、并行方式和进度回调约定与 batch_generate_qrcodes 相同。
+
+        Args:
+            batch_data (dict): 批量生成数据，symbology 为码制（code128、ean13、code39、itf），
+                可选text（是否显示文字）及 module_width、bar_height 等栅格化参数，
+                边距用 barcode_margin（像素）指定，margin 只用于二维码
+            progress_callback (callable): 进度回调函数，接收(current, total, message)，返回True表示取消
+
+        Returns:
+            tuple: (成功数量, 失败数量)，详细统计见 last_batch_stats
+        """
+        symbology = batch_data.get('symbology', 'code128')
+        if symbology not in barcode_engine.SYMBOLOGIES:
+            raise ValueError(f"不支持的条形码类型: {symbology}")
+
+        # margin 是二维码的边距（模块数），界面和命令行总会带上；条形码的边距（像素）由 barcode_margin 指定
+        barcode_params = {
+            key: value for key, value in batch_data.items()
+            if key in barcode_engine.DEFAULT_OPTIONS and key != 'margin'
+        }
+        if 'barcode_margin' in batch_data:
+            barcode_params['margin'] = batch_data['barcode_margin']
+        barcode_params.update({'mode': 'barcode', 'symbology': symbology})
+        return self._run_batch(batch_data, barcode_params, symbology, '条形码', progress_callback)
+
+    def _run_batch(self, batch_data, params, name, label, progress_callback):
+        """
+        批量生成的公共流程：解析数据来源、检查输出设置、生成任务并串行或并行执行
+
+        PNG 输出可通过 compress_level（0-9）和 png_strategy（见 PNG_STRATEGIES）调整压缩参数，
+        统计中记录实际编码的图片数、编码总字节数与总耗时，以及每张图片的平均、最大字节数和编码耗时（毫秒），
+        每张图片的字节数和编码耗时同时记入清单；errors 记录失败条目的序号、文件名和错误信息（最多 MAX_BATCH_ERRORS 条）。
+
         Args:
             batch_data (dict): 批量生成数据
-            progress_callback (callable): 进度回调函数，接收(current, total, message)
+            params (dict): 每个任务的生成参数，mode 决定生成方法
+            name (str): 输出文件名中的类型名称
+            label (str): 进度信息中的类型名称
+            progress_callback (callable): 进度回调函数
 
         Returns:
             tuple: (成功数量, 失败数量)
         """
-        lines = batch_data.get('lines', [])
+        lines, total = self._resolve_batch_lines(batch_data)
         output_dir = batch_data.get('output_dir', '')
         prefix = batch_data.get('prefix', '')
         format_type = batch_data.get('format', 'png')
-        version = batch_data.get('version', 1)
-        size = batch_data.get('size', 200)
-        margin = batch_data.get('margin', 4)
-
-        if not lines:
+        workers = batch_data.get('workers', 1)
+        sink_type = batch_data.get('sink', 'dir')
+        resume = batch_data.get('resume', True)
+        dedup_enabled = batch_data.get('dedup', True)
+        png_options = {
+            'compress_level': batch_data.get('compress_level', DEFAULT_COMPRESS_LEVEL),
+            'strategy': batch_data.get('png_strategy', DEFAULT_STRATEGY),
+        }
+
+        if not total:
             raise ValueError("没有有效的数据")
 
         if not output_dir:
@@ -156,45 +404,263 @@ class QRCodeGenerator:
         if prefix and not prefix.endswith('_'):
             prefix += '_'
 
-        success_count = 0
-        error_count = 0
+        params = dict(params, png_options=png_options)
+        sink = create_sink(sink_type, output_dir, f"{prefix}{name}_batch")
+        manifest = BatchManifest(
+            os.path.join(output_dir, f"{prefix}{name}_batch.manifest.jsonl"),
+            params_digest(dict(params, format=format_type, sink=sink_type))
+        )
+        stats = self.last_batch_stats = {
+            'success': 0, 'error': 0, 'skipped': 0, 'deduplicated': 0, 'dedup_saved_bytes': 0,
+            'versions': {}, 'output': sink.path, 'manifest': manifest.path,
+            'bytes_written': 0, 'encoded': 0, 'encoded_bytes': 0, 'encode_seconds': 0.0,
+            'encoded_bytes_mean': 0, 'encoded_bytes_max': 0, 'encode_ms_mean': 0.0, 'encode_ms_max': 0.0,
+            'errors': []
+        }
+        writer = SinkWriter(sink, manifest=manifest)
+        dedup = BatchDeduplicator(writer, stats, dedup_enabled)
+        record = partial(_record_batch_result, stats, writer, dedup)
+
+        def iter_tasks():
+            # 文件编号只由输入顺序决定，与并行调度无关；文件名相对于输出目标
+            for i, content in enumerate(lines):
+                filename = f"{prefix}{name}_{i+1}.{format_type}"
+                digest = content_digest(content)
+                done = resume and manifest.done_output(i, filename, digest, sink.existing_size, sink.existing_digest)
+                if done:
+                    stats['skipped'] += 1
+                    # 只有保留的原件可以作为后续重复条目的链接目标，引用条目不登记
+                    if done[0] == filename:
+                        dedup.add_existing(digest, *done)
+                    continue
+                if dedup.check(i, filename, digest):
+                    continue
+                yield i, content, filename, params
 
         try:
-            for i, content in enumerate(lines):
-                # 调用进度回调
+            # 清单中没有参数一致的条目时不续传，归档和清单都重新创建
+            resume = resume and manifest.load() > 0
+            manifest.open(resume)
+            try:
+                writer.start(resume)
+                with metrics.stage('batch.run'):
+                    if workers > 1:
+                        self._run_batch_parallel(iter_tasks(), total, workers, progress_callback, stats, label, record)
+                    else:
+                        self._run_batch_serial(iter_tasks(), total, progress_callback, stats, label, record)
+            finally:
+                writer.close()
+                manifest.close()
+            stats['bytes_written'] = writer.bytes_written
+            # 去重的条目不编码，平均值只按实际编码的图片计算
+            if stats['encoded']:
+                stats['encoded_bytes_mean'] = round(stats['encoded_bytes'] / stats['encoded'])
+                stats['encode_ms_mean'] = round(stats['encode_seconds'] * 1000 / stats['encoded'], 3)
+            metrics.count('batch.skipped', stats['skipped'])
+            metrics.count('batch.deduplicated', stats['deduplicated'])
+            return stats['success'], stats['error']
+
+        except Exception as e:
+            raise Exception(f"批量生成过程中发生错误: {e}")
+
+    def _resolve_batch_lines(self, batch_data):
+        """
+        解析批量数据来源
+
+        Returns:
+            tuple: (可迭代的内容, 总条数)
+        """
+        source = batch_data.get('source')
+        if source:
+            lines = BatchFileSource.from_dict(source)
+        else:
+            lines = batch_data.get('lines', [])
+
+        total = batch_data.get('total')
+        if total is None:
+            if isinstance(lines, BatchFileSource):
+                # 文件数据源：先流式计数一遍，保证进度条有准确的总数
+                total = lines.count()
+            elif hasattr(lines, '__len__'):
+                total = len(lines)
+            else:
+                lines = list(lines)
+                total = len(lines)
+        return lines, total
+
+    def _run_batch_serial(self, tasks, total, progress_callback, stats, label, record):
+        """在当前进程中逐个执行批量任务，record 处理每个任务的结果"""
+        for task in tasks:
+            # 调用进度回调（续传跳过和去重的条目直接计入进度）
+            i = task[0]
+            if progress_callback:
+                cancel = progress_callback(i, total, f'正在生成第 {i+1}/{total} 个{label}...')
+                if cancel:
+                    break
+
+            record(self._execute_batch_task(task))
+
+        # 调用进度回调完成
+        if progress_callback:
+            progress_callback(total, total, '生成完成')
+
+    def _run_batch_parallel(self, tasks, total, workers, progress_callback, stats, label, record):
+        """
+        使用进程池并行执行批量任务，record 处理每个任务的结果
+
+        同时在途的任务数限制为进程数的数倍，既能让进程持续工作，
+        又保证取消时只需等待少量正在执行的任务。
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        done_count = 0
+        cancelled = False
+        max_pending = workers * 4
+        pending = set()
+
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(
+                self.renderer,
+                self.cache.max_bytes if self.cache.enabled else 0,
+                self.background_cache.max_bytes if self.background_cache.enabled else 0,
+                metrics.registry().buckets if metrics.enabled() else None
+            )
+        )
+        try:
+            tasks = iter(tasks)
+            exhausted = False
+            while True:
+                # 补充任务直到达到在途上限
+                while not exhausted and len(pending) < max_pending:
+                    task = next(tasks, None)
+                    if task is None:
+                        exhausted = True
+                        break
+                    pending.add(executor.submit(_run_batch_task, task))
+
+                if not pending:
+                    break
+
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done_count += 1
+                    record(future.result()[1])
+
                 if progress_callback:
-                    cancel = progress_callback(i, len(lines), f'正在生成第 {i+1}/{len(lines)} 个二维码...')
+                    current = done_count + stats['skipped'] + stats['deduplicated']
+                    cancel = progress_callback(current, total, f'已生成 {current}/{total} 个{label}...')
                     if cancel:
+                        cancelled = True
                         break
+        finally:
+            # 取消尚未开始的任务，只等待正在执行的少量任务结束
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        if cancelled:
+            # 统计取消前已经完成的任务
+            for future in pending:
+                if future.done() and not future.cancelled():
+                    record(future.result()[1])
+        elif progress_callback:
+            progress_callback(total, total, '生成完成')
+
+    def _execute_batch_task(self, task):
+        """
+        执行单个批量任务
 
-                # 生成文件名
-                filename = f"{prefix}qrcode_{i+1}.{format_type}"
-                filepath = f"{output_dir}/{filename}"
-
-                try:
-                    # 生成二维码
-                    qr = qrcode.QRCode(
-                        version=version,
-                        error_correction=qrcode.ERROR_CORRECT_L,
-                        box_size=size // 29,
-                        border=margin
-                    )
-                    qr.add_data(content)
-                    qr_img = qr.make_image()
-
-                    # 保存图片
-                    qr_img.save(filepath)
-                    success_count += 1
-
-                except Exception as e:
-                    error_count += 1
-                    print(f"生成二维码失败: {content}, 错误: {e}")
-
-            # 调用进度回调完成
-            if progress_callback:
-                progress_callback(len(lines), len(lines), '生成完成')
+        只生成并编码文件内容，写入由主进程的写入线程完成。
 
-            return success_count, error_count
+        Args:
+            task (tuple): (序号, 内容, 文件名, 生成参数)
+
+        Returns:
+            dict: 任务结果，error 为失败时的错误信息（成功时为None），version 为实际使用的版本，
+                index、name、data 为序号、文件名和文件内容，digest 为内容摘要，encode_seconds 为编码耗时
+        """
+        index, content, filename, params = task
+        digest = content_digest(content)
+        try:
+            # 生成二维码或条形码并编码为文件内容
+            mode = params.get('mode')
+            with metrics.stage('batch.generate'):
+                if mode == 'personal':
+                    qr_img = self.generate_personal_qrcode(content, params)
+                elif mode == 'barcode':
+                    qr_img = self.generate_barcode(content, params)
+                else:
+                    qr_img = self.generate_simple_qrcode(content, params)
+            start = time.perf_counter()
+            data = encode_image(qr_img, filename, params.get('png_options'))
+            return {
+                'error': None, 'version': qr_img.info.get('qr_version'), 'index': index,
+                'name': filename, 'data': data, 'digest': digest,
+                'encode_seconds': time.perf_counter() - start
+            }
 
         except Exception as e:
-            raise Exception(f"批量生成过程中发生错误: {e}")
\ No newline at end of file
+            # 标准输出留给调用方（如命令行的 JSON 结果），错误信息写到标准错误并随任务结果返回
+            print(f"生成失败: {content}, 错误: {e}", file=sys.stderr)
+            return {
+                'error': str(e), 'version': None, 'index': index, 'name': filename, 'data': None, 'digest': digest
+            }
+
+
+def _arrays_nbytes(arrays):
+    """一组 numpy 数组占用的字节数"""
+    return sum(array.nbytes for array in arrays)
+
+
+def _record_batch_result(stats, writer, dedup, result):
+    """把单个任务结果累加到批量统计中，把文件内容交给写入线程，再处理等待该内容的重复条目"""
+    # 工作进程的阶段统计随结果带回
+    metrics.merge(result.pop('metrics', None))
+    if result['error'] is not None:
+        metrics.count('batch.error')
+        stats['error'] += 1
+        if len(stats['errors']) < MAX_BATCH_ERRORS:
+            stats['errors'].append({'index': result['index'], 'name': result['name'], 'error': result['error']})
+        dedup.resolve(result['digest'], None)
+        return
+    size = len(result['data'])
+    encode_ms = result['encode_seconds'] * 1000
+    writer.put(result['name'], result['data'], (result['index'], result['digest'], encode_ms))
+    dedup.resolve(result['digest'], size)
+    metrics.count('batch.generated')
+    stats['success'] += 1
+    stats['encoded'] += 1
+    stats['encoded_bytes'] += size
+    stats['encode_seconds'] += result['encode_seconds']
+    stats['encoded_bytes_max'] = max(stats['encoded_bytes_max'], size)
+    stats['encode_ms_max'] = max(stats['encode_ms_max'], round(encode_ms, 3))
+    version = result['version']
+    if version is not None:
+        stats['versions'][version] = stats['versions'].get(version, 0) + 1
+
+
+# 进程池中每个工作进程持有的生成器实例
+_worker_generator = None
+
+
+def _init_batch_worker(renderer, cache_bytes, background_cache_bytes, metrics_buckets=None):
+    """进程池工作进程初始化：每个进程只创建一次生成器，主进程开启了统计时工作进程也开启"""
+    global _worker_generator
+    # 中断信号只由主进程处理（取消后等待在途任务完成），工作进程忽略
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if metrics_buckets is not None:
+        # fork 启动的进程会继承主进程已有的统计，清空后只记录本进程的增量
+        metrics.enable(metrics_buckets).reset()
+    else:
+        metrics.disable()
+    _worker_generator = QRCodeGenerator(renderer, cache_bytes, background_cache_bytes)
+
+
+def _run_batch_task(task):
+    """进程池入口，返回 (序号, 任务结果)，开启统计时结果中附带本任务的阶段统计"""
+    result = _worker_generator._execute_batch_task(task)
+    if metrics.enabled():
+        result['metrics'] = metrics.drain()
+    return task[0], result
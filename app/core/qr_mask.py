@@ -0,0 +1,81 @@
+"""
+掩码评分
+把 8 个掩码候选矩阵叠成一个三维数组，用数组运算一次算出全部罚分，
+规则 N1-N4 的计分方式与 qrcode 库的 lost_point 完全一致，修改后需通过 scripts/check_encoder.py
+"""
+import numpy as np
+
+
+# 规则 3 的两种 11 模块图形：1011101 前后带 4 个浅色模块
+_FINDER_PATTERNS = (0b10111010000, 0b00001011101)
+
+
+def _run_penalty(stack):
+    """
+    规则 1：每行长度 L >= 5 的同色游程记 L - 2 分
+
+    L - 2 = (游程内长度为 5 的窗口数 L - 4) + 2，
+    因此只需统计全同色的 5 模块窗口数，再加上 2 倍的游程起点数。
+    """
+    equal = stack[..., 1:] == stack[..., :-1]
+    same5 = equal[..., :-3] & equal[..., 1:-2] & equal[..., 2:-1] & equal[..., 3:]
+    # 窗口起点前一个模块颜色不同（或位于行首）时为游程的第一个窗口
+    starts = same5.copy()
+    starts[..., 1:] &= ~equal[..., :-4]
+    return same5.sum(axis=(1, 2)) + 2 * starts.sum(axis=(1, 2))
+
+
+def _block_penalty(stack):
+    """规则 2：每个同色 2×2 方块记 3 分"""
+    top_left = stack[:, :-1, :-1]
+    blocks = (top_left == stack[:, 1:, :-1]) & (top_left == stack[:, :-1, 1:]) & (top_left == stack[:, 1:, 1:])
+    return 3 * blocks.sum(axis=(1, 2))
+
+
+def _finder_penalty(stack):
+    """规则 3：每个行内的类定位图形记 40 分"""
+    width = stack.shape[2] - 10
+    if width <= 0:
+        return np.zeros(stack.shape[0], dtype=np.int64)
+    # 把每个 11 模块窗口编码成整数后与两种图形比较
+    code = np.zeros(stack.shape[:2] + (width,), dtype=np.int16)
+    for k in range(11):
+        code = (code << 1) | stack[..., k:k + width]
+    matches = (code == _FINDER_PATTERNS[0]) | (code == _FINDER_PATTERNS[1])
+    return 40 * matches.sum(axis=(1, 2))
+
+
+def _balance_penalty(stack):
+    """规则 4：深色比例每偏离 50% 一个 5% 记 10 分"""
+    n = stack.shape[1]
+    percent = np.count_nonzero(stack, axis=(1, 2)) / (n ** 2)
+    return np.floor(np.abs(percent * 100 - 50) / 5).astype(np.int64) * 10
+
+
+def penalty_scores(stack):
+    """
+    计算所有候选矩阵的罚分
+
+    Args:
+        stack (numpy.ndarray): 形状为 (候选数, n, n) 的布尔数组
+
+    Returns:
+        numpy.ndarray: 每个候选的罚分
+    """
+    columns = np.ascontiguousarray(stack.transpose(0, 2, 1))
+    return (
+        _run_penalty(stack) + _run_penalty(columns)
+        + _block_penalty(stack)
+        + _finder_penalty(stack) + _finder_penalty(columns)
+        + _balance_penalty(stack)
+    )
+
+
+def best_mask(stack):
+    """
+    选择罚分最低的掩码，罚分相同时取序号较小者
+
+    Returns:
+        int: 掩码序号
+    """
+    return int(np.argmin(penalty_scores(stack)))
@@ -0,0 +1,170 @@
+"""
+个性化二维码合成
+在内存中把二维码矩阵与背景图片合成并直接返回 PIL 图片，不再经过临时文件，
+背景缩放、调色和模块叠加都以 numpy 数组运算完成。
+图片几何与 MyQR 保持一致：每个模块 3 像素、四周留 4 个模块的空白，最后整体放大 3 倍；
+纠错等级固定为 H，以便背景覆盖部分模块后仍能识别。
+"""
+import numpy as np
+from PIL import Image
+
+from .qr_encoder import encode, function_pattern_mask
+from .qr_renderer import render_matrix
+from .qr_segments import fit_segments
+
+
+# 与 MyQR 相同的几何参数
+MODULE_PIXELS = 3
+BORDER = 4
+UPSCALE = 3
+PERSONAL_ECC = 'H'
+
+# 调色后深色模块的最大亮度与浅色模块的最小亮度（0-255）
+DARK_LIMIT = 60
+LIGHT_LIMIT = 200
+
+_LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+# 4×4 Bayer 有序抖动阈值
+_BAYER = (np.array([
+    [0, 8, 2, 10],
+    [12, 4, 14, 6],
+    [3, 11, 1, 9],
+    [15, 7, 13, 5],
+], dtype=np.float32) + 0.5) * 16
+
+
+def personal_matrix(content, version=1):
+    """
+    编码个性化二维码使用的模块矩阵（纠错等级 H）
+
+    Args:
+        content (str): 二维码内容
+        version (int): 最小版本
+
+    Returns:
+        EncodedQR: 编码结果
+    """
+    segments, version = fit_segments(content, PERSONAL_ECC, version)
+    return encode(content, version=version, ecc=PERSONAL_ECC, segments=segments)
+
+
+def _keep_mask(encoded):
+    """
+    计算二维码区域中必须保留二维码原色的位置
+
+    功能图形整体保留，数据模块只保留中心像素。
+
+    Returns:
+        numpy.ndarray: (n*3, n*3) 布尔数组
+    """
+    keep = np.repeat(np.repeat(function_pattern_mask(encoded.version), MODULE_PIXELS, axis=0),
+                     MODULE_PIXELS, axis=1)
+    center = MODULE_PIXELS // 2
+    keep[center::MODULE_PIXELS, center::MODULE_PIXELS] = True
+    return keep
+
+
+def prepare_background(background, area):
+    """
+    把背景图片裁剪为居中的正方形并按面积平均缩放到二维码区域大小
+
+    缩放按行、列两次分段求和一次算出每个目标像素覆盖区域的平均值，放大时退化为最近邻。
+
+    Args:
+        background (PIL.Image): 背景图片
+        area (int): 二维码区域的像素边长
+
+    Returns:
+        tuple: (rgb, opaque)，rgb 为 (area, area, 3) 的 float32 数组（已与白色按透明度混合），
+            opaque 为非完全透明像素的布尔数组
+    """
+    pixels = np.asarray(background.convert('RGBA'))
+    height, width = pixels.shape[:2]
+    side = min(height, width)
+    top = (height - side) // 2
+    left = (width - side) // 2
+    pixels = pixels[top:top + side, left:left + side]
+
+    # 相邻起点之间的像素求和即为每个目标像素覆盖区域之和；
+    # 放大时起点重复或相邻，reduceat 取单个像素，即最近邻
+    starts = np.arange(area) * side // area
+    counts = np.maximum(np.diff(starts, append=side), 1)
+    sums = np.add.reduceat(np.add.reduceat(pixels, starts, axis=0, dtype=np.uint32), starts, axis=1)
+    mean = sums.astype(np.float32) / (counts[:, None] * counts[None, :])[..., None]
+
+    alpha = mean[..., 3:] / 255
+    rgb = mean[..., :3] * alpha + 255 * (1 - alpha)
+    return rgb, mean[..., 3] > 0
+
+
+def _colorize(rgb, dark):
+    """
+    按模块颜色调整背景亮度：深色模块压暗到 DARK_LIMIT 以下，浅色模块提亮到 LIGHT_LIMIT 以上
+
+    只缩放亮度、保留色相，使背景图案可见的同时扫码端仍能区分深浅模块。
+    """
+    luma = rgb @ _LUMA_WEIGHTS
+    darken = np.minimum(1, DARK_LIMIT / np.maximum(luma, 1))
+    lighten = np.minimum(1, (255 - LIGHT_LIMIT) / np.maximum(255 - luma, 1))
+    return np.where(
+        dark[..., None],
+        rgb * darken[..., None],
+        255 - (255 - rgb) * lighten[..., None]
+    )
+
+
+def _dither(gray):
+    """用有序抖动（Bayer 矩阵）把灰度数组转换为黑白，True 表示白色"""
+    height, width = gray.shape
+    thresholds = np.tile(_BAYER, (height // 4 + 1, width // 4 + 1))[:height, :width]
+    return gray > thresholds
+
+
+def compose_personal(encoded, background=None, colorized=False):
+    """
+    合成个性化二维码
+
+    缩放、调色和模块叠加均以整块数组运算完成：
+    功能图形与数据模块中心保持纯黑白，其余像素取调整亮度后的背景。
+
+    Args:
+        encoded (EncodedQR): 编码结果
+        background (PIL.Image|tuple): 背景图片，或 prepare_background 的返回值；
+            为 None 时只输出放大后的二维码
+        colorized (bool): 是否保留背景颜色，否则输出抖动后的黑白图片
+
+    Returns:
+        PIL.Image: 合成后的图片，彩色时为 'RGB' 模式，否则为 '1' 模式
+    """
+    modules = encoded.modules
+    n = modules.shape[0]
+    area = n * MODULE_PIXELS
+    offset = BORDER * MODULE_PIXELS
+    total = area + 2 * offset
+
+    if background is None:
+        qr = render_matrix(modules, border=BORDER, box_size=MODULE_PIXELS)
+        return qr.resize((total * UPSCALE, total * UPSCALE), Image.NEAREST)
+
+    if isinstance(background, Image.Image):
+        background = prepare_background(background, area)
+    rgb, opaque = background
+
+    dark = np.repeat(np.repeat(modules, MODULE_PIXELS, axis=0), MODULE_PIXELS, axis=1)
+    # 背景完全透明的像素保留二维码原色
+    keep = _keep_mask(encoded) | ~opaque
+    pure = np.where(dark, 0, 255).astype(np.float32)
+
+    if colorized:
+        region = np.where(keep[..., None], pure[..., None], _colorize(rgb, dark))
+        canvas = np.full((total, total, 3), 255, dtype=np.uint8)
+        canvas[offset:offset + area, offset:offset + area] = np.clip(region + 0.5, 0, 255).astype(np.uint8)
+        qr = Image.fromarray(canvas, 'RGB')
+    else:
+        gray = _colorize(rgb, dark) @ _LUMA_WEIGHTS
+        region = np.where(keep, ~dark, _dither(gray))
+        canvas = np.ones((total, total), dtype=bool)
+        canvas[offset:offset + area, offset:offset + area] = region
+        qr = Image.fromarray(canvas)
+
+    return qr.resize((total * UPSCALE, total * UPSCALE), Image.NEAREST)
@@ -0,0 +1,84 @@
+"""
+二维码矩阵渲染器
+负责把模块矩阵一次性转换为带边距、精确像素尺寸的 1 位图像
+"""
+import numpy as np
+from PIL import Image
+
+
+# 可选的渲染后端：numpy 为向量化渲染，pil 为 qrcode 库自带的逐模块绘制
+RENDERERS = ('numpy', 'pil')
+
+# 每个模块至少占用的像素数，低于此值时识别器难以分辨模块边界
+MIN_MODULE_PIXELS = 2
+
+
+def module_scale(total, size):
+    """
+    目标尺寸下每个模块的整数像素数
+
+    Args:
+        total (int): 含边距的模块数
+        size (int): 目标像素边长
+
+    Raises:
+        ValueError: 每个模块不足 MIN_MODULE_PIXELS 像素
+    """
+    scale = size // total
+    if scale < MIN_MODULE_PIXELS:
+        raise ValueError(f"目标尺寸 {size}px 下每个模块不足 {MIN_MODULE_PIXELS} 像素（含边距共 {total} 个模块），"
+                         f"请增大尺寸、减小边距或缩短内容")
+    return scale
+
+
+def pad_to_size(img, size):
+    """把按整数模块像素绘制的图片居中放到 size×size 的白色画布上"""
+    if img.size == (size, size):
+        return img
+    canvas = Image.new(img.mode, (size, size), 'white')
+    offset = (size - img.size[0]) // 2
+    canvas.paste(img, (offset, offset))
+    return canvas
+
+
+def render_matrix(modules, size=None, border=4, box_size=10):
+    """
+    将二维码模块矩阵渲染为 1 位图像
+
+    通过整数下标映射一次完成缩放，输出图像的边长严格等于 size。
+    每个模块占用相同的整数像素数（见 module_scale），size 不能被模块数整除时
+    多出的像素作为白边平均分到四周，不会出现宽窄不一的模块。
+
+    Args:
+        modules: 模块矩阵（二维列表或 numpy 数组，True 表示深色），不含边距
+        size (int): 目标像素边长，为 None 时按 box_size 计算
+        border (int): 边距宽度（模块数）
+        box_size (int): 每个模块的像素数，仅在 size 为 None 时使用
+
+    Returns:
+        PIL.Image: 模式为 '1' 的二维码图片
+
+    Raises:
+        ValueError: 给出 size 时每个模块不足 MIN_MODULE_PIXELS 像素
+    """
+    matrix = np.asarray(modules, dtype=bool)
+    if border:
+        matrix = np.pad(matrix, border, mode='constant', constant_values=False)
+
+    total = matrix.shape[0]
+    if size is None:
+        size = total * box_size
+        scale = box_size
+    else:
+        scale = module_scale(total, size)
+
+    # 每个输出像素对应的模块下标，居中后落在矩阵之外的像素指向追加的一个白色模块
+    offset = (size - total * scale) // 2
+    index = (np.arange(size) - offset) // scale
+    index[(index < 0) | (index >= total)] = total
+    # 模式 '1' 中 1 为白色，先在模块级取反，再按行、按列取值放大
+    # （分两步索引比 np.ix_ 的二维花式索引快得多），最后按行打包
+    light = np.pad(~matrix, (0, 1), mode='constant', constant_values=True)
+    pixels = light[index][:, index]
+    packed = np.packbits(pixels, axis=1)
+    return Image.frombytes('1', (size, size), packed.tobytes())
@@ -1,10 +1,12 @@
 """
 二维码扫描器引擎
 负责所有二维码和条形码的识别功能
+pyzbar 在加载时即载入 zbar 动态库，第一次识别时才导入。
+图片读取和识别的耗时记录在 metrics 中（默认关闭）
 """
 import io
 from PIL import Image
-from pyzbar.pyzbar import decode
+from . import metrics
 
 
 class QRCodeScanner:
@@ -24,11 +26,17 @@ class QRCodeScanner:
             list: 识别结果列表
         """
         try:
-            img = Image.open(image_path)
-            results = decode(img)
+            from pyzbar.pyzbar import decode
+
+            # Image.open 只读取文件头，在这里完成解码，识别阶段只包含 zbar 的耗时
+            with metrics.stage('scan.load'):
+                img = Image.open(image_path)
+                img.load()
+            results = _decode(decode, img)
             return results
 
         except Exception as e:
+            metrics.count('scan.error')
             raise Exception(f"图片识别失败: {e}")
 
     def recognize_clipboard(self):
@@ -42,7 +50,7 @@ class QRCodeScanner:
             from PySide6.QtWidgets import QApplication
             from PySide6.QtGui import QImage
             from PySide6.QtCore import QBuffer, QIODevice
-            import io
+            from pyzbar.pyzbar import decode
 
             clipboard = QApplication.clipboard()
             mime_data = clipboard.mimeData()
@@ -59,7 +67,7 @@ class QRCodeScanner:
                     pil_image = Image.open(io.BytesIO(buffer.data()))
 
                     # 识别二维码/条形码
-                    results = decode(pil_image)
+                    results = _decode(decode, pil_image)
                     return results
 
             elif mime_data.hasText():
@@ -69,7 +77,7 @@ class QRCodeScanner:
                     try:
                         # 尝试作为文件路径打开
                         img = Image.open(text)
-                        results = decode(img)
+                        results = _decode(decode, img)
                         return results
                     except:
                         # 如果不是有效的图片文件路径，继续其他检查
@@ -110,4 +118,14 @@ class QRCodeScanner:
             return info
 
         except Exception as e:
-            return {'error': str(e)}
\ No newline at end of file
+            return {'error': str(e)}
+
+
+def _decode(decode, img):
+    """调用 pyzbar 识别并记录耗时和识别结果数"""
+    with metrics.stage('scan.decode'):
+        results = decode(img)
+    metrics.count('scan.symbols', len(results))
+    if not results:
+        metrics.count('scan.not_found')
+    return results
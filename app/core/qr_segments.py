@@ -0,0 +1,217 @@
+"""
+二维码分段优化
+按字符动态规划，把内容拆分为数字、字母数字、字节和汉字（Shift-JIS）模式的分段，
+使编码后的总位数最少，从而得到尽可能小的版本。
+
+汉字模式需要扫码端按 Shift-JIS 解码，部分识别库不支持，因此默认不启用。
+
+最小版本通过预先计算的容量表二分查找得到：纯数字或不含字母数字字符的内容只有一个分段，
+直接按字符数查各版本的字符容量；其余内容按最优分段的总位数查各版本的数据位容量。
+分段的最优性、最小版本和汉字分段的编码结果由 scripts/check_encoder.py 检查，修改后需通过。
+"""
+from bisect import bisect_left
+
+from .qr_encoder import (ALPHA_NUM, DATA_BITS, MODE_ALPHA_NUM, MODE_BYTE, MODE_KANJI,
+                         MODE_NUMBER, count_bits, segment_length, segments_bits)
+
+
+# 参与优化的模式，下标即动态规划中的状态序号
+_MODES = (MODE_BYTE, MODE_ALPHA_NUM, MODE_NUMBER, MODE_KANJI)
+_BYTE, _ALPHA, _NUMBER, _KANJI = range(4)
+
+# 字符计数指示符位数相同的版本区间
+VERSION_CLASSES = ((1, 9), (10, 26), (27, 40))
+MAX_VERSION = 40
+ECC_LEVELS = ('L', 'M', 'Q', 'H')
+
+# 各纠错等级下每个版本的数据位容量，下标为版本号（下标 0 占位），随版本单调递增
+_DATA_BITS_TABLE = {
+    ecc: (0,) + tuple(DATA_BITS[version, ecc] for version in range(1, MAX_VERSION + 1))
+    for ecc in ECC_LEVELS
+}
+
+_ALPHA_NUM_CHARS = frozenset(ALPHA_NUM.decode('ascii'))
+_INFINITY = float('inf')
+
+
+def _max_chars(mode, bits):
+    """数据位数 bits 内单一模式分段最多容纳的字符数"""
+    if mode == MODE_NUMBER:
+        # 每 3 个数字 10 位，余下 1、2 个数字分别占 4、7 位
+        return 3 * (bits // 10) + (2 if bits % 10 >= 7 else 1 if bits % 10 >= 4 else 0)
+    if mode == MODE_ALPHA_NUM:
+        # 每 2 个字符 11 位，余下 1 个字符占 6 位
+        return 2 * (bits // 11) + (1 if bits % 11 >= 6 else 0)
+    if mode == MODE_KANJI:
+        return bits // 13
+    return bits // 8
+
+
+# 容量表：(纠错等级, 模式) -> 每个版本单一模式分段最多容纳的字符数（汉字模式为字符数，字节模式为字节数）
+CAPACITY = {
+    (ecc, mode): (0,) + tuple(
+        _max_chars(mode, DATA_BITS[version, ecc] - 4 - count_bits(mode, version))
+        for version in range(1, MAX_VERSION + 1)
+    )
+    for ecc in ECC_LEVELS
+    for mode in _MODES
+}
+
+
+def _kanji_bytes(char):
+    """字符在汉字模式下的 Shift-JIS 双字节编码，无法用汉字模式时返回None"""
+    if ord(char) < 0x80:
+        return None
+    try:
+        data = char.encode('shift_jis')
+    except UnicodeEncodeError:
+        return None
+    if len(data) != 2:
+        return None
+    code = data[0] << 8 | data[1]
+    if 0x8140 <= code <= 0x9FFC or 0xE040 <= code <= 0xEBBF:
+        return data
+    return None
+
+
+def optimal_segments(content, version, kanji=False):
+    """
+    计算在指定版本（所在区间）下总位数最少的分段
+
+    代价以 1/6 位为单位：数字每字符 20（3 个字符 10 位），字母数字每字符 33（2 个字符 11 位），
+    字节每字节 48，汉字每字符 78（13 位）；切换模式时先把当前代价向上取整到整位，再加上新分段的头部。
+
+    Args:
+        content (str): 二维码内容
+        version (int): 版本号，决定字符计数指示符的位数
+        kanji (bool): 是否允许使用汉字模式
+
+    Returns:
+        list: [(模式, 字节数据), ...]
+    """
+    if not content:
+        return []
+
+    head_costs = [(4 + count_bits(mode, version)) * 6 for mode in _MODES]
+    previous = list(head_costs)
+    # choices[i][state] 为以 state 状态结束第 i 个字符时，该字符实际使用的模式
+    choices = []
+    kanji_cache = {}
+
+    for char in content:
+        current = [_INFINITY] * 4
+        choice = [None] * 4
+
+        current[_BYTE] = previous[_BYTE] + len(char.encode('utf-8')) * 48
+        choice[_BYTE] = _BYTE
+        if char in _ALPHA_NUM_CHARS:
+            current[_ALPHA] = previous[_ALPHA] + 33
+            choice[_ALPHA] = _ALPHA
+            if '0' <= char <= '9':
+                current[_NUMBER] = previous[_NUMBER] + 20
+                choice[_NUMBER] = _NUMBER
+        if kanji and char not in kanji_cache:
+            kanji_cache[char] = _kanji_bytes(char)
+        if kanji and kanji_cache[char] is not None:
+            current[_KANJI] = previous[_KANJI] + 78
+            choice[_KANJI] = _KANJI
+
+        # 在该字符之后切换到其他模式
+        for target in range(4):
+            for source in range(4):
+                if current[source] == _INFINITY:
+                    continue
+                cost = (current[source] + 5) // 6 * 6 + head_costs[target]
+                if cost < current[target]:
+                    current[target] = cost
+                    choice[target] = source
+
+        choices.append(choice)
+        previous = current
+
+    # 从代价最小的结束状态回溯每个字符的模式
+    state = min(range(4), key=lambda s: previous[s])
+    char_modes = [0] * len(content)
+    for i in range(len(content) - 1, -1, -1):
+        state = choices[i][state]
+        char_modes[i] = state
+
+    # 合并相邻同模式字符
+    segments = []
+    start = 0
+    for i in range(1, len(content) + 1):
+        if i == len(content) or char_modes[i] != char_modes[start]:
+            segments.append(_make_segment(char_modes[start], content[start:i], kanji_cache))
+            start = i
+    return segments
+
+
+def _make_segment(state, text, kanji_cache):
+    """把一段文本转换为 (模式, 字节数据)"""
+    mode = _MODES[state]
+    if mode == MODE_KANJI:
+        return mode, b''.join(kanji_cache[char] for char in text)
+    if mode == MODE_BYTE:
+        return mode, text.encode('utf-8')
+    return mode, text.encode('ascii')
+
+
+def _single_segment(content):
+    """
+    只需一个分段即为最优时返回该分段
+
+    纯数字内容用数字模式；不含任何字母数字字符的内容只能逐字节编码，用字节模式。
+    其余内容（以及允许汉字模式时）需要动态规划。
+    """
+    if not content:
+        return None
+    if content.isascii() and content.isdigit():
+        return MODE_NUMBER, content.encode('ascii')
+    if _ALPHA_NUM_CHARS.isdisjoint(content):
+        return MODE_BYTE, content.encode('utf-8')
+    return None
+
+
+def capacity(version, ecc, mode):
+    """单一模式分段在指定版本和纠错等级下最多容纳的字符数"""
+    return CAPACITY[ecc, mode][version]
+
+
+def fit_segments(content, ecc='L', start=1, kanji=False):
+    """
+    为内容选择最优分段和能容纳它的最小版本（不小于 start，为 0 或 None 时从版本 1 开始）
+
+    单一分段的内容直接在容量表中二分查找字符数；其余内容的计数指示符位数
+    只在三个版本区间之间变化，每个区间优化一次分段，再二分查找数据位容量。
+
+    Returns:
+        tuple: (分段列表, 版本号)
+    """
+    start = start or 1
+    single = None if kanji else _single_segment(content)
+    if single is not None:
+        mode, data = single
+        version = bisect_left(CAPACITY[ecc, mode], segment_length(mode, data), start)
+        if version > MAX_VERSION:
+            raise ValueError("内容过长，超出二维码最大容量")
+        return [single], version
+
+    table = _DATA_BITS_TABLE[ecc]
+    for low, high in VERSION_CLASSES:
+        if high < start:
+            continue
+        first = max(low, start)
+        segments = optimal_segments(content, first, kanji)
+        version = bisect_left(table, segments_bits(segments, first), first, high + 1)
+        if version <= high:
+            return segments, version
+    raise ValueError("内容过长，超出二维码最大容量")
+
+
+def describe_segments(segments):
+    """分段的可读描述，例如 'BYTE(13)+NUMBER(12)'"""
+    names = {MODE_NUMBER: 'NUMBER', MODE_ALPHA_NUM: 'ALPHANUMERIC', MODE_BYTE: 'BYTE', MODE_KANJI: 'KANJI'}
+    return '+'.join(
+        f"{names[mode]}({segment_length(mode, data)})"
+        for mode, data in segments
+    )
@@ -0,0 +1,227 @@
+"""
+Unix 套接字渲染守护进程的协议与客户端
+只依赖标准库，导入时不加载任何生成引擎，命令行客户端的启动开销只有解释器本身。
+
+协议：一个连接上可以连续发送多个请求，按顺序返回响应。
+    请求：4 字节大端长度 + UTF-8 JSON {"kind": "qrcode"|"barcode"|"ping", "params": {参数名: 字符串}}
+          参数与 HTTP 服务的查询参数相同（content、size、format、symbology 等）
+    响应：1 字节状态（0 成功、1 失败）+ 4 字节大端长度 + 内容（成功时为文件内容，失败时为 UTF-8 错误信息）
+
+最小命令行客户端（供 shell 脚本逐个调用，输出文件为 - 时写到标准输出）：
+    python -m app.core.socket_client qrcode "https://example.com" code.png size=300
+    python -m app.core.socket_client barcode 6901234567892 - symbology=ean13 format=svg > bar.svg
+"""
+import json
+import os
+import socket
+import struct
+import sys
+
+
+SOCKET_ENV_VAR = 'QRGEN_SOCKET'
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# 单个请求的长度上限
+MAX_REQUEST_BYTES = 64 * 1024
+
+_REQUEST_HEADER = struct.Struct('>I')
+_RESPONSE_HEADER = struct.Struct('>BI')
+
+
+class DaemonError(Exception):
+    """守护进程返回的错误"""
+
+
+def default_socket_path():
+    """套接字路径：环境变量 QRGEN_SOCKET，否则为运行时目录（或临时目录）下按用户区分的文件"""
+    path = os.environ.get(SOCKET_ENV_VAR)
+    if path:
+        return path
+    directory = os.environ.get('XDG_RUNTIME_DIR')
+    if not directory:
+        import tempfile
+        directory = tempfile.gettempdir()
+    return os.path.join(directory, f"qrgen-{os.getuid()}.sock")
+
+
+def recv_exact(sock, size):
+    """读取恰好 size 字节，对方在开头关闭连接时返回None"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ConnectionError("连接意外关闭")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_request(sock, kind, params):
+    payload = json.dumps({'kind': kind, 'params': params}, ensure_ascii=False).encode('utf-8')
+    sock.sendall(_REQUEST_HEADER.pack(len(payload)) + payload)
+
+
+def read_request(sock):
+    """
+    读取一个请求
+
+    Returns:
+        tuple: (kind, params)，连接关闭时返回None
+
+    Raises:
+        ValueError: 请求过大或格式不正确
+        ConnectionError: 请求内容未读完连接即关闭
+    """
+    header = recv_exact(sock, _REQUEST_HEADER.size)
+    if header is None:
+        return None
+    (size,) = _REQUEST_HEADER.unpack(header)
+    if size > MAX_REQUEST_BYTES:
+        raise ValueError(f"请求过大: {size} 字节")
+    body = recv_exact(sock, size)
+    if body is None:
+        raise ConnectionError("连接意外关闭")
+    try:
+        request = json.loads(body)
+    except ValueError as e:
+        raise ValueError(f"请求不是有效的 JSON: {e}")
+    if not isinstance(request, dict) or not isinstance(request.get('kind'), str):
+        raise ValueError("请求必须为包含字符串 kind 的 JSON 对象")
+    params = request.get('params', {})
+    if not isinstance(params, dict):
+        raise ValueError("请求的 params 必须为 JSON 对象")
+    return request['kind'], params
+
+
+def send_response(sock, status, payload):
+    sock.sendall(_RESPONSE_HEADER.pack(status, len(payload)) + payload)
+
+
+def read_response(sock):
+    """读取一个响应，返回 (状态, 内容)"""
+    header = recv_exact(sock, _RESPONSE_HEADER.size)
+    if header is None:
+        raise ConnectionError("守护进程关闭了连接")
+    status, size = _RESPONSE_HEADER.unpack(header)
+    return status, recv_exact(sock, size) if size else b''
+
+
+def _query_value(value):
+    """参数值转换为查询字符串形式"""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return str(value)
+
+
+class DaemonClient:
+    """
+    渲染守护进程客户端
+
+    同一个实例复用一个连接，连续渲染多个图片时不必重复建立连接。
+    """
+
+    def __init__(self, path=None, timeout=30):
+        """
+        Args:
+            path (str): 套接字路径，为None时见 default_socket_path
+            timeout (float): 单次请求的超时秒数
+        """
+        self.path = path or default_socket_path()
+        self.timeout = timeout
+        self._sock = None
+
+    def _connect(self):
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError as e:
+                sock.close()
+                raise ConnectionError(f"无法连接守护进程 {self.path}: {e}")
+            self._sock = sock
+        return self._sock
+
+    def request(self, kind, params):
+        """
+        发送一个请求
+
+        Returns:
+            bytes: 响应内容
+
+        Raises:
+            DaemonError: 守护进程返回错误
+            ConnectionError: 无法连接或连接中断
+        """
+        sock = self._connect()
+        try:
+            send_request(sock, kind, {name: _query_value(value) for name, value in params.items()})
+            status, payload = read_response(sock)
+        except OSError:
+            self.close()
+            raise
+        if status != STATUS_OK:
+            raise DaemonError(payload.decode('utf-8', errors='replace'))
+        return payload
+
+    def render(self, kind, content, **params):
+        """
+        渲染二维码或条形码
+
+        Args:
+            kind (str): 'qrcode' 或 'barcode'
+            content (str): 内容
+            **params: 与 HTTP 服务相同的参数，如 size、margin、version、format、symbology、text
+
+        Returns:
+            bytes: 文件内容
+        """
+        return self.request(kind, dict(params, content=content))
+
+    def ping(self):
+        """检查守护进程是否可用"""
+        return self.request('ping', {}) == b'pong'
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main(argv=None):
+    """最小命令行客户端，不使用 argparse，成功返回 0，失败时错误信息写到标准错误并返回 1"""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 3 or argv[0] not in ('qrcode', 'barcode'):
+        sys.stderr.write("用法: python -m app.core.socket_client qrcode|barcode 内容 输出文件|- [名称=值 ...]\n")
+        return 2
+    kind, content, output = argv[:3]
+    params = dict(arg.split('=', 1) for arg in argv[3:] if '=' in arg)
+    if output != '-':
+        params.setdefault('format', os.path.splitext(output)[1].lstrip('.').lower() or 'png')
+    try:
+        with DaemonClient() as client:
+            data = client.render(kind, content, **params)
+    except (DaemonError, ConnectionError, OSError) as e:
+        sys.stderr.write(f"{e}\n")
+        return 1
+    if output == '-':
+        sys.stdout.buffer.write(data)
+    else:
+        with open(output, 'wb') as f:
+            f.write(data)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+预派生的 Unix 套接字渲染守护进程
+主进程导入引擎、完成一次预热渲染后创建监听套接字，再派生若干子进程共同 accept；
+子进程继承已经导入的模块和预热后的状态，每个请求只需渲染和编码，不再付出解释器启动与导入开销。
+子进程意外退出时由主进程补齐，收到 SIGTERM/SIGINT 时通知全部子进程退出并删除套接字文件。
+协议见 socket_client
+"""
+import os
+import signal
+import socket
+import time
+
+from .http_service import parse_job, render_job
+from .qr_generator_engine import QRCodeGenerator
+from .socket_client import STATUS_ERROR, STATUS_OK, read_request, send_response
+
+
+# 连接上两次请求之间允许的最长空闲秒数，超过后关闭连接，空闲客户端不会一直占用子进程
+IDLE_TIMEOUT = 30
+
+
+class RenderDaemon:
+    """预派生守护进程：主进程只负责监督子进程，请求全部由子进程处理"""
+
+    def __init__(self, path, workers=None, renderer='numpy', cache_bytes=16 * 1024 * 1024,
+                 idle_timeout=IDLE_TIMEOUT):
+        """
+        Args:
+            path (str): 套接字路径
+            workers (int): 子进程数，为None时使用 CPU 核数
+            renderer (str): 普通二维码渲染后端
+            cache_bytes (int): 每个子进程的图片缓存字节预算
+            idle_timeout (float): 连接的读写超时秒数，为None时不限制
+        """
+        if not hasattr(os, 'fork') or not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("守护进程模式仅支持 Unix 系统")
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.idle_timeout = idle_timeout
+        self.generator = QRCodeGenerator(renderer, cache_bytes, 0)
+        self.children = set()
+        self._listener = None
+        self._stopping = False
+
+    def _warm_up(self):
+        """在派生前完成延迟导入（qr_encoder、png_encoder 等）和首次渲染的初始化"""
+        for kind, params in (('qrcode', {'content': 'warm-up'}),
+                             ('qrcode', {'content': 'warm-up', 'format': 'svg'}),
+                             ('barcode', {'content': 'warm-up'})):
+            render_job(self.generator, parse_job(kind, params))
+        self.generator.cache.clear()
+
+    def _bind(self):
+        """创建监听套接字；已有套接字文件时先确认没有守护进程在使用"""
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise RuntimeError(f"已有守护进程在监听 {self.path}")
+            finally:
+                probe.close()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # 套接字只允许当前用户访问
+        old_umask = os.umask(0o177)
+        try:
+            listener.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        listener.listen(128)
+        self._listener = listener
+
+    def start(self):
+        """预热、监听并派生子进程"""
+        self._warm_up()
+        self._bind()
+        for _ in range(self.workers):
+            self._spawn()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._child_main()
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        self.children.add(pid)
+
+    def _child_main(self):
+        """子进程：循环接受连接，逐个处理连接上的请求"""
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        while True:
+            conn, _ = self._listener.accept()
+            try:
+                conn.settimeout(self.idle_timeout)
+                self._handle_connection(conn)
+            except Exception:
+                # 客户端中途断开、空闲超时或连接上的其他错误只关闭该连接，不影响后续连接
+                pass
+            finally:
+                conn.close()
+
+    def _handle_connection(self, conn):
+        while True:
+            try:
+                request = read_request(conn)
+            except OSError:
+                # 连接断开或空闲超时，由 _child_main 关闭连接
+                raise
+            except Exception as e:
+                # 协议错误之后无法确定下一个请求的边界，返回错误后关闭连接
+                send_response(conn, STATUS_ERROR, str(e).encode('utf-8'))
+                return
+            if request is None:
+                return
+            kind, params = request
+            try:
+                if kind == 'ping':
+                    payload = b'pong'
+                elif kind in ('qrcode', 'barcode'):
+                    payload = render_job(self.generator, parse_job(kind, params))
+                else:
+                    raise ValueError(f"未知请求类型: {kind}")
+            except Exception as e:
+                send_response(conn, STATUS_ERROR, str(e).encode('utf-8'))
+                continue
+            send_response(conn, STATUS_OK, payload)
+
+    def serve_forever(self):
+        """监督子进程，直到 stop() 被调用（通常来自信号处理函数）"""
+        while self.children:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            self.children.discard(pid)
+            if not self._stopping:
+                # 子进程异常退出，稍等再补齐，避免持续崩溃时空转
+                time.sleep(0.1)
+                self._spawn()
+        self._cleanup()
+
+    def stop(self):
+        """通知全部子进程退出，serve_forever 在子进程全部退出后返回"""
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.discard(pid)
+
+    def _cleanup(self):
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
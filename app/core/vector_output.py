@@ -0,0 +1,252 @@
+"""
+矢量输出
+根据生成时记录在图片 info['vector'] 中的模块数据输出 SVG 或 PDF：
+相邻的深色模块先合并为水平游程，再把上下对齐的相同游程合并为矩形，路径数量远少于模块数
+"""
+import io
+import os
+import zlib
+from html import escape
+
+import numpy as np
+from PIL import Image
+
+from . import metrics
+from .png_encoder import encode_png
+
+
+# 支持的矢量格式（按文件扩展名识别）
+VECTOR_FORMATS = ('svg', 'pdf')
+
+# 1 像素按 CSS 像素（1/96 英寸）换算为 PDF 的 0.75 磅
+_POINTS_PER_PIXEL = 0.75
+# 等宽字体基线到顶部的距离与字号之比
+_TEXT_ASCENT = 0.8
+
+
+def matrix_spec(modules, border, size):
+    """
+    二维码的矢量数据
+
+    Args:
+        modules (numpy.ndarray): 模块矩阵（不含边距）
+        border (int): 边距（模块数）
+        size (int): 对应位图的像素边长
+
+    Returns:
+        dict: 记录在图片 info['vector'] 中的矢量数据
+    """
+    return {'kind': 'matrix', 'modules': np.asarray(modules, dtype=bool), 'border': border, 'size': size}
+
+
+def _row_runs(row):
+    """一行中深色游程的 (起点, 终点) 列表"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], row, [False])).astype(np.int8)))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def merge_rects(matrix):
+    """
+    把布尔矩阵中的深色模块合并为矩形
+
+    每行先合并为水平游程，连续多行中起止位置相同的游程再合并为一个矩形。
+
+    Returns:
+        list: [(x, y, 宽, 高), ...]
+    """
+    rects = []
+    # 上一行仍在延伸的游程：(起点, 终点) -> 开始行
+    active = {}
+    for y, row in enumerate(matrix):
+        runs = _row_runs(row)
+        current = {}
+        for run in runs:
+            current[run] = active.pop(run, y)
+        for (x0, x1), y0 in active.items():
+            rects.append((x0, y0, x1 - x0, y - y0))
+        active = current
+    height = len(matrix)
+    for (x0, x1), y0 in active.items():
+        rects.append((x0, y0, x1 - x0, height - y0))
+    rects.sort(key=lambda rect: (rect[1], rect[0]))
+    return rects
+
+
+def _drawing(spec):
+    """
+    把矢量数据转换为绘制指令
+
+    Returns:
+        tuple: (坐标宽, 坐标高, 像素宽, 像素高, 矩形列表, 文字列表)，
+            文字为 (中心 x, 基线 y, 字号, 内容)
+    """
+    if spec['kind'] == 'matrix':
+        modules = spec['modules']
+        border = spec['border']
+        total = modules.shape[0] + 2 * border
+        rects = [(x + border, y + border, w, h) for x, y, w, h in merge_rects(modules)]
+        return total, total, spec['size'], spec['size'], rects, []
+
+    if spec['kind'] == 'bars':
+        module_width = spec['module_width']
+        rects = [
+            (spec['x'] + start * module_width, spec['bar_y'], (end - start) * module_width, spec['bar_height'])
+            for start, end in _row_runs(spec['modules'])
+        ]
+        texts = []
+        if spec.get('text'):
+            # 控制字符无法在 SVG/PDF 中显示，以空格代替
+            text = ''.join(char if char.isprintable() else ' ' for char in spec['text'])
+            texts.append((spec['text_x'], spec['text_top'] + spec['font_size'] * _TEXT_ASCENT,
+                          spec['font_size'], text))
+        return spec['width'], spec['height'], spec['width'], spec['height'], rects, texts
+
+    raise ValueError(f"不支持的矢量数据类型: {spec['kind']}")
+
+
+def _number(value):
+    """数值格式化，整数不带小数点"""
+    if float(value).is_integer():
+        return str(int(value))
+    return f"{value:.3f}".rstrip('0')
+
+
+def to_svg(spec):
+    """
+    生成 SVG 文档
+
+    所有矩形写入同一个 path 元素，坐标使用模块（二维码）或像素（条形码）单位，
+    width/height 为对应位图的像素尺寸。
+
+    Returns:
+        bytes: UTF-8 编码的 SVG
+    """
+    width, height, pixel_width, pixel_height, rects, texts = _drawing(spec)
+    path = ''.join(f"M{_number(x)} {_number(y)}h{_number(w)}v{_number(h)}h-{_number(w)}z" for x, y, w, h in rects)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixel_width}" height="{pixel_height}" '
+        f'viewBox="0 0 {width} {height}" shape-rendering="crispEdges">\n',
+        f'<rect width="{width}" height="{height}" fill="#fff"/>\n',
+        f'<path d="{path}" fill="#000"/>\n',
+    ]
+    for x, y, size, text in texts:
+        parts.append(
+            f'<text x="{_number(x)}" y="{_number(y)}" font-family="DejaVu Sans Mono, Courier New, monospace" '
+            f'font-size="{size}" text-anchor="middle" fill="#000">{escape(text, quote=False)}</text>\n'
+        )
+    parts.append('</svg>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def _pdf_string(text):
+    """PDF 字符串转义"""
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def to_pdf(spec):
+    """
+    生成单页 PDF 文档
+
+    页面尺寸按位图像素换算为磅，矩形使用 re 运算符一次填充，内容流经 zlib 压缩；
+    文字使用 PDF 内置的 Courier 字体，无需嵌入字体文件。
+
+    Returns:
+        bytes: PDF 文件内容
+    """
+    width, height, pixel_width, pixel_height, rects, texts = _drawing(spec)
+    page_width = pixel_width * _POINTS_PER_PIXEL
+    page_height = pixel_height * _POINTS_PER_PIXEL
+    scale = page_width / width
+
+    # PDF 原点在左下角，矩形的 y 坐标需要翻转
+    commands = [f"{_number(scale)} 0 0 {_number(scale)} 0 0 cm", "1 g", f"0 0 {width} {height} re f", "0 g"]
+    commands.extend(f"{_number(x)} {_number(height - y - h)} {_number(w)} {_number(h)} re" for x, y, w, h in rects)
+    if rects:
+        commands.append("f")
+    for x, y, size, text in texts:
+        # Courier 每个字符宽 0.6 个字号，据此居中
+        left = x - len(text) * size * 0.6 / 2
+        commands.append(f"BT /F1 {_number(size)} Tf {_number(left)} {_number(height - y)} Td ({_pdf_string(text)}) Tj ET")
+    stream = zlib.compress('\n'.join(commands).encode('latin-1'))
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_number(page_width)} {_number(page_height)}] "
+         f"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>").encode('ascii'),
+        f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode('ascii') + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>",
+    ]
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode('ascii')
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('ascii')
+    return bytes(output)
+
+
+def vector_format(filepath):
+    """根据扩展名判断矢量格式，不是矢量格式时返回None"""
+    extension = os.path.splitext(filepath)[1].lower().lstrip('.')
+    return extension if extension in VECTOR_FORMATS else None
+
+
+def encode_image(img, filename, png_options=None):
+    """
+    按文件扩展名把生成的图片编码为文件内容
+
+    扩展名为 .svg/.pdf 时输出矢量文件，.png 由 png_encoder 编码（黑白图片输出 1 位 PNG），
+    其余按 PIL 支持的位图格式编码。
+
+    Args:
+        img (PIL.Image): 生成的图片
+        filename (str): 文件名，只用于判断格式
+        png_options (dict): PNG 压缩参数 compress_level、strategy，为 None 时使用默认值
+
+    Returns:
+        bytes: 文件内容
+    """
+    fmt = vector_format(filename)
+    if fmt is not None:
+        spec = img.info.get('vector')
+        if spec is None:
+            raise ValueError("该图片不支持矢量输出（带背景图片的个性化二维码只能保存为位图）")
+        with metrics.stage(f'image.{fmt}'):
+            return to_svg(spec) if fmt == 'svg' else to_pdf(spec)
+
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.png':
+        with metrics.stage('image.png'):
+            return encode_png(img, **(png_options or {}))
+    raster_format = Image.registered_extensions().get(extension)
+    if raster_format is None:
+        raise ValueError(f"不支持的图片格式: {extension}")
+    with metrics.stage('image.raster'):
+        fp = io.BytesIO()
+        img.save(fp, raster_format)
+        return fp.getvalue()
+
+
+def save_image(img, filepath, png_options=None):
+    """
+    保存生成的图片：扩展名为 .svg/.pdf 时输出矢量文件，.png 输出 1 位 PNG，其余按位图保存
+
+    Args:
+        img (PIL.Image): 生成的图片
+        filepath (str): 保存路径
+        png_options (dict): PNG 压缩参数，见 encode_image
+    """
+    if vector_format(filepath) is None and os.path.splitext(filepath)[1].lower() != '.png':
+        img.save(filepath)
+        return
+
+    data = encode_image(img, filepath, png_options)
+    with open(filepath, 'wb') as f:
+        f.write(data)
@@ -2,7 +2,9 @@
 自定义对话框模块
 包含应用程序中使用的所有对话框类
 """
+import os
 from PySide6 import QtWidgets
+from ..core.batch_source import BatchFileSource
 
 
 class RecognizeResultDialog(QtWidgets.QDialog):
@@ -97,7 +99,7 @@ class BatchGenerateDialog(QtWidgets.QDialog):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setWindowTitle('批量生成二维码')
+        self.setWindowTitle('批量生成二维码/条形码')
         self.setModal(True)
         self.setMinimumSize(600, 500)
 
@@ -117,7 +119,39 @@ class BatchGenerateDialog(QtWidgets.QDialog):
         )
         self.data_edit.setMinimumHeight(150)
 
+        # 数据文件（大文件流式读取，界面只显示前若干行预览）
+        self.source_edit = QtWidgets.QLineEdit()
+        self.source_edit.setReadOnly(True)
+        self.source_edit.setPlaceholderText('可选：从 TXT/CSV 文件读取数据...')
+        self.source_button = QtWidgets.QPushButton('选择文件')
+        self.source_clear_button = QtWidgets.QPushButton('清除')
+
+        source_layout = QtWidgets.QHBoxLayout()
+        source_layout.addWidget(self.source_edit)
+        source_layout.addWidget(self.source_button)
+        source_layout.addWidget(self.source_clear_button)
+
+        self.column_spin = QtWidgets.QSpinBox()
+        self.column_spin.setRange(1, 999)
+        self.column_spin.setValue(1)
+        self.header_check = QtWidgets.QCheckBox('首行为表头')
+        self.encoding_combo = QtWidgets.QComboBox()
+        self.encoding_combo.addItems(['UTF-8', 'GBK'])
+
+        file_options_layout = QtWidgets.QHBoxLayout()
+        file_options_layout.addWidget(QtWidgets.QLabel('CSV 列:'))
+        file_options_layout.addWidget(self.column_spin)
+        file_options_layout.addWidget(self.header_check)
+        file_options_layout.addWidget(QtWidgets.QLabel('编码:'))
+        file_options_layout.addWidget(self.encoding_combo)
+        file_options_layout.addStretch()
+
+        self.preview_label = QtWidgets.QLabel()
+
         input_layout.addRow('数据列表:', self.data_edit)
+        input_layout.addRow('数据文件:', source_layout)
+        input_layout.addRow('', file_options_layout)
+        input_layout.addRow('', self.preview_label)
         input_group.setLayout(input_layout)
 
         # 输出设置
@@ -136,20 +170,84 @@ class BatchGenerateDialog(QtWidgets.QDialog):
         self.prefix_edit.setPlaceholderText('文件名前缀（可选）')
 
         self.format_combo = QtWidgets.QComboBox()
-        self.format_combo.addItems(['PNG', 'JPEG', 'BMP'])
+        # SVG、PDF 为矢量格式，带背景图片的个性化二维码不支持
+        self.format_combo.addItems(['PNG', 'JPEG', 'BMP', 'SVG', 'PDF'])
 
         output_layout.addRow('输出目录:', dir_layout)
         output_layout.addRow('文件名前缀:', self.prefix_edit)
+        # 输出方式：逐个文件写入目录，或流式写入单个 ZIP/TAR 归档
+        self.sink_combo = QtWidgets.QComboBox()
+        self.sink_combo.addItem('目录', 'dir')
+        self.sink_combo.addItem('ZIP 归档', 'zip')
+        self.sink_combo.addItem('TAR 归档', 'tar')
+
+        # PNG 压缩参数：等级越高文件越小、编码越慢（png_encoder 依赖 numpy，打开对话框时才导入）
+        from ..core.png_encoder import DEFAULT_COMPRESS_LEVEL, DEFAULT_STRATEGY, PNG_STRATEGIES
+
+        self.compress_level_spin = QtWidgets.QSpinBox()
+        self.compress_level_spin.setRange(0, 9)
+        self.compress_level_spin.setValue(DEFAULT_COMPRESS_LEVEL)
+        self.png_strategy_combo = QtWidgets.QComboBox()
+        self.png_strategy_combo.addItems(list(PNG_STRATEGIES))
+        self.png_strategy_combo.setCurrentText(DEFAULT_STRATEGY)
+
+        png_layout = QtWidgets.QHBoxLayout()
+        png_layout.addWidget(QtWidgets.QLabel('等级'))
+        png_layout.addWidget(self.compress_level_spin)
+        png_layout.addWidget(QtWidgets.QLabel('策略'))
+        png_layout.addWidget(self.png_strategy_combo)
+
         output_layout.addRow('图片格式:', self.format_combo)
+        output_layout.addRow('PNG 压缩:', png_layout)
+        # 续传：跳过清单中已经生成且参数一致的条目
+        self.resume_check = QtWidgets.QCheckBox('跳过已生成的文件（中断后续传）')
+        self.resume_check.setChecked(True)
+        # 去重：重复内容只生成一次，其余输出为硬链接或清单引用
+        self.dedup_check = QtWidgets.QCheckBox('重复内容只生成一次')
+        self.dedup_check.setChecked(True)
+
+        output_layout.addRow('输出方式:', self.sink_combo)
+        output_layout.addRow('', self.resume_check)
+        output_layout.addRow('', self.dedup_check)
         output_group.setLayout(output_layout)
 
         # 二维码参数
         params_group = QtWidgets.QGroupBox('二维码参数')
         params_layout = QtWidgets.QFormLayout()
 
+        # 二维码类型：个性化二维码共用同一张背景图片
+        self.mode_combo = QtWidgets.QComboBox()
+        self.mode_combo.addItems(['普通二维码', '个性化二维码', '条形码'])
+
+        # 条形码码制
+        self.symbology_combo = QtWidgets.QComboBox()
+        for text, symbology in (('Code128', 'code128'), ('EAN-13', 'ean13'), ('Code39', 'code39'), ('ITF', 'itf')):
+            self.symbology_combo.addItem(text, symbology)
+        self.barcode_text_check = QtWidgets.QCheckBox('显示文字')
+        self.barcode_text_check.setChecked(True)
+
+        barcode_layout = QtWidgets.QHBoxLayout()
+        barcode_layout.addWidget(self.symbology_combo)
+        barcode_layout.addWidget(self.barcode_text_check)
+        barcode_layout.addStretch()
+
+        self.picture_edit = QtWidgets.QLineEdit()
+        self.picture_edit.setReadOnly(True)
+        self.picture_edit.setPlaceholderText('可选：背景图片...')
+        self.picture_button = QtWidgets.QPushButton('选择图片')
+        self.colorized_check = QtWidgets.QCheckBox('启用彩色效果')
+        self.colorized_check.setChecked(True)
+
+        picture_layout = QtWidgets.QHBoxLayout()
+        picture_layout.addWidget(self.picture_edit)
+        picture_layout.addWidget(self.picture_button)
+        picture_layout.addWidget(self.colorized_check)
+
         self.version_spin = QtWidgets.QSpinBox()
-        self.version_spin.setRange(1, 40)
-        self.version_spin.setValue(1)
+        # 0 表示按每条内容自动选择最小版本，其他值为最小版本
+        self.version_spin.setRange(0, 40)
+        self.version_spin.setSpecialValueText('自动')
+        self.version_spin.setValue(0)
 
         self.size_spin = QtWidgets.QSpinBox()
         self.size_spin.setRange(100, 1000)
@@ -160,9 +258,18 @@ class BatchGenerateDialog(QtWidgets.QDialog):
         self.margin_spin.setRange(0, 20)
         self.margin_spin.setValue(4)
 
+        # 并行进程数，1 表示在当前进程中逐个生成
+        self.workers_spin = QtWidgets.QSpinBox()
+        self.workers_spin.setRange(1, os.cpu_count() or 1)
+        self.workers_spin.setValue(1)
+
+        params_layout.addRow('类型:', self.mode_combo)
+        params_layout.addRow('背景图片:', picture_layout)
+        params_layout.addRow('条形码类型:', barcode_layout)
         params_layout.addRow('版本:', self.version_spin)
         params_layout.addRow('尺寸:', self.size_spin)
         params_layout.addRow('边距:', self.margin_spin)
+        params_layout.addRow('并行进程:', self.workers_spin)
         params_group.setLayout(params_layout)
 
         # 按钮
@@ -180,21 +287,111 @@ class BatchGenerateDialog(QtWidgets.QDialog):
         layout.addWidget(params_group)
         layout.addLayout(button_layout)
 
+        self.update_mode_widgets()
+
+    def get_source_data(self):
+        """获取数据文件设置，未选择文件时返回None"""
+        path = self.source_edit.text().strip()
+        if not path:
+            return None
+
+        return {
+            'path': path,
+            'column': self.column_spin.value() - 1 if path.lower().endswith('.csv') else None,
+            'has_header': self.header_check.isChecked(),
+            'encoding': 'gbk' if self.encoding_combo.currentText() == 'GBK' else 'utf-8-sig'
+        }
+
     def get_batch_data(self):
         """获取批量生成数据"""
-        data_text = self.data_edit.toPlainText().strip()
-        lines = [line.strip() for line in data_text.split('\n') if line.strip()]
+        source = self.get_source_data()
+        if source:
+            lines = []
+        else:
+            data_text = self.data_edit.toPlainText().strip()
+            lines = [line.strip() for line in data_text.split('\n') if line.strip()]
 
         return {
             'lines': lines,
+            'source': source,
             'output_dir': self.output_dir_edit.text().strip(),
             'prefix': self.prefix_edit.text().strip(),
             'format': self.format_combo.currentText().lower(),
+            'sink': self.sink_combo.currentData(),
+            'resume': self.resume_check.isChecked(),
+            'dedup': self.dedup_check.isChecked(),
+            'compress_level': self.compress_level_spin.value(),
+            'png_strategy': self.png_strategy_combo.currentText(),
             'version': self.version_spin.value(),
             'size': self.size_spin.value(),
-            'margin': self.margin_spin.value()
+            'margin': self.margin_spin.value(),
+            'workers': self.workers_spin.value(),
+            'mode': self.get_mode(),
+            'picture_path': self.picture_edit.text().strip(),
+            'colorized': self.colorized_check.isChecked(),
+            'symbology': self.symbology_combo.currentData(),
+            'text': self.barcode_text_check.isChecked()
         }
 
+    def get_mode(self):
+        """获取批量生成的类型：simple、personal 或 barcode"""
+        return ('simple', 'personal', 'barcode')[self.mode_combo.currentIndex()]
+
+    def update_mode_widgets(self):
+        """根据生成类型启用对应的参数控件"""
+        mode = self.get_mode()
+        for widget in (self.picture_edit, self.picture_button, self.colorized_check):
+            widget.setEnabled(mode == 'personal')
+        for widget in (self.version_spin, self.size_spin, self.margin_spin):
+            widget.setEnabled(mode == 'simple')
+        for widget in (self.symbology_combo, self.barcode_text_check):
+            widget.setEnabled(mode == 'barcode')
+
+    def select_picture_file(self):
+        """选择个性化二维码的背景图片"""
+        from PySide6.QtWidgets import QFileDialog
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, '选择背景图片', '',
+            '图片文件 (*.png *.jpg *.jpeg *.bmp *.gif)'
+        )
+        if file_path:
+            self.picture_edit.setText(file_path)
+
+    def select_source_file(self):
+        """选择数据文件并显示预览"""
+        from PySide6.QtWidgets import QFileDialog
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, '选择数据文件', '',
+            '数据文件 (*.txt *.csv);;所有文件 (*)'
+        )
+        if file_path:
+            self.source_edit.setText(file_path)
+            self.refresh_source_preview()
+
+    def refresh_source_preview(self, limit=20):
+        """只读取数据文件的前若干行作为预览，不加载整个文件"""
+        source = self.get_source_data()
+        if source is None:
+            return
+
+        try:
+            preview = BatchFileSource.from_dict(source).preview(limit)
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self, '错误', f'读取数据文件失败: {e}')
+            self.clear_source_file()
+            return
+
+        self.data_edit.setReadOnly(True)
+        self.data_edit.setPlainText('\n'.join(preview))
+        self.preview_label.setText(f'预览前 {len(preview)} 条，生成时将流式读取整个文件')
+
+    def clear_source_file(self):
+        """清除数据文件，恢复手动输入"""
+        self.source_edit.clear()
+        self.data_edit.clear()
+        self.data_edit.setReadOnly(False)
+        self.preview_label.clear()
+
     def select_output_directory(self):
         """选择输出目录对话框"""
         from PySide6.QtWidgets import QFileDialog
@@ -204,4 +401,11 @@ class BatchGenerateDialog(QtWidgets.QDialog):
     def setup_batch_logic(self, controller):
         """设置批量生成逻辑连接"""
         self.output_dir_button.clicked.connect(lambda: self.output_dir_edit.setText(self.select_output_directory()))
+        self.source_button.clicked.connect(self.select_source_file)
+        self.mode_combo.currentIndexChanged.connect(lambda: self.update_mode_widgets())
+        self.picture_button.clicked.connect(self.select_picture_file)
+        self.source_clear_button.clicked.connect(self.clear_source_file)
+        self.column_spin.valueChanged.connect(lambda: self.refresh_source_preview())
+        self.header_check.toggled.connect(lambda: self.refresh_source_preview())
+        self.encoding_combo.currentIndexChanged.connect(lambda: self.refresh_source_preview())
         self.generate_button.clicked.connect(lambda: controller.on_batch_generate_with_data(self.get_batch_data()))
\ No newline at end of file
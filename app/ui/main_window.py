@@ -1,6 +1,8 @@
 """
 主窗口界面类
 负责所有GUI界面的创建和布局
+生成、识别引擎及其依赖（numpy、PIL、pyzbar 等）不在启动时导入：窗口显示后再生成初始二维码并预加载引擎，
+预加载完成前用户的操作会在第一次访问时同步加载
 """
 import sys
 import webbrowser
@@ -10,16 +12,22 @@ from PySide6.QtWidgets import (QApplication, QLabel, QLineEdit, QPushButton,
                                 QRadioButton, QButtonGroup, QCheckBox, QVBoxLayout,
                                 QHBoxLayout, QFormLayout, QGroupBox, QStatusBar,
                                 QMainWindow, QProgressDialog)
-from ..core.qr_generator_engine import QRCodeGenerator
-from ..core.qr_scanner_engine import QRCodeScanner
 from PySide6.QtGui import QPixmap, QFont, QImage
-from PySide6.QtCore import Qt, QPoint
+from PySide6.QtCore import Qt, QPoint, QTimer, Signal
+from ..core import import_profile
 from .dialogs import RecognizeResultDialog, BatchGenerateDialog
 
 
+# 窗口显示后延迟多久预加载引擎（毫秒），让首次绘制先完成
+ENGINE_PRELOAD_DELAY_MS = 100
+
+
 class QrCodeGUI(QMainWindow):
     """二维码生成工具主窗口界面类"""
 
+    # 初始二维码生成、引擎预加载完成
+    engines_ready = Signal()
+
     def __init__(self, parent=None):
         super().__init__()
         self.setMinimumSize(900, 650)
@@ -28,9 +36,9 @@ class QrCodeGUI(QMainWindow):
         # 初始化变量
         self.picture_path = ""
 
-        # 初始化核心引擎
-        self.generator = QRCodeGenerator()
-        self.scanner = QRCodeScanner()
+        # 核心引擎在第一次使用时创建，见 generator、scanner 属性
+        self._generator = None
+        self._scanner = None
 
         # 设置应用程序图标
         self.set_app_icon()
@@ -48,6 +56,34 @@ class QrCodeGUI(QMainWindow):
         # 初始化界面状态
         self.initialize_ui()
 
+    @property
+    def generator(self):
+        """二维码生成引擎，第一次访问时导入并创建"""
+        if self._generator is None:
+            from ..core.qr_generator_engine import QRCodeGenerator
+            self._generator = QRCodeGenerator()
+        return self._generator
+
+    @property
+    def scanner(self):
+        """二维码识别引擎，第一次访问时导入并创建"""
+        if self._scanner is None:
+            from ..core.qr_scanner_engine import QRCodeScanner
+            self._scanner = QRCodeScanner()
+        return self._scanner
+
+    def preload_engines(self):
+        """生成初始二维码（同时加载生成引擎），再预加载识别引擎和图片保存模块，用户第一次操作时不必再等待导入"""
+        self.generate_qrcode()
+        try:
+            self.scanner
+            from ..core import vector_output  # noqa: F401
+        except Exception as e:
+            # 缺少依赖时不影响启动，等用户实际使用时再提示错误
+            print(f"预加载引擎失败: {e}")
+        import_profile.mark('engines_ready')
+        self.engines_ready.emit()
+
     def setup_ui(self, central_widget):
         """设置用户界面"""
         # 主内容布局 - 水平布局
@@ -308,8 +344,8 @@ class QrCodeGUI(QMainWindow):
         # 连接信号
         self.setup_connections()
 
-        # 生成初始二维码
-        self.generate_qrcode()
+        # 窗口显示后再生成初始二维码，首次绘制不必等待引擎导入
+        QTimer.singleShot(ENGINE_PRELOAD_DELAY_MS, self.preload_engines)
 
     def setup_connections(self):
         """设置信号连接"""
@@ -341,7 +377,11 @@ class QrCodeGUI(QMainWindow):
                 params = self.get_qr_params()
                 qr_img = self.generator.generate_simple_qrcode(content, params)
                 self.show_qrcode(qr_img)
-                self.show_status_message('✓ 普通二维码生成成功', 3000)
+                version = qr_img.info.get('qr_version')
+                if version:
+                    self.show_status_message(f'✓ 普通二维码生成成功（版本 {version}）', 3000)
+                else:
+                    self.show_status_message('✓ 普通二维码生成成功', 3000)
             else:
                 # 生成个性化二维码
                 params = self.get_personal_params()
@@ -366,10 +406,11 @@ class QrCodeGUI(QMainWindow):
         try:
             filename, _ = QFileDialog.getSaveFileName(
                 self, '保存图片', './qrcode.png',
-                '图片文件 (*.png);;所有文件 (*)'
+                '图片文件 (*.png);;SVG矢量图 (*.svg);;PDF文件 (*.pdf);;所有文件 (*)'
             )
             if filename:
-                self.qr_img.save(filename)
+                from ..core.vector_output import save_image
+                save_image(self.qr_img, filename)
                 QMessageBox.information(self, '成功', '图片保存成功！')
                 self.show_status_message(f'✓ 图片已保存: {filename}', 5000)
 
@@ -447,33 +488,52 @@ class QrCodeGUI(QMainWindow):
             self.show_status_message('批量生成完成', 3000)
 
     def on_batch_generate_with_data(self, batch_data):
-        """执行批量生成二维码"""
+        """执行批量生成二维码或条形码"""
+        is_barcode = batch_data.get('mode') == 'barcode'
         # 创建进度对话框
-        progress = QProgressDialog('正在生成二维码...', '取消', 0, len(batch_data.get('lines', [])), self)
+        label = '条形码' if is_barcode else '二维码'
+        progress = QProgressDialog(f'正在生成{label}...', '取消', 0, len(batch_data.get('lines', [])), self)
         progress.setWindowTitle('批量生成进度')
         progress.setMinimumDuration(0)
         progress.setModal(True)
 
-        # 定义进度回调函数
+        # 定义进度回调函数（文件数据源的总数由引擎统计后给出）
         def progress_callback(current, total, message):
+            if progress.maximum() != total:
+                progress.setMaximum(total)
             progress.setLabelText(message)
             progress.setValue(current)
             return progress.wasCanceled()
 
         try:
-            success_count, error_count = self.generator.batch_generate_qrcodes(batch_data, progress_callback)
+            if is_barcode:
+                success_count, error_count = self.generator.batch_generate_barcodes(batch_data, progress_callback)
+            else:
+                success_count, error_count = self.generator.batch_generate_qrcodes(batch_data, progress_callback)
             progress.setValue(progress.maximum())
 
             # 显示结果
+            stats = self.generator.last_batch_stats or {}
+            versions = stats.get('versions', {})
+            version_text = '、'.join(
+                f'版本{version}: {count}' for version, count in sorted(versions.items()) if version
+            )
             QMessageBox.information(
                 self, '批量生成完成',
                 f'生成完成！\n'
                 f'成功: {success_count} 个\n'
                 f'失败: {error_count} 个\n'
-                f'输出目录: {batch_data.get("output_dir", "")}'
+                + (f'跳过（已生成）: {stats["skipped"]} 个\n' if stats.get('skipped') else '')
+                + (f'去重: {stats["deduplicated"]} 个，节省 {stats["dedup_saved_bytes"] / 1024:.1f} KB\n'
+                   if stats.get('deduplicated') else '')
+                + (f'{version_text}\n' if version_text else '')
+                + (f'平均大小: {stats["encoded_bytes_mean"] / 1024:.1f} KB，'
+                   f'平均编码耗时: {stats["encode_ms_mean"]:.2f} ms\n'
+                   if stats.get('encoded') else '')
+                + f'输出位置: {stats.get("output", batch_data.get("output_dir", ""))}'
             )
 
-            if success_count > 0:
+            if success_count > 0 or stats.get('skipped'):
                 QtWidgets.QDialog.accept(dialog)
 
         except Exception as e:
@@ -622,10 +682,12 @@ class QrCodeGUI(QMainWindow):
             if hasattr(self, 'qr_img') and self.qr_img is not None:
                 filename, _ = QFileDialog.getSaveFileName(
                     self, '保存图片', './qrcode.png',
-                    '图片文件 (*.png *.jpg *.jpeg *.bmp);;PNG文件 (*.png);;JPEG文件 (*.jpg *.jpeg);;BMP文件 (*.bmp);;所有文件 (*)'
+                    '图片文件 (*.png *.jpg *.jpeg *.bmp);;PNG文件 (*.png);;JPEG文件 (*.jpg *.jpeg);;BMP文件 (*.bmp);;'
+                    'SVG矢量图 (*.svg);;PDF文件 (*.pdf);;所有文件 (*)'
                 )
                 if filename:
-                    self.qr_img.save(filename)
+                    from ..core.vector_output import save_image
+                    save_image(self.qr_img, filename)
                     QMessageBox.information(self, '成功', '图片保存成功！')
                     self.show_status_message(f'✓ 图片已保存: {filename}', 5000)
             else:
@@ -0,0 +1,16 @@
+"""
+二维码生成器命令行入口
+适用于定时任务、CI 等无显示环境，不依赖 PySide6
+
+python cli.py generate "https://example.com" -o code.png
+python cli.py barcode 6901234567892 -o bar.png --symbology ean13
+python cli.py batch --input data.csv --output-dir out
+python cli.py scan code.png
+"""
+import sys
+
+from app.cli import main
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,15 +15,29 @@ pip install MyQR
 • 识别图片中的二维码/条形码
 • 识别剪贴板中的二维码/条形码
 • 批量生成二维码
+
+设置环境变量 QRGEN_IMPORT_PROFILE=1 启动时，退出后会在标准错误输出各模块的导入耗时；
+设置 QRGEN_STARTUP_REPORT=<路径> 时引擎预加载完成后即退出并写出 JSON 报告（见 scripts/bench_startup.py）；
+设置 QRGEN_METRICS=<路径> 时退出前写出生成和识别各阶段的耗时统计（见 app/core/metrics.py）
 """
 import sys
-from PySide6.QtWidgets import QApplication
-from PySide6 import QtGui
-from app.ui.main_window import QrCodeGUI
+import multiprocessing
+from app.core import import_profile, metrics
 
 
 def main():
     """程序主入口"""
+    # 打包后的程序在批量生成时会启动子进程，需要先处理子进程入口
+    multiprocessing.freeze_support()
+
+    # 导入计时需在导入 PySide6 和界面模块之前安装
+    import_profile.install_from_env()
+    metrics.install_from_env()
+    from PySide6.QtWidgets import QApplication
+    from PySide6 import QtGui
+    from app.ui.main_window import QrCodeGUI
+    import_profile.mark('imports')
+
     # 创建应用程序实例
     app = QApplication(sys.argv)
 
@@ -42,9 +56,15 @@ def main():
 
     # 创建主窗口
     gui = QrCodeGUI()
+    import_profile.mark('window_created')
 
     # 显示窗口并启动应用程序
     gui.show()
+    import_profile.mark('window_shown')
+
+    # 启动基准测试：就绪后立即退出，退出时写出报告
+    if import_profile.report_requested():
+        gui.engines_ready.connect(app.quit)
     sys.exit(app.exec())
 
 
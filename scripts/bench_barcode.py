@@ -0,0 +1,152 @@
+"""
+条形码引擎校验与基准测试：
+1. 把内置引擎输出的 Code128 模块序列解码回文本并核对校验符，同时与 python-barcode 比较模块数
+2. EAN-13、Code39、ITF 的模块序列与 python-barcode 逐位比对
+3. 对比内置引擎与 python-barcode（ImageWriter）生成图片的耗时
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# 允许从 scripts 目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import barcode  # noqa: E402
+from app.core import barcode_engine  # noqa: E402
+from app.core.qr_generator_engine import QRCodeGenerator  # noqa: E402
+
+
+_SYMBOL_BY_MODULES = {tuple(m): value for value, m in enumerate(barcode_engine._CODE128_MODULES[:106])}
+
+
+def decode_code128(modules):
+    """把 Code128 模块序列解码为文本，校验符不符时抛出异常"""
+    modules = tuple(bool(m) for m in modules)
+    if modules[-13:] != tuple(barcode_engine._CODE128_MODULES[barcode_engine.CODE128_STOP]):
+        raise ValueError("终止符错误")
+    symbols = [_SYMBOL_BY_MODULES[modules[i:i + 11]] for i in range(0, len(modules) - 13, 11)]
+    *data, checksum = symbols
+    if (data[0] + sum(i * value for i, value in enumerate(data[1:], 1))) % 103 != checksum:
+        raise ValueError("校验符错误")
+
+    code_set = {103: 'A', 104: 'B', 105: 'C'}[data[0]]
+    text = []
+    shift = False
+    for value in data[1:]:
+        current = code_set
+        if shift:
+            current = 'B' if code_set == 'A' else 'A'
+            shift = False
+        if current == 'C' and value < 100:
+            text.append(f"{value:02d}")
+        elif value == 98 and current != 'C':
+            shift = True
+        elif value in (99, 100, 101):
+            code_set = {99: 'C', 100: 'B', 101: 'A'}[value]
+        elif current == 'A':
+            text.append(chr(value + 32) if value < 64 else chr(value - 64))
+        else:
+            text.append(chr(value + 32))
+    return ''.join(text)
+
+
+def random_content(rng):
+    """随机生成纯数字、数字为主或任意 ASCII 的内容"""
+    length = rng.randint(1, 40)
+    kind = rng.random()
+    if kind < 0.3:
+        alphabet = '0123456789'
+    elif kind < 0.6:
+        alphabet = '0123456789' * 3 + 'ABCabc-\t'
+    else:
+        alphabet = ''.join(chr(i) for i in range(128))
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+def verify(cases, seed):
+    """解码校验，返回 (失败数, 比 python-barcode 短的数量, 比 python-barcode 长的数量)"""
+    rng = random.Random(seed)
+    failures = shorter = longer = 0
+    for _ in range(cases):
+        content = random_content(rng)
+        modules = barcode_engine.code128_modules(content)
+        if decode_code128(modules) != content:
+            failures += 1
+            print(f"解码不一致: {content!r}")
+            continue
+        try:
+            reference = barcode.get('code128', content).build()[0]
+        except Exception:
+            continue
+        if len(modules) < len(reference):
+            shorter += 1
+        elif len(modules) > len(reference):
+            longer += 1
+    return failures, shorter, longer
+
+
+def verify_others(cases, seed):
+    """EAN-13、Code39、ITF 与 python-barcode 逐位比对，返回不一致的数量"""
+    rng = random.Random(seed)
+    generators = {
+        'ean13': lambda: ''.join(rng.choice('0123456789') for _ in range(12)),
+        'code39': lambda: ''.join(rng.choice(barcode_engine._CODE39_CHARS) for _ in range(rng.randint(1, 20))),
+        'itf': lambda: ''.join(rng.choice('0123456789') for _ in range(rng.randint(1, 20))),
+    }
+    mismatches = 0
+    for _ in range(cases):
+        for symbology, make in generators.items():
+            content = make()
+            modules, _ = barcode_engine.SYMBOLOGIES[symbology](content)
+            bits = ''.join('1' if m else '0' for m in modules)
+            # python-barcode 用 G 标记 EAN 的护线（条）
+            reference = barcode.get(symbology, content).build()[0].replace('G', '1')
+            if bits != reference:
+                mismatches += 1
+                print(f"{symbology} 不一致: {content!r}")
+    return mismatches
+
+
+def timeit(func, repeat):
+    """返回单次调用的平均耗时（毫秒）"""
+    func()  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="校验条形码引擎并对比耗时")
+    parser.add_argument("--cases", type=int, default=2000, help="随机校验用例数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    parser.add_argument("--repeat", type=int, default=100, help="计时重复次数")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    failures, shorter, longer = verify(args.cases, args.seed)
+    print(f"解码校验: {args.cases} 个用例，失败 {failures} 个")
+    # python-barcode 的字符集切换是启发式的，且会丢弃开头的 "99"，因此偶尔比内置引擎短
+    print(f"模块数对比 python-barcode: 更短 {shorter} 个，更长 {longer} 个")
+    mismatches = verify_others(args.cases // 4, args.seed)
+    print(f"EAN-13/Code39/ITF 逐位比对: 各 {args.cases // 4} 个用例，不一致 {mismatches} 个")
+
+    generator = QRCodeGenerator()
+    content = "WH-2026-000123456789"
+    print("=" * 60)
+    print(f"{'后端':<18}{'含文字':>10}{'不含文字':>12}")
+    for backend in ('native', 'python-barcode'):
+        with_text = timeit(lambda: generator.generate_barcode(content, {'backend': backend}), args.repeat)
+        without_text = timeit(lambda: generator.generate_barcode(content, {'backend': backend, 'text': False}),
+                              args.repeat)
+        print(f"{backend:<18}{with_text:>10.2f}{without_text:>12.2f}")
+    print("=" * 60)
+    print("单位: 毫秒/张")
+
+    sys.exit(1 if failures or mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+守护进程基准测试：
+对比每个任务启动一次 cli.py generate、每个任务启动一次 cli.py client 或最小客户端（连接守护进程）、
+同一连接上连续请求（单连接和多连接并发）以及进程内直接渲染的单任务耗时和吞吐量。
+测试自行在临时套接字上启动守护进程，结束后关闭
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from app.core.socket_client import SOCKET_ENV_VAR, DaemonClient  # noqa: E402
+
+
+def contents(count, offset=0):
+    """互不相同的内容，避免命中缓存"""
+    return [f"https://example.com/item/{offset + i:08d}" for i in range(count)]
+
+
+def report(label, count, elapsed):
+    per_job = elapsed * 1000 / count
+    print(f"{label:<28}{count:>8}{per_job:>12.3f}{count / elapsed:>12.1f}")
+    return {'jobs': count, 'ms_per_job': round(per_job, 3), 'jobs_per_second': round(count / elapsed, 1)}
+
+
+def bench_subprocess(command_for, items, env, output_dir):
+    start = time.perf_counter()
+    for i, content in enumerate(items):
+        subprocess.run(command_for(content, os.path.join(output_dir, f"{i}.png")), cwd=PROJECT_DIR, env=env,
+                       check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def bench_connection(path, items):
+    with DaemonClient(path) as client:
+        start = time.perf_counter()
+        for content in items:
+            client.render('qrcode', content)
+        return time.perf_counter() - start
+
+
+def bench_concurrent(path, items, concurrency):
+    """多个连接并发请求，每个连接处理一部分任务"""
+    chunks = [items[i::concurrency] for i in range(concurrency)]
+    threads = [threading.Thread(target=bench_connection, args=(path, chunk)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def bench_in_process(items):
+    from app.core.http_service import parse_job, render_job
+    from app.core.qr_generator_engine import QRCodeGenerator
+
+    generator = QRCodeGenerator()
+    render_job(generator, parse_job('qrcode', {'content': 'warm-up'}))
+    start = time.perf_counter()
+    for content in items:
+        render_job(generator, parse_job('qrcode', {'content': content}))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比守护进程与逐次启动进程的渲染吞吐量")
+    parser.add_argument("--spawn-jobs", type=int, default=20, help="逐次启动进程的任务数")
+    parser.add_argument("--jobs", type=int, default=2000, help="连接复用和进程内渲染的任务数")
+    parser.add_argument("--workers", type=int, help="守护进程子进程数，默认为 CPU 核数")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发连接数")
+    parser.add_argument("--output", help="结果 JSON 文件")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'qrgen.sock')
+        env = dict(os.environ, **{SOCKET_ENV_VAR: path})
+        command = [sys.executable, 'cli.py', 'daemon']
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        daemon = subprocess.Popen(command, cwd=PROJECT_DIR, env=env, stdout=subprocess.PIPE, text=True)
+        try:
+            listening = json.loads(daemon.stdout.readline())
+            print("=" * 60)
+            print(f"守护进程: {listening['socket']}，子进程 {listening['workers']} 个")
+            print(f"{'方式':<28}{'任务数':>8}{'毫秒/任务':>12}{'任务/秒':>12}")
+
+            def generate_command(content, output):
+                return [sys.executable, 'cli.py', 'generate', content, '-o', output]
+
+            def client_command(content, output):
+                return [sys.executable, 'cli.py', 'client', 'qrcode', content, '-o', output]
+
+            def thin_client_command(content, output):
+                return [sys.executable, '-m', 'app.core.socket_client', 'qrcode', content, output]
+
+            items = contents(args.spawn_jobs)
+            results['spawn_generate'] = report(
+                '每任务启动 cli.py generate', len(items), bench_subprocess(generate_command, items, env, tmp))
+            items = contents(args.spawn_jobs, args.spawn_jobs)
+            results['spawn_client'] = report(
+                '每任务启动 cli.py client', len(items), bench_subprocess(client_command, items, env, tmp))
+            items = contents(args.spawn_jobs, 2 * args.spawn_jobs)
+            results['spawn_thin_client'] = report(
+                '每任务启动最小客户端', len(items), bench_subprocess(thin_client_command, items, env, tmp))
+
+            items = contents(args.jobs, 1000000)
+            results['connection'] = report('单连接连续请求', len(items), bench_connection(path, items))
+            items = contents(args.jobs, 2000000)
+            results['concurrent'] = report(
+                f'{args.concurrency} 个连接并发', len(items), bench_concurrent(path, items, args.concurrency))
+            items = contents(args.jobs, 3000000)
+            results['in_process'] = report('进程内渲染', len(items), bench_in_process(items))
+            print("=" * 60)
+        finally:
+            daemon.send_signal(signal.SIGTERM)
+            daemon.wait(timeout=30)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+"""
+引擎基准测试：
+覆盖 QRCodeGenerator 与 QRCodeScanner 的主要场景——各版本和尺寸的普通二维码（numpy 与 pil 后端）、
+各码制条形码、个性化二维码（无背景、黑白背景、彩色背景）、批量生成吞吐量（目录、ZIP、多进程），
+以及干净图片和加噪图片（噪声、模糊、旋转、JPEG 压缩）的识别。
+
+每个场景在独立的子进程中运行，互不影响缓存和内存统计：先预热若干次，再计时固定次数，
+记录延迟分位数（p50、p90、p99）、吞吐量和峰值内存（进程峰值 RSS，以及计时后单独运行少量次数时
+tracemalloc 统计的 Python/NumPy 分配峰值，不含 PIL 内部缓冲区）。
+生成器关闭图片缓存，每次调用的内容都不相同；随机数固定种子，结果可重复。
+
+结果保存为 JSON，用 --compare 与保存的基准结果对比，p50、p90 延迟或峰值内存超出阈值、失败次数增加时视为回退，
+退出码为 1，可直接用于 CI。识别场景需要 zbar 动态库，缺少时跳过。
+
+用法：
+    python scripts/bench_engines.py --output baseline.json
+    python scripts/bench_engines.py --compare baseline.json --threshold 15
+    python scripts/bench_engines.py --cases simple,scan --scale 0.5
+"""
+import argparse
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import numpy as np  # noqa: E402
+from PIL import Image, ImageFilter  # noqa: E402
+from app.core.qr_generator_engine import QRCodeGenerator  # noqa: E402
+from app.core.qr_scanner_engine import QRCodeScanner  # noqa: E402
+
+
+# 普通二维码的版本（作为最小版本）和图片边长
+QR_VERSIONS = (1, 10, 25, 40)
+QR_SIZES = (232, 1000)
+
+# 每个批量任务的条数
+BATCH_ITEMS = 100
+
+# tracemalloc 统计内存时的运行次数
+TRACED_RUNS = 5
+
+# 预热调用的起始序号
+WARMUP_OFFSET = 900000
+
+
+class SkipCase(Exception):
+    """场景依赖的可选组件不可用"""
+
+
+class Case:
+    """
+    一个基准场景
+
+    setup(context) 返回单次操作函数 op(i)，i 为计时序号，用于生成不同的内容；
+    op 返回 False 时计为一次失败（如识别不出内容）。
+    """
+
+    def __init__(self, name, iterations, setup, items=1):
+        """
+        Args:
+            name (str): 场景名称，形如 组/参数
+            iterations (int): scale 为 1 时的计时次数
+            setup (callable): 准备函数，接收 BenchContext
+            items (int): 每次操作处理的条数，用于计算条目吞吐量
+        """
+        self.name = name
+        self.iterations = iterations
+        self.setup = setup
+        self.items = items
+
+    @property
+    def group(self):
+        return self.name.split('/', 1)[0]
+
+
+class BenchContext:
+    """场景准备时共享的对象：生成器、临时目录和随机数"""
+
+    def __init__(self, temp_dir, seed):
+        self.temp_dir = temp_dir
+        self.random = random.Random(seed)
+        self.generator = QRCodeGenerator(cache_bytes=0)
+
+    def background(self, size=800):
+        """渐变背景图片，同一进程只生成一次"""
+        path = os.path.join(self.temp_dir, 'background.png')
+        if not os.path.exists(path):
+            x = np.linspace(0, 255, size, dtype=np.uint8)
+            rgb = np.stack(np.broadcast_arrays(x[None, :], x[:, None], x[::-1][None, :]), axis=-1)
+            Image.fromarray(rgb, 'RGB').save(path)
+        return path
+
+
+def simple_case(version, size, renderer='numpy'):
+    def setup(context):
+        params = {'version': version, 'size': size, 'margin': 4, 'renderer': renderer}
+
+        def op(i):
+            context.generator.generate_simple_qrcode(f"QR{i:010d}", params)
+        return op
+    return setup
+
+
+def barcode_case(symbology, content_for):
+    def setup(context):
+        params = {'symbology': symbology}
+
+        def op(i):
+            context.generator.generate_barcode(content_for(i), params)
+        return op
+    return setup
+
+
+def personal_case(background, colorized):
+    def setup(context):
+        params = {'picture_path': context.background() if background else '', 'colorized': colorized}
+
+        def op(i):
+            context.generator.generate_personal_qrcode(f"https://example.com/item/{i:08d}", params)
+        return op
+    return setup
+
+
+def batch_case(kind, sink='dir', workers=1):
+    def setup(context):
+        def op(i):
+            output_dir = tempfile.mkdtemp(dir=context.temp_dir)
+            try:
+                if kind == 'qrcode':
+                    batch_data = {'lines': [f"https://example.com/batch/{i:04d}/{n:06d}" for n in range(BATCH_ITEMS)],
+                                  'size': 232}
+                    generate = context.generator.batch_generate_qrcodes
+                else:
+                    batch_data = {'lines': [f"WH-{i:04d}-{n:08d}" for n in range(BATCH_ITEMS)],
+                                  'symbology': 'code128'}
+                    generate = context.generator.batch_generate_barcodes
+                batch_data.update({'output_dir': output_dir, 'sink': sink, 'workers': workers, 'resume': False})
+                success, error = generate(batch_data)
+                return error == 0
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+        return op
+    return setup
+
+
+def add_noise(img, rng):
+    """模拟拍摄和传输的失真：轻微旋转、模糊、高斯噪声和低质量 JPEG"""
+    img = img.convert('L').rotate(rng.uniform(-8, 8), resample=Image.BILINEAR, expand=True, fillcolor=255)
+    img = img.filter(ImageFilter.GaussianBlur(1.2))
+    pixels = np.asarray(img, dtype=np.float32)
+    noise = np.random.default_rng(rng.randrange(2 ** 32)).normal(0, 25, pixels.shape)
+    noisy = Image.fromarray(np.clip(pixels + noise, 0, 255).astype(np.uint8), 'L')
+    buffer = io.BytesIO()
+    noisy.save(buffer, 'JPEG', quality=40)
+    buffer.seek(0)
+    return Image.open(buffer).convert('L')
+
+
+def scan_case(kind, noisy, variants=20):
+    def setup(context):
+        try:
+            from pyzbar.pyzbar import decode  # noqa: F401
+        except ImportError as e:
+            raise SkipCase(f"pyzbar 不可用: {e}")
+
+        scanner = QRCodeScanner()
+        # 预先生成若干张图片写入文件，计时只包含读取和识别
+        samples = []
+        for n in range(variants):
+            if kind == 'qrcode':
+                content = f"https://example.com/scan/{n:06d}"
+                img = context.generator.generate_simple_qrcode(content, {'version': 'auto', 'size': 400, 'margin': 4})
+            else:
+                content = f"WH-{n:012d}"
+                img = context.generator.generate_barcode(content, {'symbology': 'code128'})
+            if noisy:
+                img = add_noise(img, context.random)
+            path = os.path.join(context.temp_dir, f"scan_{kind}_{n}.png")
+            img.save(path)
+            samples.append((path, content))
+
+        def op(i):
+            path, content = samples[i % len(samples)]
+            return any(result.data.decode('utf-8', errors='replace') == content
+                       for result in scanner.recognize_code(path))
+        return op
+    return setup
+
+
+def build_cases(batch_workers):
+    """全部场景，按名称排列"""
+    cases = []
+    for version in QR_VERSIONS:
+        for size in QR_SIZES:
+            iterations = 200 if size < 500 else 60
+            cases.append(Case(f"simple/v{version}-{size}", iterations, simple_case(version, size)))
+    for version in (1, 10):
+        cases.append(Case(f"simple-pil/v{version}-232", 100, simple_case(version, 232, 'pil')))
+
+    cases.extend([
+        Case("barcode/code128", 300, barcode_case('code128', lambda i: f"WH-{i:012d}")),
+        Case("barcode/ean13", 300, barcode_case('ean13', lambda i: f"{690000000000 + i:012d}")),
+        Case("barcode/code39", 300, barcode_case('code39', lambda i: f"ITEM{i:08d}")),
+        Case("barcode/itf", 300, barcode_case('itf', lambda i: f"{i:014d}")),
+        Case("personal/plain", 30, personal_case(False, False)),
+        Case("personal/background", 30, personal_case(True, False)),
+        Case("personal/colorized", 30, personal_case(True, True)),
+        Case("batch/qrcode-dir", 5, batch_case('qrcode'), BATCH_ITEMS),
+        Case("batch/qrcode-zip", 5, batch_case('qrcode', sink='zip'), BATCH_ITEMS),
+        Case(f"batch/qrcode-dir-w{batch_workers}", 5, batch_case('qrcode', workers=batch_workers), BATCH_ITEMS),
+        Case("batch/barcode-dir", 5, batch_case('barcode'), BATCH_ITEMS),
+        Case("scan/qrcode-clean", 60, scan_case('qrcode', False)),
+        Case("scan/qrcode-noisy", 60, scan_case('qrcode', True)),
+        Case("scan/barcode-clean", 60, scan_case('barcode', False)),
+        Case("scan/barcode-noisy", 60, scan_case('barcode', True)),
+    ])
+    return cases
+
+
+def select_cases(cases, patterns):
+    """按名称或组名筛选，patterns 为空时返回全部"""
+    if not patterns:
+        return cases
+    selected = [case for case in cases if case.name in patterns or case.group in patterns]
+    unknown = set(patterns) - {case.name for case in cases} - {case.group for case in cases}
+    if unknown:
+        raise ValueError(f"未知的场景: {', '.join(sorted(unknown))}")
+    return selected
+
+
+def percentile(values, fraction):
+    """已排序列表的分位数"""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def current_rss_kb():
+    """当前常驻内存（KB），仅 Linux"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_kb():
+    """进程峰值常驻内存（KB），不支持的系统返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_case(case, args):
+    """在当前进程中运行一个场景，返回结果字典"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        context = BenchContext(temp_dir, args.seed)
+        op = case.setup(context)
+        # 预热使用计时范围之外的序号，内容与计时时不同
+        for i in range(args.warmup):
+            op(WARMUP_OFFSET + i)
+
+        iterations = max(1, round(case.iterations * args.scale))
+        gc.collect()
+        rss_before = current_rss_kb()
+        latencies = []
+        failures = 0
+        start = time.perf_counter()
+        for i in range(iterations):
+            op_start = time.perf_counter()
+            ok = op(i)
+            latencies.append((time.perf_counter() - op_start) * 1000)
+            failures += ok is False
+        elapsed = time.perf_counter() - start
+        peak_rss = peak_rss_kb()
+
+        # tracemalloc 会显著拖慢分配，单独运行少量次数统计内存
+        gc.collect()
+        tracemalloc.start()
+        for i in range(min(iterations, TRACED_RUNS)):
+            op(iterations + i)
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'items': case.items,
+        'failures': failures,
+        'latency_ms': {
+            'mean': round(sum(latencies) / iterations, 4),
+            'p50': round(percentile(latencies, 0.50), 4),
+            'p90': round(percentile(latencies, 0.90), 4),
+            'p99': round(percentile(latencies, 0.99), 4),
+            'max': round(latencies[-1], 4),
+        },
+        'ops_per_second': round(iterations / elapsed, 2),
+        'items_per_second': round(iterations * case.items / elapsed, 2),
+        'memory_kb': {
+            'rss_before': rss_before,
+            'peak_rss': peak_rss,
+            'traced_peak': traced_peak // 1024,
+        },
+    }
+
+
+def run_isolated(case, args):
+    """在子进程中运行场景，避免前一个场景的缓存、导入和内存峰值影响结果"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output = os.path.join(temp_dir, 'case.json')
+        command = [sys.executable, str(Path(__file__).resolve()), '--run-case', case.name,
+                   '--case-output', output, '--scale', str(args.scale), '--warmup', str(args.warmup),
+                   '--seed', str(args.seed), '--batch-workers', str(args.batch_workers)]
+        process = subprocess.run(command, cwd=PROJECT_DIR, capture_output=True, text=True, timeout=args.timeout)
+        if process.returncode != 0 or not os.path.exists(output):
+            lines = (process.stderr or process.stdout).strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"退出码 {process.returncode}")
+        with open(output, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def print_result(name, result):
+    if 'skipped' in result:
+        print(f"{name:<28}  跳过: {result['skipped']}")
+        return
+    if 'error' in result:
+        print(f"{name:<28}  ✗ {result['error']}")
+        return
+    latency = result['latency_ms']
+    throughput = result['items_per_second'] if result['items'] > 1 else result['ops_per_second']
+    memory = result['memory_kb']
+    peak_mb = f"{memory['peak_rss'] / 1024:.1f}" if memory['peak_rss'] else '-'
+    failures = f"  失败 {result['failures']}" if result['failures'] else ''
+    print(f"{name:<28}{latency['p50']:>9.2f}{latency['p90']:>9.2f}{latency['p99']:>9.2f}"
+          f"{throughput:>10.1f}{peak_mb:>9}{memory['traced_peak'] / 1024:>9.1f}{failures}")
+
+
+def _metrics(result, args):
+    """用于对比的指标：(名称, 数值, 百分比阈值, 最小绝对变化)"""
+    latency = result['latency_ms']
+    yield 'p50_ms', latency['p50'], args.threshold, args.min_delta
+    yield 'p90_ms', latency['p90'], args.threshold, args.min_delta
+    memory = result['memory_kb']
+    if memory.get('peak_rss'):
+        yield 'peak_rss_kb', memory['peak_rss'], args.memory_threshold, args.min_memory_delta
+    yield 'traced_peak_kb', memory['traced_peak'], args.memory_threshold, args.min_memory_delta
+    # 失败次数（识别不出、批量中出错）只要增加即视为回退
+    yield 'failures', result['failures'], -1, 0
+
+
+def compare(baseline, current, args):
+    """
+    与基准结果对比，打印各指标的变化
+
+    Returns:
+        int: 超过阈值（百分比和绝对变化同时超过）的回退指标数
+    """
+    print("=" * 60)
+    print(f"对比基准: {baseline['meta'].get('commit')} -> {current['meta'].get('commit')}")
+    print(f"{'指标':<44}{'基准':>12}{'当前':>12}{'变化':>10}")
+    regressions = 0
+    for name, result in current['cases'].items():
+        base_result = baseline['cases'].get(name)
+        if not base_result or 'latency_ms' not in result or 'latency_ms' not in base_result:
+            continue
+        base_metrics = {metric: value for metric, value, _, _ in _metrics(base_result, args)}
+        for metric, value, threshold, min_delta in _metrics(result, args):
+            base = base_metrics.get(metric)
+            if base is None:
+                continue
+            change = (value - base) / base * 100 if base else 0.0
+            regressed = change > threshold and value - base > min_delta
+            regressions += regressed
+            flag = '  ✗ 回退' if regressed else ''
+            print(f"{f'{name}.{metric}':<44}{base:>12.2f}{value:>12.2f}{change:>+9.1f}%{flag}")
+    return regressions
+
+
+def git_commit():
+    """当前提交和工作区是否有未提交的修改"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="二维码生成与识别引擎基准测试")
+    parser.add_argument("--cases", default="", help="要运行的场景或组（simple、barcode、personal、batch、scan），逗号分隔")
+    parser.add_argument("--list", action="store_true", help="列出全部场景")
+    parser.add_argument("--scale", type=float, default=1.0, help="计时次数的倍数")
+    parser.add_argument("--warmup", type=int, default=3, help="每个场景计时前的预热次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--batch-workers", type=int, default=2, help="多进程批量场景的进程数")
+    parser.add_argument("--timeout", type=float, default=600, help="单个场景的超时秒数")
+    parser.add_argument("--output", help="结果 JSON 文件")
+    parser.add_argument("--compare", help="作为基准的结果 JSON 文件")
+    parser.add_argument("--threshold", type=float, default=10.0, help="延迟视为回退的变化百分比")
+    parser.add_argument("--min-delta", type=float, default=0.1, help="延迟视为回退的最小变化毫秒数")
+    parser.add_argument("--memory-threshold", type=float, default=20.0, help="内存视为回退的变化百分比")
+    parser.add_argument("--min-memory-delta", type=float, default=1024, help="内存视为回退的最小变化 KB 数")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--case-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    cases = build_cases(args.batch_workers)
+
+    # 子进程：运行单个场景并写出结果
+    if args.run_case:
+        case = select_cases(cases, [args.run_case])[0]
+        try:
+            result = run_case(case, args)
+        except SkipCase as e:
+            result = {'skipped': str(e)}
+        with open(args.case_output, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return 0
+
+    if args.list:
+        for case in cases:
+            print(f"{case.name:<28}{case.iterations:>6} 次")
+        return 0
+
+    try:
+        selected = select_cases(cases, [name.strip() for name in args.cases.split(',') if name.strip()])
+    except ValueError as e:
+        parser.error(str(e))
+
+    commit, dirty = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pillow': Image.__version__,
+            'scale': args.scale,
+            'warmup': args.warmup,
+            'seed': args.seed,
+        },
+        'cases': {},
+    }
+
+    print("=" * 60)
+    print(f"{'场景':<28}{'p50':>9}{'p90':>9}{'p99':>9}{'吞吐量':>10}{'峰值MB':>9}{'分配MB':>9}")
+    print(f"{'':<28}{'毫秒':>9}{'毫秒':>9}{'毫秒':>9}{'次(条)/秒':>10}{'RSS':>9}{'traced':>9}")
+    for case in selected:
+        try:
+            result = run_isolated(case, args)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            result = {'error': str(e)}
+        results['cases'][case.name] = result
+        print_result(case.name, result)
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.output}")
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(json.load(f), results, args)
+        print(f"回退指标: {regressions}")
+
+    failed = any('error' in result for result in results['cases'].values())
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+掩码评分基准：在版本 1-40 上比较 qrcode 库逐个候选的 lost_point 与叠加数组的向量化评分，
+并校验两者给出的罚分完全一致
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 允许从 scripts 目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from qrcode import util  # noqa: E402
+from app.core.qr_encoder import mask_candidates  # noqa: E402
+from app.core.qr_mask import penalty_scores  # noqa: E402
+
+
+def timeit(func, repeat):
+    """返回单次调用的平均耗时（毫秒）和最后一次的返回值"""
+    result = func()  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比较掩码罚分计算的耗时")
+    parser.add_argument("--repeat", type=int, default=3, help="每个版本的重复次数")
+    parser.add_argument("--step", type=int, default=1, help="版本步长，1 表示覆盖全部 40 个版本")
+    args = parser.parse_args()
+
+    mismatches = 0
+    total_loop = 0.0
+    total_stacked = 0.0
+
+    print("=" * 60)
+    print(f"{'版本':>6}{'逐个 lost_point (ms)':>24}{'叠加评分 (ms)':>16}{'加速比':>10}")
+    print("=" * 60)
+    for version in range(1, 41, args.step):
+        stack = mask_candidates('x' * (version * 20), version=version)
+        # qrcode 的 lost_point 以二维列表为输入
+        candidates = [matrix.tolist() for matrix in stack]
+
+        loop_ms, expected = timeit(lambda: [util.lost_point(m) for m in candidates], args.repeat)
+        stacked_ms, scores = timeit(lambda: penalty_scores(stack), args.repeat)
+        total_loop += loop_ms
+        total_stacked += stacked_ms
+
+        if list(scores) != expected:
+            mismatches += 1
+            print(f"✗ 版本 {version} 罚分不一致: {list(scores)} != {expected}")
+        print(f"{version:>6}{loop_ms:>24.2f}{stacked_ms:>16.2f}{loop_ms / stacked_ms:>10.1f}x")
+
+    print("=" * 60)
+    print(f"合计: 逐个 {total_loop:.1f} ms，叠加 {total_stacked:.1f} ms，"
+          f"加速 {total_loop / total_stacked:.1f}x，罚分不一致 {mismatches} 个版本")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
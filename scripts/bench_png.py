@@ -0,0 +1,95 @@
+"""
+PNG 编码基准测试：
+对比 PIL 默认保存与 png_encoder 在各压缩等级、策略下的文件大小和编码耗时，
+并确认 1 位 PNG 解码后与原图（阈值化后）逐像素一致；
+再用批量生成按各压缩参数输出一批二维码，报告批量统计中每张图片的平均、最大字节数和编码耗时
+"""
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 允许从 scripts 目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+from app.core.png_encoder import PNG_STRATEGIES, bilevel_pixels, encode_png  # noqa: E402
+from app.core.qr_generator_engine import QRCodeGenerator  # noqa: E402
+
+
+def timeit(func, repeat):
+    """返回 (单次调用的平均耗时（毫秒）, 最后一次的返回值)"""
+    result = func()  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def pil_png(img):
+    """PIL 默认参数保存的 PNG"""
+    fp = io.BytesIO()
+    img.save(fp, 'PNG')
+    return fp.getvalue()
+
+
+def bench_batch(generator, count, size):
+    """按各压缩等级、策略批量生成 count 个二维码，输出每张图片的字节数和编码耗时"""
+    lines = [f"https://example.com/item/{i:012d}" for i in range(count)]
+    print("=" * 60)
+    print(f"批量生成 {count} 个二维码（每张图片）")
+    print(f"{'编码方式':<24}{'平均字节':>10}{'最大字节':>10}{'平均毫秒':>10}{'最大毫秒':>10}")
+    for level in (1, 6, 9):
+        for strategy in PNG_STRATEGIES:
+            with tempfile.TemporaryDirectory() as output_dir:
+                generator.batch_generate_qrcodes({
+                    'lines': lines, 'output_dir': output_dir, 'size': size,
+                    'compress_level': level, 'png_strategy': strategy, 'resume': False,
+                })
+            stats = generator.last_batch_stats
+            print(f"{f'等级 {level} / {strategy}':<24}{stats['encoded_bytes_mean']:>10}{stats['encoded_bytes_max']:>10}"
+                  f"{stats['encode_ms_mean']:>10.3f}{stats['encode_ms_max']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比 PNG 编码的大小与耗时")
+    parser.add_argument("--repeat", type=int, default=50, help="计时重复次数")
+    parser.add_argument("--size", type=int, default=464, help="二维码像素尺寸")
+    parser.add_argument("--count", type=int, default=200, help="批量生成的二维码数量，0 表示跳过")
+    args = parser.parse_args()
+
+    generator = QRCodeGenerator()
+    images = {
+        '二维码': generator.generate_simple_qrcode("https://example.com/item/000123456789", {'size': args.size}),
+        '条形码': generator.generate_barcode("WH-2026-000123456789"),
+        '个性化二维码': generator.generate_personal_qrcode("https://example.com"),
+    }
+
+    mismatches = 0
+    for label, img in images.items():
+        print("=" * 60)
+        print(f"{label}: {img.size[0]}x{img.size[1]}, 模式 {img.mode}")
+        print(f"{'编码方式':<24}{'字节':>10}{'毫秒/张':>12}")
+        elapsed, data = timeit(lambda: pil_png(img), args.repeat)
+        print(f"{'PIL 默认':<24}{len(data):>10}{elapsed:>12.3f}")
+        for level in (1, 6, 9):
+            for strategy in PNG_STRATEGIES:
+                elapsed, data = timeit(lambda: encode_png(img, level, strategy), args.repeat)
+                print(f"{f'等级 {level} / {strategy}':<24}{len(data):>10}{elapsed:>12.3f}")
+
+        decoded = np.asarray(Image.open(io.BytesIO(data)).convert('1'))
+        if not np.array_equal(decoded, bilevel_pixels(img)):
+            mismatches += 1
+            print("解码结果与原图不一致")
+    if args.count:
+        bench_batch(generator, args.count, args.size)
+    print("=" * 60)
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
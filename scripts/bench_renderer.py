@@ -0,0 +1,63 @@
+"""
+渲染后端基准测试：对比 qrcode 自带的 PIL 逐模块绘制与 numpy 向量化渲染
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 允许从 scripts 目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import qrcode  # noqa: E402
+from app.core.qr_generator_engine import QRCodeGenerator  # noqa: E402
+from app.core.qr_renderer import render_matrix  # noqa: E402
+
+
+def timeit(func, repeat):
+    """返回单次调用的平均耗时（毫秒）"""
+    func()  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比二维码渲染后端的耗时")
+    parser.add_argument("--repeat", type=int, default=20, help="每组参数的重复次数")
+    parser.add_argument("--size", type=int, default=580, help="输出像素尺寸")
+    parser.add_argument("--versions", default="1,5,10,20,30,40", help="逗号分隔的版本列表")
+    args = parser.parse_args()
+
+    # 关闭图片缓存，否则重复生成只会测到缓存命中
+    generator = QRCodeGenerator(cache_bytes=0)
+    versions = [int(v) for v in args.versions.split(",")]
+
+    print("=" * 72)
+    print(f"{'版本':>6}{'仅渲染 pil':>14}{'仅渲染 numpy':>14}{'端到端 pil':>14}{'端到端 numpy':>14}")
+    print("=" * 72)
+    for version in versions:
+        # 内容长度随版本增长，保证矩阵确实达到目标版本
+        content = "x" * (version * 10)
+
+        # 仅渲染：矩阵只计算一次，分别计时两种后端的绘制
+        qr = qrcode.QRCode(version=version, error_correction=qrcode.ERROR_CORRECT_L,
+                           box_size=max(args.size // (version * 4 + 25), 1), border=4)
+        qr.add_data(content)
+        qr.make()
+        render_pil = timeit(qr.make_image, args.repeat)
+        render_numpy = timeit(lambda: render_matrix(qr.modules, size=args.size, border=4), args.repeat)
+
+        # 端到端：包含编码与掩码选择
+        params = {'version': version, 'size': args.size, 'margin': 4}
+        total_pil = timeit(lambda: generator.generate_simple_qrcode(content, dict(params, renderer='pil')), args.repeat)
+        total_numpy = timeit(lambda: generator.generate_simple_qrcode(content, dict(params, renderer='numpy')), args.repeat)
+
+        print(f"{version:>6}{render_pil:>14.2f}{render_numpy:>14.2f}{total_pil:>14.2f}{total_numpy:>14.2f}")
+    print("=" * 72)
+    print("单位: 毫秒/张")
+
+
+if __name__ == "__main__":
+    main()
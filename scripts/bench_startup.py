@@ -0,0 +1,386 @@
+"""
+启动耗时基准测试：
+测量源码运行（main.py 到主窗口就绪、cli.py 生成一张二维码、单独导入引擎）以及 Nuitka 编译产物
+（standalone、onefile、LTO，可由 build.py 现场编译或直接给出可执行文件）的冷启动与热启动耗时。
+
+被测程序在环境变量 QRGEN_STARTUP_REPORT 下运行：记录各模块导入耗时和启动关键节点
+（imports、window_created、window_shown、engines_ready 等），就绪后退出并写出 JSON 报告，
+这里据此把启动时间拆分为解释器启动、各阶段和各顶层包的导入耗时。
+结果保存为 JSON，用 --compare 与其他提交的结果对比，超出阈值的指标视为回退。
+
+指定 --drop-caches 时冷启动前清空系统文件缓存（仅 Linux，需要 root 权限，会影响整台机器，默认不做）；
+未指定或无法清空时冷启动只是每组的第一次运行，输出中注明，结果中 cache_dropped 为 false。
+
+用法：
+    python scripts/bench_startup.py --offscreen --output startup.json
+    python scripts/bench_startup.py --build standalone --build onefile --output startup.json
+    sudo python scripts/bench_startup.py --offscreen --cold 3 --drop-caches --output startup.json
+    python scripts/bench_startup.py --exe onefile=dist/QRcodeGenerate.exe --compare base.json
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from app.core.import_profile import ENV_VAR, REPORT_ENV_VAR  # noqa: E402
+
+
+# 单独导入引擎，测量第一次生成/识别前需要付出的导入开销
+ENGINES_CODE = (
+    "from app.core import import_profile; import_profile.install_from_env(); "
+    "import app.core.qr_generator_engine; import_profile.mark('generator'); "
+    "import app.core.qr_scanner_engine; import_profile.mark('scanner')"
+)
+
+# build.py 的编译参数组合
+BUILD_VARIANTS = {
+    'standalone': {'USE_STANDALONE': True, 'USE_ONEFILE': False, 'ENABLE_LTO': False},
+    'standalone-lto': {'USE_STANDALONE': True, 'USE_ONEFILE': False, 'ENABLE_LTO': True},
+    'onefile': {'USE_STANDALONE': True, 'USE_ONEFILE': True, 'ENABLE_LTO': False},
+    'onefile-lto': {'USE_STANDALONE': True, 'USE_ONEFILE': True, 'ENABLE_LTO': True},
+}
+
+# 汇总中列出的模块数
+TOP_MODULES = 15
+
+
+def source_targets(output_dir):
+    """源码运行的测试目标：名称 -> 命令"""
+    return {
+        'gui': [sys.executable, 'main.py'],
+        'cli': [sys.executable, 'cli.py', 'generate', 'https://example.com/item/000123456789',
+                '-o', str(Path(output_dir) / 'startup.png')],
+        'engines': [sys.executable, '-c', ENGINES_CODE],
+    }
+
+
+def drop_caches():
+    """清空整台机器的系统文件缓存，成功返回 True（仅 Linux，需要 root 权限），只在指定 --drop-caches 时调用"""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        os.sync()
+        with open('/proc/sys/vm/drop_caches', 'w') as f:
+            f.write('3\n')
+        return True
+    except OSError:
+        return False
+
+
+def path_size(path):
+    """文件或目录的总字节数"""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(item.stat().st_size for item in path.rglob('*') if item.is_file())
+
+
+def build_variant(variant):
+    """
+    用 build.py 按指定参数组合编译，每个组合输出到 dist/bench/<组合名>
+
+    Returns:
+        tuple: (可执行文件路径, 产物字节数)
+    """
+    spec = importlib.util.spec_from_file_location('build', PROJECT_DIR / 'scripts' / 'build.py')
+    build = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(build)
+    for name, value in BUILD_VARIANTS[variant].items():
+        setattr(build, name, value)
+    build.OUTPUT_DIR_NAME = str(Path('dist') / 'bench' / variant)
+    build.SHOW_PROGRESS = False
+    build.SHOW_MEMORY = False
+
+    if build.build_with_nuitka() != 0:
+        raise RuntimeError(f"编译 {variant} 失败")
+    output_dir = PROJECT_DIR / build.OUTPUT_DIR_NAME
+    if build.USE_ONEFILE:
+        exe = output_dir / build.OUTPUT_FILENAME
+        return exe, path_size(exe)
+    return output_dir / 'main.dist' / build.OUTPUT_FILENAME, path_size(output_dir / 'main.dist')
+
+
+def run_once(command, env, timeout):
+    """
+    运行一次被测程序
+
+    Returns:
+        dict: wall_ms（启动到退出）、bootstrap_ms（启动到开始计时，即解释器或 onefile 解包耗时）、
+            marks（各关键节点距启动的毫秒数）、phases（相邻节点之间的耗时）、imports（导入耗时）
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, 'report.json')
+        env = dict(env, **{REPORT_ENV_VAR: report_path})
+        env.pop(ENV_VAR, None)
+
+        started_wall = time.time()
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=PROJECT_DIR, env=env, capture_output=True, text=True,
+                                timeout=timeout)
+        wall_ms = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"退出码 {result.returncode}: {result.stderr.strip()[-500:]}")
+        if not os.path.exists(report_path):
+            raise RuntimeError(f"程序未写出启动报告，需要支持 {REPORT_ENV_VAR} 的版本")
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+
+    bootstrap_ms = (report['origin_wall'] - started_wall) * 1000
+    marks = {}
+    phases = {'bootstrap': bootstrap_ms}
+    previous = 0.0
+    for mark in report['marks']:
+        marks[mark['name']] = bootstrap_ms + mark['ms']
+        phases[mark['name']] = mark['ms'] - previous
+        previous = mark['ms']
+
+    packages = {}
+    for module in report['modules']:
+        package = module['module'].split('.')[0]
+        packages[package] = packages.get(package, 0.0) + module['self_ms']
+    return {
+        'wall_ms': wall_ms,
+        'bootstrap_ms': bootstrap_ms,
+        'marks': marks,
+        'phases': phases,
+        'imports': {
+            'count': len(report['modules']),
+            'total_ms': sum(module['self_ms'] for module in report['modules']),
+            'packages': packages,
+            'modules': {module['module']: module['cumulative_ms'] for module in report['modules']},
+        },
+    }
+
+
+def describe(values):
+    """中位数、最小值、最大值"""
+    return {
+        'median': round(statistics.median(values), 3),
+        'min': round(min(values), 3),
+        'max': round(max(values), 3),
+    }
+
+
+def _describe_keys(dicts):
+    """对一组字典中所有运行都出现的键分别求统计值"""
+    keys = [key for key in dicts[0] if all(key in item for item in dicts)]
+    return {key: describe([item[key] for item in dicts]) for key in keys}
+
+
+def summarize(runs):
+    """汇总同一目标、同一温度下的多次运行"""
+    imports = [run['imports'] for run in runs]
+    packages = _describe_keys([item['packages'] for item in imports])
+    modules = _describe_keys([item['modules'] for item in imports])
+    top = sorted(modules.items(), key=lambda item: item[1]['median'], reverse=True)[:TOP_MODULES]
+    return {
+        'runs': len(runs),
+        'wall_ms': describe([run['wall_ms'] for run in runs]),
+        'bootstrap_ms': describe([run['bootstrap_ms'] for run in runs]),
+        'marks': _describe_keys([run['marks'] for run in runs]),
+        'phases': _describe_keys([run['phases'] for run in runs]),
+        'import_count': describe([item['count'] for item in imports]),
+        'import_total_ms': describe([item['total_ms'] for item in imports]),
+        'packages': dict(sorted(packages.items(), key=lambda item: item[1]['median'], reverse=True)),
+        'top_modules': [{'module': name, 'cumulative_ms': stats['median']} for name, stats in top],
+    }
+
+
+def measure(name, command, env, args):
+    """测量一个目标的冷启动和热启动"""
+    print("=" * 60)
+    print(f"{name}: {' '.join(str(part) for part in command)}")
+    result = {'command': [str(part) for part in command]}
+
+    cold_runs = []
+    dropped = []
+    for _ in range(args.cold):
+        dropped.append(args.drop_caches and drop_caches())
+        cold_runs.append(run_once(command, env, args.timeout))
+    if cold_runs:
+        result['cold'] = dict(summarize(cold_runs), cache_dropped=all(dropped))
+        if all(dropped):
+            print("  冷启动前已清空文件缓存")
+        elif args.drop_caches:
+            print("  ⚠ 无法清空文件缓存（需要 Linux 和 root 权限），冷启动结果仅为第一次运行")
+        else:
+            print("  冷启动前未清空文件缓存（未指定 --drop-caches），冷启动结果仅为第一次运行")
+
+    # 没有冷启动运行时先预热一次，不计入结果
+    if not cold_runs:
+        run_once(command, env, args.timeout)
+    warm_runs = [run_once(command, env, args.timeout) for _ in range(args.warm)]
+    if warm_runs:
+        result['warm'] = summarize(warm_runs)
+
+    for temperature in ('cold', 'warm'):
+        if temperature not in result:
+            continue
+        summary = result[temperature]
+        print(f"  {temperature}（{summary['runs']} 次，中位数）: 总计 {summary['wall_ms']['median']:.1f} ms，"
+              f"导入 {summary['import_count']['median']:.0f} 个模块 {summary['import_total_ms']['median']:.1f} ms")
+        for phase, stats in summary['phases'].items():
+            print(f"    {phase:<20}{stats['median']:>10.1f} ms")
+        packages = list(summary['packages'].items())[:5]
+        print("    导入最多的包: " + ", ".join(f"{package} {stats['median']:.1f}" for package, stats in packages))
+    return result
+
+
+def _metrics(target):
+    """用于对比的指标：总耗时和各关键节点时刻的中位数"""
+    for temperature in ('cold', 'warm'):
+        summary = target.get(temperature)
+        if not summary:
+            continue
+        yield f"{temperature}.wall_ms", summary['wall_ms']['median']
+        for mark, stats in summary['marks'].items():
+            yield f"{temperature}.{mark}", stats['median']
+
+
+def compare(baseline, current, threshold, min_delta):
+    """
+    与基准结果对比，打印各指标的变化
+
+    Returns:
+        int: 超过阈值（百分比和绝对毫秒数同时超过）的回退指标数
+    """
+    print("=" * 60)
+    print(f"对比基准: {baseline['meta'].get('commit')} -> {current['meta'].get('commit')}")
+    print(f"{'指标':<36}{'基准':>10}{'当前':>10}{'变化':>10}")
+    regressions = 0
+    for name, target in current['targets'].items():
+        base_target = baseline['targets'].get(name)
+        if not base_target or 'error' in target or 'error' in base_target:
+            continue
+        base_metrics = dict(_metrics(base_target))
+        for metric, value in _metrics(target):
+            if metric not in base_metrics:
+                continue
+            base = base_metrics[metric]
+            change = (value - base) / base * 100 if base else 0.0
+            regressed = change > threshold and value - base > min_delta
+            regressions += regressed
+            flag = '  ✗ 回退' if regressed else ''
+            print(f"{f'{name}.{metric}':<36}{base:>10.1f}{value:>10.1f}{change:>+9.1f}%{flag}")
+    return regressions
+
+
+def git_commit():
+    """当前提交和工作区是否有未提交的修改"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def parse_exe(value):
+    """--exe 参数：名称=可执行文件路径"""
+    name, sep, path = value.partition('=')
+    if not sep or not name or not path:
+        raise argparse.ArgumentTypeError("格式应为 名称=路径")
+    return name, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量源码运行和编译产物的启动耗时")
+    parser.add_argument("--targets", default="gui,cli,engines",
+                        help="源码运行的测试目标，逗号分隔（gui、cli、engines），为空时不测源码")
+    parser.add_argument("--build", action="append", default=[], choices=list(BUILD_VARIANTS),
+                        help="用 build.py 编译并测量的组合，可重复")
+    parser.add_argument("--exe", action="append", default=[], type=parse_exe, metavar="名称=路径",
+                        help="直接测量已编译的可执行文件，可重复")
+    parser.add_argument("--cold", type=int, default=1, help="每个目标的冷启动次数")
+    parser.add_argument("--warm", type=int, default=5, help="每个目标的热启动次数")
+    parser.add_argument("--drop-caches", action="store_true",
+                        help="冷启动前清空整台机器的文件缓存（仅 Linux，需要 root 权限）")
+    parser.add_argument("--timeout", type=float, default=120, help="单次运行的超时秒数")
+    parser.add_argument("--offscreen", action="store_true", help="使用 Qt offscreen 平台（无显示环境）")
+    parser.add_argument("--output", help="结果 JSON 文件")
+    parser.add_argument("--compare", help="作为基准的结果 JSON 文件")
+    parser.add_argument("--threshold", type=float, default=10.0, help="视为回退的变化百分比")
+    parser.add_argument("--min-delta", type=float, default=5.0, help="视为回退的最小变化毫秒数")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+
+    commit, dirty = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'dirty': dirty,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'cold': args.cold,
+            'warm': args.warm,
+            'drop_caches': args.drop_caches,
+        },
+        'targets': {},
+    }
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        commands = source_targets(output_dir)
+        targets = {}
+        for name in filter(None, args.targets.split(',')):
+            if name not in commands:
+                parser.error(f"未知的测试目标: {name}")
+            targets[name] = (commands[name], None)
+        for variant in args.build:
+            print("=" * 60)
+            print(f"编译 {variant}")
+            try:
+                exe, size = build_variant(variant)
+            except Exception as e:
+                results['targets'][f"build:{variant}"] = {'error': str(e)}
+                print(f"✗ {e}")
+                continue
+            targets[f"build:{variant}"] = ([exe], size)
+        for name, path in args.exe:
+            targets[f"exe:{name}"] = ([Path(path).resolve()], path_size(path))
+
+        for name, (command, size) in targets.items():
+            try:
+                result = measure(name, command, env, args)
+            except (RuntimeError, subprocess.TimeoutExpired) as e:
+                result = {'command': [str(part) for part in command], 'error': str(e)}
+                print(f"✗ {name}: {e}")
+            if size is not None:
+                result['size_bytes'] = size
+            results['targets'][name] = result
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print("=" * 60)
+        print(f"结果已保存: {args.output}")
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(json.load(f), results, args.threshold, args.min_delta)
+        print(f"回退指标: {regressions}")
+
+    failed = any('error' in target for target in results['targets'].values())
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,6 +35,9 @@ ENABLE_PYSIDE6_PLUGIN = True            # 是否启用 PySide6 插件
 SHOW_PROGRESS = True                    # 是否显示编译进度
 SHOW_MEMORY = True                      # 是否显示内存使用
 
+# 项目根目录（本脚本位于 scripts 目录下），以上路径均相对于根目录
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
 # 依赖文件复制配置
 COPY_DEPENDENCIES = False                # 是否复制依赖文件
 DEPENDENCY_FOLDERS = []  # 需要复制的文件夹列表
@@ -46,7 +49,7 @@ def copy_dependencies(output_dist_dir):
     if not COPY_DEPENDENCIES:
         return
     
-    current_dir = Path(__file__).parent.absolute()
+    current_dir = PROJECT_DIR
     
     print("\n" + "=" * 60)
     print("开始复制依赖文件")
@@ -91,8 +94,8 @@ def copy_dependencies(output_dist_dir):
 def build_with_nuitka():
     """使用 Nuitka 编译项目"""
     
-    # 获取当前脚本所在目录
-    current_dir = Path(__file__).parent.absolute()
+    # 项目根目录
+    current_dir = PROJECT_DIR
     
     # 主文件路径
     main_file = current_dir / MAIN_FILE_NAME
@@ -217,7 +220,7 @@ def build_with_nuitka():
 
 def clean_build_files():
     """清理编译生成的文件"""
-    current_dir = Path(__file__).parent.absolute()
+    current_dir = PROJECT_DIR
     output_dir = current_dir / OUTPUT_DIR_NAME
     
     print("=" * 60)
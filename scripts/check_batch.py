@@ -0,0 +1,80 @@
+"""
+批量生成一致性检查：
+按界面和命令行的方式组装批量数据（总会带上二维码的 margin），
+确认批量生成的每个文件与用相同参数单独生成、按同样方式编码的图片尺寸、像素完全一致。
+依次检查普通二维码和各码制的条形码（含 barcode_margin 指定条形码边距）；任一项失败时以状态码 1 退出
+"""
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+# 允许从 scripts 目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+from app.core.qr_generator_engine import QRCodeGenerator  # noqa: E402
+from app.core.vector_output import encode_image  # noqa: E402
+
+
+# 与 app/ui/dialogs.py、app/cli.py 组装的批量数据一致
+BASE_BATCH = {'mode': 'simple', 'version': 'auto', 'size': 200, 'margin': 4, 'text': True, 'resume': False}
+
+CASES = [
+    ('二维码', {}, ['https://example.com', '12345'], lambda g, c: g.generate_simple_qrcode(c, {'size': 200})),
+    ('code128', {'mode': 'barcode', 'symbology': 'code128'}, ['WH-2026-0001', 'ABC'],
+     lambda g, c: g.generate_barcode(c, {'symbology': 'code128'})),
+    ('ean13', {'mode': 'barcode', 'symbology': 'ean13'}, ['4006381333931'],
+     lambda g, c: g.generate_barcode(c, {'symbology': 'ean13'})),
+    ('code39', {'mode': 'barcode', 'symbology': 'code39'}, ['CODE39'],
+     lambda g, c: g.generate_barcode(c, {'symbology': 'code39'})),
+    ('itf', {'mode': 'barcode', 'symbology': 'itf'}, ['12345678'],
+     lambda g, c: g.generate_barcode(c, {'symbology': 'itf'})),
+    ('code128 无文字', {'mode': 'barcode', 'symbology': 'code128', 'text': False}, ['ABC'],
+     lambda g, c: g.generate_barcode(c, {'symbology': 'code128', 'text': False})),
+    ('code128 barcode_margin=20', {'mode': 'barcode', 'symbology': 'code128', 'barcode_margin': 20}, ['ABC'],
+     lambda g, c: g.generate_barcode(c, {'symbology': 'code128', 'margin': 20})),
+]
+
+
+def run_case(generator, label, options, lines, single):
+    """批量生成 lines 并与单独生成的图片逐个比较，返回是否通过"""
+    batch_data = dict(BASE_BATCH, **options)
+    name = batch_data.get('symbology', 'qrcode') if batch_data['mode'] == 'barcode' else 'qrcode'
+    ok = True
+    with tempfile.TemporaryDirectory() as output_dir:
+        batch_data.update(lines=lines, output_dir=output_dir)
+        if batch_data['mode'] == 'barcode':
+            generator.batch_generate_barcodes(batch_data)
+        else:
+            generator.batch_generate_qrcodes(batch_data)
+        for i, content in enumerate(lines):
+            with Image.open(Path(output_dir, f"{name}_{i + 1}.png")) as img:
+                batch_img = img.convert('L')
+            # 批量输出按默认参数编码为 PNG（1 位），单独生成的图片同样编码后再比较
+            data = encode_image(single(generator, content), 'single.png')
+            with Image.open(io.BytesIO(data)) as img:
+                single_img = img.convert('L')
+            same = batch_img.size == single_img.size and np.array_equal(np.asarray(batch_img),
+                                                                        np.asarray(single_img))
+            print(f"{label:<28}{content:<22}{'x'.join(map(str, batch_img.size)):>10}"
+                  f"{'x'.join(map(str, single_img.size)):>10}{'通过' if same else '失败':>6}")
+            ok = ok and same
+    return ok
+
+
+def main():
+    generator = QRCodeGenerator()
+    print("=" * 60)
+    print(f"{'类型':<28}{'内容':<22}{'批量':>10}{'单个':>10}{'结果':>6}")
+    results = [run_case(generator, *case) for case in CASES]
+    print("=" * 60)
+    if not all(results):
+        print("检查失败")
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+编码器正确性检查（修改 qr_encoder.py、qr_mask.py、qr_segments.py 后必须通过）：
+1. 默认分段：随机内容、纠错等级、版本和掩码下，内置编码器与 qrcode 库的模块矩阵逐位一致
+2. 多分段与汉字模式：fit_segments 给出的分段（含汉字分段）原样写入 qrcode 库，模块矩阵逐位一致；
+   qrcode 库不支持汉字模式，这里按标准独立实现汉字分段的位写入
+3. 最优分段：optimal_segments 的总位数等于枚举全部切分点和模式的最小值，且各分段拼接后还原为原内容
+4. 最小版本：fit_segments 的版本与逐个版本检查的结果一致，超出容量时两边都报错
+5. 掩码罚分：版本 1-40 上 penalty_scores 与 qrcode 库的 lost_point 一致
+
+只做比对，不计时；任一检查失败时列出用例并以退出码 1 结束。
+
+用法：
+    python scripts/check_encoder.py
+    python scripts/check_encoder.py --cases 2000 --seed 7
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+# 允许从 scripts 目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+import qrcode  # noqa: E402
+from qrcode import util  # noqa: E402
+from app.core.qr_encoder import (ALPHA_NUM, DATA_BITS, MODE_ALPHA_NUM, MODE_BYTE, MODE_KANJI,  # noqa: E402
+                                 MODE_NUMBER, encode, mask_candidates, segments_bits)
+from app.core.qr_mask import best_mask, penalty_scores  # noqa: E402
+from app.core.qr_segments import fit_segments, optimal_segments  # noqa: E402
+
+QRCODE_LEVELS = {
+    'L': qrcode.ERROR_CORRECT_L,
+    'M': qrcode.ERROR_CORRECT_M,
+    'Q': qrcode.ERROR_CORRECT_Q,
+    'H': qrcode.ERROR_CORRECT_H,
+}
+
+# 生成随机内容用的字符集：数字、字母数字以及需要字节模式的字符
+DIGITS = '0123456789'
+ALPHA = ALPHA_NUM.decode('ascii')
+MIXED = ALPHA + 'abcxyz@?&=_中文二维码é'
+# 多分段内容的片段字符集：Shift-JIS 汉字、不在 Shift-JIS 中的字符、小写字母和符号
+KANJI = '漢字日本語点検東京都品川区'
+NON_SJIS = '码维é€😀'
+LOWER = 'abcxyz@?&=_/'
+
+# 各纠错等级下能编码的最大版本
+MAX_VERSION = 40
+
+# 各类检查中失败时最多列出的用例数
+MAX_REPORTED = 10
+
+
+class KanjiData(util.QRData):
+    """
+    汉字分段，qrcode 库只接受 QRData 实例，这里继承后替换数据校验和位写入
+
+    按标准逐字符计算：Shift-JIS 编码减去 0x8140（0xE040 及以上减去 0xC140），
+    高字节乘以 0xC0 加低字节，写入 13 位。
+    """
+
+    def __init__(self, data):
+        self.mode = util.MODE_KANJI
+        self.data = data
+
+    def __len__(self):
+        return len(self.data) // 2
+
+    def write(self, buffer):
+        for i in range(0, len(self.data), 2):
+            code = self.data[i] << 8 | self.data[i + 1]
+            code -= 0xC140 if code >= 0xE040 else 0x8140
+            buffer.put((code >> 8) * 0xC0 + (code & 0xFF), 13)
+
+
+class Report:
+    """一类检查的计数和失败用例"""
+
+    def __init__(self, name):
+        self.name = name
+        self.checked = 0
+        self.failures = []
+
+    def fail(self, message):
+        self.failures.append(message)
+        if len(self.failures) <= MAX_REPORTED:
+            print(f"✗ {self.name}: {message}")
+
+    def summary(self):
+        status = '✓' if not self.failures else '✗'
+        print(f"{status} {self.name}: 检查 {self.checked} 个用例，失败 {len(self.failures)} 个")
+        return len(self.failures)
+
+
+def qrcode_matrix(data, version, ecc, mask=None):
+    """使用 qrcode 库编码，data 为字符串或分段对象列表，返回 (模块矩阵, 版本)"""
+    qr = qrcode.QRCode(version=version, error_correction=QRCODE_LEVELS[ecc], border=0, mask_pattern=mask)
+    if isinstance(data, str):
+        qr.add_data(data)
+    else:
+        for segment in data:
+            qr.add_data(segment)
+    qr.make(fit=version is None)
+    return np.array(qr.modules, dtype=bool), qr.version
+
+
+def reference_segments(segments):
+    """把内置编码器的分段转换为 qrcode 库的分段对象"""
+    result = []
+    for mode, data in segments:
+        if mode == MODE_KANJI:
+            result.append(KanjiData(data))
+        else:
+            result.append(util.QRData(data, mode=mode, check_data=False))
+    return result
+
+
+def random_content(rng):
+    """默认分段检查用：随机生成长度和字符集各异的内容"""
+    length = rng.choice([1, 3, 8, 19, 20, 21, 40, 90, 200, 500, 1000, 1800])
+    charset = rng.choice([DIGITS, ALPHA, MIXED])
+    content = ''.join(rng.choice(charset) for _ in range(length))
+    # 混合内容中插入长数字串，覆盖多分段的情况
+    if rng.random() < 0.3:
+        content += ''.join(rng.choice(DIGITS) for _ in range(25)) + content[:10]
+    return content
+
+
+def random_mixed(rng, max_pieces=6, max_run=30):
+    """多分段检查用：由数字、字母数字、小写字母、汉字和非 Shift-JIS 字符的片段拼接而成"""
+    pieces = []
+    for _ in range(rng.randint(1, max_pieces)):
+        charset = rng.choice([DIGITS, ALPHA, LOWER, KANJI, NON_SJIS])
+        pieces.append(''.join(rng.choice(charset) for _ in range(rng.randint(1, max_run))))
+    return ''.join(pieces)
+
+
+def kanji_code(char):
+    """字符在汉字模式下的 Shift-JIS 编码，不能用汉字模式时返回None"""
+    if ord(char) < 0x80:
+        return None
+    try:
+        data = char.encode('shift_jis')
+    except UnicodeEncodeError:
+        return None
+    if len(data) != 2:
+        return None
+    code = data[0] << 8 | data[1]
+    return data if 0x8140 <= code <= 0x9FFC or 0xE040 <= code <= 0xEBBF else None
+
+
+def run_modes(text, kanji):
+    """一段文本可以整体使用的模式及对应的分段数据"""
+    modes = [(MODE_BYTE, text.encode('utf-8'))]
+    if text.isascii():
+        if all(char in ALPHA for char in text):
+            modes.append((MODE_ALPHA_NUM, text.encode('ascii')))
+        if text.isdigit():
+            modes.append((MODE_NUMBER, text.encode('ascii')))
+    if kanji:
+        codes = [kanji_code(char) for char in text]
+        if all(code is not None for code in codes):
+            modes.append((MODE_KANJI, b''.join(codes)))
+    return modes
+
+
+def minimal_bits(content, version, kanji):
+    """枚举全部切分点和每段可用的模式，返回最小总位数"""
+    best = [0] + [None] * len(content)
+    for end in range(1, len(content) + 1):
+        for start in range(end):
+            if best[start] is None:
+                continue
+            for mode, data in run_modes(content[start:end], kanji):
+                bits = best[start] + segments_bits([(mode, data)], version)
+                if best[end] is None or bits < best[end]:
+                    best[end] = bits
+    return best[-1]
+
+
+def decode_segments(segments):
+    """把分段还原为文本"""
+    return ''.join(
+        data.decode('shift_jis') if mode == MODE_KANJI else data.decode('utf-8')
+        for mode, data in segments
+    )
+
+
+def check_default(cases, rng):
+    """默认分段下与 qrcode 库逐位比对"""
+    report = Report("默认分段")
+    for _ in range(cases):
+        content = random_content(rng)
+        ecc = rng.choice('LMQH')
+        version = rng.choice([None, 1, 2, 7, 10, 27])
+        mask = rng.choice([None] * 3 + list(range(8)))
+        try:
+            expected, expected_version = qrcode_matrix(content, version, ecc, mask)
+        except (qrcode.exceptions.DataOverflowError, ValueError):
+            # 超出容量的内容两边都无法编码，跳过
+            continue
+        report.checked += 1
+        result = encode(content, version=version, ecc=ecc, mask=mask)
+        if result.version != expected_version or not np.array_equal(result.modules, expected):
+            report.fail(f"长度={len(content)} 纠错={ecc} 版本={version} 掩码={mask}")
+    return report.summary()
+
+
+def check_segments(cases, rng):
+    """最优分段（含汉字分段）原样写入 qrcode 库后逐位比对"""
+    report = Report("多分段与汉字模式")
+    for _ in range(cases):
+        content = random_mixed(rng)
+        kanji = rng.random() < 0.5
+        ecc = rng.choice('LMQH')
+        start = rng.choice([1, 1, 5, 12, 30])
+        mask = rng.choice([None] * 3 + list(range(8)))
+        try:
+            segments, version = fit_segments(content, ecc, start, kanji)
+        except ValueError:
+            continue
+        report.checked += 1
+        label = f"{content!r} 汉字={kanji} 纠错={ecc} 版本={version} 掩码={mask}"
+        result = encode(content, version=version, ecc=ecc, mask=mask, segments=segments)
+        try:
+            expected, expected_version = qrcode_matrix(reference_segments(segments), version, ecc, mask)
+        except qrcode.exceptions.DataOverflowError:
+            report.fail(f"{label}: qrcode 库认为分段超出版本容量")
+            continue
+        if result.version != expected_version or not np.array_equal(result.modules, expected):
+            report.fail(label)
+    return report.summary()
+
+
+def check_optimal(cases, rng):
+    """最优分段的总位数与枚举结果一致，分段可还原为原内容"""
+    report = Report("最优分段")
+    for _ in range(cases):
+        content = random_mixed(rng, max_pieces=5, max_run=8)
+        kanji = rng.random() < 0.5
+        version = rng.choice([1, 10, 27])
+        report.checked += 1
+        label = f"{content!r} 汉字={kanji} 版本={version}"
+        segments = optimal_segments(content, version, kanji)
+        if decode_segments(segments) != content:
+            report.fail(f"{label}: 分段无法还原为原内容")
+            continue
+        if not kanji and any(mode == MODE_KANJI for mode, _ in segments):
+            report.fail(f"{label}: 未允许汉字模式却使用了汉字分段")
+            continue
+        bits = segments_bits(segments, version)
+        expected = minimal_bits(content, version, kanji)
+        if bits != expected:
+            report.fail(f"{label}: {bits} 位，最少为 {expected} 位")
+    return report.summary()
+
+
+def check_fit(cases, rng):
+    """fit_segments 的版本与逐个版本检查的结果一致"""
+    report = Report("最小版本")
+    for _ in range(cases):
+        content = random_mixed(rng, max_pieces=rng.choice([3, 8, 40]), max_run=rng.choice([10, 60]))
+        kanji = rng.random() < 0.5
+        ecc = rng.choice('LMQH')
+        start = rng.choice([1, 1, 9, 10, 26, 27, 40])
+        expected = None
+        for version in range(start, MAX_VERSION + 1):
+            if segments_bits(optimal_segments(content, version, kanji), version) <= DATA_BITS[version, ecc]:
+                expected = version
+                break
+        report.checked += 1
+        label = f"长度={len(content)} 汉字={kanji} 纠错={ecc} 起始版本={start}"
+        try:
+            segments, version = fit_segments(content, ecc, start, kanji)
+        except ValueError:
+            if expected is not None:
+                report.fail(f"{label}: 报告超出容量，实际版本 {expected} 可以容纳")
+            continue
+        if version != expected:
+            report.fail(f"{label}: 版本 {version}，应为 {expected}")
+        elif segments_bits(segments, version) > DATA_BITS[version, ecc]:
+            report.fail(f"{label}: 分段超出版本 {version} 的容量")
+    return report.summary()
+
+
+def check_masks():
+    """各版本的掩码罚分与 qrcode 库一致"""
+    report = Report("掩码罚分")
+    for version in range(1, MAX_VERSION + 1):
+        stack = mask_candidates('x' * (version * 20), version=version)
+        expected = [util.lost_point(matrix.tolist()) for matrix in stack]
+        scores = [int(score) for score in penalty_scores(stack)]
+        report.checked += 1
+        if scores != expected:
+            report.fail(f"版本 {version}: {scores} != {expected}")
+        elif best_mask(stack) != expected.index(min(expected)):
+            report.fail(f"版本 {version}: 选择的掩码不是罚分最低者")
+    return report.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="内置二维码编码器、分段和掩码评分的正确性检查")
+    parser.add_argument("--cases", type=int, default=500, help="每类随机检查的用例数")
+    parser.add_argument("--seed", type=int, default=2025, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print("=" * 60)
+    failures = sum([
+        check_default(args.cases, rng),
+        check_segments(args.cases, rng),
+        check_optimal(args.cases, rng),
+        check_fit(args.cases, rng),
+        check_masks(),
+    ])
+    print("=" * 60)
+    print("全部通过" if not failures else f"失败 {failures} 个用例")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
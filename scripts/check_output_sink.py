@@ -0,0 +1,120 @@
+"""
+批量输出回归检查：
+重新生成或续传时，去重产生的链接和清单引用不能让条目输出错误的内容。
+依次检查：
+1. 先生成 ['AAA', 'AAA']（第二个文件为硬链接），再关闭去重重新生成 ['BBB', 'AAA']，
+   改写第一个文件不能连带改写与之共享数据的第二个文件
+2. 先生成 ['AAA', 'AAA']，再开启去重续传 ['BBB', 'AAA']
+3. 先生成 ['AAA', 'AAA']，再开启去重续传 ['BBB', 'AAA', 'AAA']（目录、ZIP、TAR），
+   第一个文件重新生成后，原先引用它的条目不能再沿用引用
+4. 生成 ['AAA', 'BBB', 'CCC'] 后把第一个文件改为同样大小的其他内容、截断第二个文件，
+   续传时两者都应重新生成
+每种情况下各条目的内容都应与单独生成的结果一致；任一项失败时以状态码 1 退出
+"""
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+
+# 允许从 scripts 目录直接运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.qr_generator_engine import QRCodeGenerator  # noqa: E402
+
+
+def run_batch(generator, output_dir, lines, **options):
+    batch_data = dict({'lines': lines, 'output_dir': output_dir, 'size': 200}, **options)
+    generator.batch_generate_qrcodes(batch_data)
+
+
+def read_outputs(output_dir, sink, count):
+    """
+    按编号读取批量输出的内容
+
+    ZIP 中的重复条目没有实体，按清单中最后一条记录的引用读取；TAR 的链接条目读取链接目标
+    """
+    names = [f"qrcode_{i + 1}.png" for i in range(count)]
+    if sink == 'dir':
+        return [Path(output_dir, name).read_bytes() for name in names]
+    if sink == 'tar':
+        with tarfile.open(os.path.join(output_dir, 'qrcode_batch.tar')) as tar:
+            return [tar.extractfile(tar.getmember(name)).read() for name in names]
+
+    refs = {}
+    with open(os.path.join(output_dir, 'qrcode_batch.manifest.jsonl'), encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            refs[record['name']] = record.get('ref') or record['name']
+    with zipfile.ZipFile(os.path.join(output_dir, 'qrcode_batch.zip')) as archive:
+        # 同名条目以最后一个为准
+        entries = {info.filename: info for info in archive.infolist()}
+        return [archive.read(entries[refs[name]]) for name in names]
+
+
+def check_case(generator, label, lines, second_run, sink='dir'):
+    """先生成 ['AAA', 'AAA'] 再按 second_run 重新生成 lines，返回是否通过"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        run_batch(generator, output_dir, lines, dedup=False, resume=False)
+        expected = read_outputs(output_dir, 'dir', len(lines))
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        run_batch(generator, output_dir, ['AAA', 'AAA'], sink=sink)
+        run_batch(generator, output_dir, lines, sink=sink, **second_run)
+        outputs = read_outputs(output_dir, sink, len(lines))
+
+    ok = outputs == expected
+    print(f"{label:<40}{sink:>6}{'通过' if ok else '失败':>8}")
+    if not ok:
+        for i, (actual, wanted) in enumerate(zip(outputs, expected)):
+            if actual != wanted:
+                print(f"  qrcode_{i + 1}.png 内容不一致（{len(actual)} 字节，期望 {len(wanted)} 字节）")
+    return ok
+
+
+def check_damaged(generator):
+    """输出文件被改写（大小不变）或截断后续传，返回是否通过"""
+    lines = ['AAA', 'BBB', 'CCC']
+    with tempfile.TemporaryDirectory() as output_dir:
+        run_batch(generator, output_dir, lines)
+        expected = read_outputs(output_dir, 'dir', len(lines))
+        first = Path(output_dir, 'qrcode_1.png')
+        data = bytearray(first.read_bytes())
+        data[-20] ^= 0xFF
+        first.write_bytes(bytes(data))
+        second = Path(output_dir, 'qrcode_2.png')
+        second.write_bytes(second.read_bytes()[:-10])
+        run_batch(generator, output_dir, lines)
+        outputs = read_outputs(output_dir, 'dir', len(lines))
+        skipped = generator.last_batch_stats['skipped']
+
+    ok = outputs == expected and skipped == 1
+    print(f"{'续传时输出文件被改写或截断':<40}{'dir':>6}{'通过' if ok else '失败':>8}")
+    if not ok:
+        print(f"  跳过 {skipped} 个（期望 1 个），内容一致: {outputs == expected}")
+    return ok
+
+
+def main():
+    generator = QRCodeGenerator()
+    print("=" * 60)
+    print(f"{'情况':<40}{'输出':>6}{'结果':>8}")
+    results = [
+        check_case(generator, "关闭去重重新生成", ['BBB', 'AAA'], {'dedup': False, 'resume': False}),
+        check_case(generator, "开启去重续传", ['BBB', 'AAA'], {'dedup': True, 'resume': True}),
+    ]
+    for sink in ('dir', 'zip', 'tar'):
+        results.append(check_case(generator, "续传时被引用的文件重新生成", ['BBB', 'AAA', 'AAA'],
+                                  {'dedup': True, 'resume': True}, sink))
+    results.append(check_damaged(generator))
+    print("=" * 60)
+    if not all(results):
+        print("检查失败")
+        sys.exit(1)
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
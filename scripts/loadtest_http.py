@@ -0,0 +1,225 @@
+"""
+HTTP 渲染服务压测：
+在本机启动服务（python cli.py serve --port 0），或用 --url 指向已经运行的服务，
+多个线程各自通过长连接并发请求；内容从固定数量的不同值中按 Zipf 分布抽取（少数热点内容占多数请求），
+部分请求带上之前得到的 ETag 做条件请求。
+输出吞吐量、延迟分位数、状态码分布以及服务端的渲染和缓存统计
+"""
+import argparse
+import http.client
+import json
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def start_server(args):
+    """启动本机服务，返回 (进程, 端口)"""
+    command = [sys.executable, 'cli.py', 'serve', '--port', '0', '--cache-mb', str(args.cache_mb)]
+    if args.workers is not None:
+        command += ['--workers', str(args.workers)]
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line:
+        process.wait()
+        raise RuntimeError(f"服务启动失败，退出码 {process.returncode}")
+    return process, json.loads(line)['port']
+
+
+def stop_server(process):
+    """停止本机服务，返回服务退出时输出的统计"""
+    process.send_signal(signal.SIGTERM)
+    output, _ = process.communicate(timeout=30)
+    for line in reversed(output.splitlines()):
+        record = json.loads(line)
+        if record.get('event') == 'stopped':
+            return record
+    return None
+
+
+def build_paths(args):
+    """生成全部不同的请求路径"""
+    paths = []
+    for i in range(args.unique):
+        kind = args.kind if args.kind != 'mixed' else ('qrcode', 'barcode')[i % 2]
+        if kind == 'qrcode':
+            query = {'content': f"https://example.com/item/{i:08d}", 'size': args.size, 'format': args.format}
+        else:
+            query = {'content': f"WH-{i:012d}", 'symbology': 'code128', 'format': args.format}
+        paths.append(f"/{kind}?{urlencode(query)}")
+    return paths
+
+
+def zipf_weights(count, exponent):
+    """第 k 个内容的权重为 1/k^exponent，exponent 为 0 时均匀分布"""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+class LoadWorker(threading.Thread):
+    """压测线程：长连接循环发送请求，记录每个请求的延迟和状态码"""
+
+    def __init__(self, host, port, paths, weights, etags, args, deadline, seed):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.paths = paths
+        self.cum_weights = weights
+        self.etags = etags
+        self.args = args
+        self.deadline = deadline
+        self.random = random.Random(seed)
+        self.latencies = []
+        self.statuses = {}
+        self.bytes = 0
+        self.errors = 0
+
+    def run(self):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.args.timeout)
+        requests = self.args.requests
+        while time.perf_counter() < self.deadline and (requests is None or len(self.latencies) < requests):
+            path = self.random.choices(self.paths, cum_weights=self.cum_weights)[0]
+            headers = {}
+            etag = self.etags.get(path)
+            if etag and self.random.random() < self.args.revalidate:
+                headers['If-None-Match'] = etag
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=self.args.timeout)
+                continue
+            self.latencies.append(time.perf_counter() - start)
+            self.statuses[response.status] = self.statuses.get(response.status, 0) + 1
+            self.bytes += len(body)
+            if response.status == 200:
+                self.etags[path] = response.getheader('ETag')
+        connection.close()
+
+
+def percentile(values, fraction):
+    """已排序列表的分位数"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def fetch_health(host, port):
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        connection.request('GET', '/health')
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 渲染服务压测")
+    parser.add_argument("--url", help="已运行服务的地址（如 http://127.0.0.1:8080），不指定时在本机启动服务")
+    parser.add_argument("--workers", type=int, help="本机服务的渲染进程数，默认为 CPU 核数")
+    parser.add_argument("--cache-mb", type=int, default=64, help="本机服务的响应缓存大小（MB）")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发连接数")
+    parser.add_argument("--duration", type=float, default=10, help="压测时长（秒）")
+    parser.add_argument("--requests", type=int, help="每个连接的请求数上限，达到后提前结束")
+    parser.add_argument("--unique", type=int, default=1000, help="不同内容的数量")
+    parser.add_argument("--zipf", type=float, default=1.0, help="内容分布的 Zipf 指数，0 为均匀分布")
+    parser.add_argument("--revalidate", type=float, default=0.2, help="已有 ETag 时发送 If-None-Match 的比例")
+    parser.add_argument("--kind", default="qrcode", choices=("qrcode", "barcode", "mixed"), help="请求类型")
+    parser.add_argument("--format", default="png", choices=("png", "svg", "pdf", "jpeg", "bmp"), help="图片格式")
+    parser.add_argument("--size", type=int, default=232, help="二维码像素尺寸")
+    parser.add_argument("--timeout", type=float, default=30, help="单个请求的超时秒数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", help="结果 JSON 文件")
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        process, port = start_server(args)
+        host = '127.0.0.1'
+
+    try:
+        paths = build_paths(args)
+        weights = zipf_weights(len(paths), args.zipf)
+        cum_weights = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            cum_weights.append(total)
+        # 各线程共享已知的 ETag，模拟多个客户端访问同一批热点内容
+        etags = {}
+
+        print("=" * 60)
+        print(f"目标: http://{host}:{port}  并发 {args.concurrency}  时长 {args.duration}s  "
+              f"内容 {args.unique} 个（Zipf {args.zipf}）  {args.kind}/{args.format}")
+        start = time.perf_counter()
+        workers = [
+            LoadWorker(host, port, paths, cum_weights, etags, args, start + args.duration, args.seed + i)
+            for i in range(args.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        health = fetch_health(host, port)
+    finally:
+        server_stats = stop_server(process) if process is not None else None
+
+    latencies = sorted(latency * 1000 for worker in workers for latency in worker.latencies)
+    statuses = {}
+    for worker in workers:
+        for status, count in worker.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    result = {
+        'requests': len(latencies),
+        'errors': sum(worker.errors for worker in workers),
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'bytes': sum(worker.bytes for worker in workers),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p90': round(percentile(latencies, 0.90), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0,
+        },
+        'server': server_stats or health,
+        'config': vars(args),
+    }
+
+    print("=" * 60)
+    print(f"请求数: {result['requests']}  错误: {result['errors']}  吞吐量: {result['throughput']} 请求/秒")
+    print(f"状态码: {result['statuses']}")
+    latency = result['latency_ms']
+    print(f"延迟（毫秒）: 平均 {latency['mean']}  p50 {latency['p50']}  p90 {latency['p90']}  "
+          f"p99 {latency['p99']}  最大 {latency['max']}")
+    server = result['server']
+    cache = server['cache']
+    lookups = cache['hits'] + cache['misses']
+    print(f"服务端: 渲染 {server['rendered']} 次（平均 {server['render_ms_avg']} ms），合并 {server['coalesced']}，"
+          f"拒绝 {server['rejected']}，缓存命中率 {cache['hits'] / lookups * 100 if lookups else 0:.1f}%")
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.output}")
+    return 0 if not result['errors'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())